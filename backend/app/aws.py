@@ -0,0 +1,149 @@
+"""Shared AWS session and client configuration.
+
+Every client the API opens comes from here, so all of them get the same
+tuned botocore settings, and each reports how busy its connection pool is
+(see pool_stats).
+"""
+
+import os
+import time
+from functools import lru_cache
+
+from botocore.config import Config
+from botocore.exceptions import ConnectTimeoutError, ReadTimeoutError
+
+AWS_REGION = os.getenv("AWS_REGION", "ap-northeast-1")
+
+# Connections per client, shared by one request's fan-out and by every
+# request on the same event loop; calls beyond it wait for a connection
+MAX_POOL_CONNECTIONS = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", "50"))
+
+# A stalled call fails within seconds, so its retries still fit well
+# inside the Lambda timeout
+CONNECT_TIMEOUT_SECONDS = float(os.getenv("AWS_CONNECT_TIMEOUT_SECONDS", "2"))
+READ_TIMEOUT_SECONDS = float(os.getenv("AWS_READ_TIMEOUT_SECONDS", "5"))
+MAX_ATTEMPTS = int(os.getenv("AWS_MAX_ATTEMPTS", "3"))
+
+POOLS: dict[str, "PoolMetrics"] = {}
+
+
+@lru_cache(maxsize=None)
+def session():
+    """The aioboto3 session shared by every client, created on first use.
+
+    Importing aioboto3 and loading service models are a large share of a
+    cold start, so neither happens until a request needs them.
+    """
+    import aioboto3
+
+    return aioboto3.Session()
+
+
+@lru_cache(maxsize=None)
+def client_config() -> Config:
+    return Config(
+        max_pool_connections=MAX_POOL_CONNECTIONS,
+        connect_timeout=CONNECT_TIMEOUT_SECONDS,
+        read_timeout=READ_TIMEOUT_SECONDS,
+        # Adaptive mode also rate-limits the client while it is being throttled
+        retries={"mode": "adaptive", "max_attempts": MAX_ATTEMPTS},
+        tcp_keepalive=True,
+    )
+
+
+class PoolMetrics:
+    """In-flight and completed calls through one client's connection pool.
+
+    A call that starts while every connection is busy has to wait for one;
+    `queued` counts those, so a pool too small for the fan-out shows up
+    here rather than as unexplained latency.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.calls = 0
+        self.queued = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.total_ms = 0.0
+        POOLS[name] = self
+
+    def watch(self, events) -> None:
+        events.register("before-call", self._started)
+        events.register("after-call", self._finished)
+        events.register("after-call-error", self._failed)
+
+    def _started(self, context, **kwargs):
+        if self.in_flight >= MAX_POOL_CONNECTIONS:
+            self.queued += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        context["poolStarted"] = time.monotonic()
+        # before-call handlers that return a value replace the request
+        return None
+
+    def _finished(self, context, **kwargs):
+        started = context.pop("poolStarted", None)
+        if started is None:
+            return
+        self.in_flight -= 1
+        self.calls += 1
+        self.total_ms += (time.monotonic() - started) * 1000
+
+    def _failed(self, context, exception, **kwargs):
+        self.errors += 1
+        if isinstance(exception, (ConnectTimeoutError, ReadTimeoutError)):
+            self.timeouts += 1
+        self._finished(context)
+
+    def stats(self) -> dict:
+        return {
+            "maxConnections": MAX_POOL_CONNECTIONS,
+            "inFlight": self.in_flight,
+            "peakInFlight": self.peak_in_flight,
+            "calls": self.calls,
+            "queued": self.queued,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "avgMs": round(self.total_ms / self.calls, 1) if self.calls else 0.0,
+        }
+
+
+def _metrics(service: str) -> PoolMetrics:
+    return POOLS.get(service) or PoolMetrics(service)
+
+
+class _Watched:
+    """Async context manager that registers pool metrics on the opened client."""
+
+    def __init__(self, manager, service: str, resource: bool):
+        self.manager = manager
+        self.service = service
+        self.resource = resource
+
+    async def __aenter__(self):
+        opened = await self.manager.__aenter__()
+        client = opened.meta.client if self.resource else opened
+        _metrics(self.service).watch(client.meta.events)
+        return opened
+
+    async def __aexit__(self, *exc_info):
+        return await self.manager.__aexit__(*exc_info)
+
+
+def client(service: str, **kwargs):
+    """`async with client("lambda") as c:` a low-level client with the shared settings."""
+    manager = session().client(service, region_name=AWS_REGION, config=client_config(), **kwargs)
+    return _Watched(manager, service, resource=False)
+
+
+def resource(service: str, **kwargs):
+    """`async with resource("dynamodb") as r:` a resource with the shared settings."""
+    manager = session().resource(service, region_name=AWS_REGION, config=client_config(), **kwargs)
+    return _Watched(manager, service, resource=True)
+
+
+def pool_stats() -> dict:
+    return {name: pool.stats() for name, pool in POOLS.items()}
@@ -0,0 +1,70 @@
+import inspect
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from app.database import parallel_map
+
+
+def _validation_error(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in error.errors())
+
+
+async def run_batch(repo, operations, create_model, new_items, update_model, update_one) -> dict:
+    """Apply a mixed batch of creates, updates and deletes for one resource.
+
+    `new_items` builds items (directly or awaitably) for a list of validated
+    create models, and `update_one(id, model)` is the resource's PATCH handler. Creates and
+    deletes are written with BatchWriteItem; each operation gets its own
+    result carrying the status the single-item endpoint would have returned.
+    """
+    ids = [operation.id for operation in operations if operation.id is not None]
+    if len(ids) != len(set(ids)):
+        raise HTTPException(status_code=400, detail="Each id may appear only once per batch")
+
+    results = [None] * len(operations)
+    creates, updates, deletes = [], [], []
+    for index, operation in enumerate(operations):
+        if operation.op != "create" and operation.id is None:
+            results[index] = {"op": operation.op, "status": 422, "error": "id is required"}
+            continue
+        try:
+            if operation.op == "create":
+                creates.append((index, create_model(**operation.data)))
+            elif operation.op == "update":
+                updates.append((index, operation.id, update_model(**operation.data)))
+            else:
+                deletes.append((index, operation.id))
+        except ValidationError as e:
+            results[index] = {"op": operation.op, "id": operation.id, "status": 422, "error": _validation_error(e)}
+
+    created = new_items([model for _, model in creates]) if creates else []
+    if inspect.isawaitable(created):
+        created = await created
+    for (index, _), item in zip(creates, created):
+        results[index] = {"op": "create", "id": item[repo.key], "status": 201, "item": item}
+
+    existing = set()
+    if deletes:
+        found = await repo.batch_get([item_id for _, item_id in deletes], attributes=[repo.key])
+        existing = {item[repo.key] for item in found}
+    for index, item_id in deletes:
+        if item_id in existing:
+            results[index] = {"op": "delete", "id": item_id, "status": 204}
+        else:
+            results[index] = {"op": "delete", "id": item_id, "status": 404, "error": repo.not_found}
+
+    await repo.batch_write(puts=created, deletes=[item_id for _, item_id in deletes if item_id in existing])
+
+    async def apply_update(update):
+        index, item_id, model = update
+        try:
+            return index, {"op": "update", "id": item_id, "status": 200, "item": await update_one(item_id, model)}
+        except HTTPException as e:
+            return index, {"op": "update", "id": item_id, "status": e.status_code, "error": e.detail}
+
+    # BatchWriteItem cannot update, so updates fan out as conditional single-item writes
+    for index, result in await parallel_map(apply_update, updates):
+        results[index] = result
+
+    return {"results": results}
@@ -0,0 +1,78 @@
+"""In-process read-through cache for small, hot tables.
+
+Entries live for the lifetime of a warm Lambda container. Writes made
+through the same container invalidate them immediately; writes from other
+containers become visible once an entry's TTL, the staleness budget,
+runs out.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+CACHES: dict[str, "TTLCache"] = {}
+
+
+class TTLCache:
+    """LRU-bounded mapping whose entries expire `ttl` seconds after loading."""
+
+    def __init__(self, name: str, ttl: float, max_entries: int):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on invalidation so a load that raced a write is not stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        CACHES[name] = self
+
+    async def get(self, key, load):
+        """Cached value for `key`, awaiting `load()` on a miss or expiry.
+
+        Values are copied on the way out so callers may mutate them.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+            self.misses += 1
+            generation = self._generation
+
+        value = await load()
+        with self._lock:
+            if generation != self._generation:
+                return value
+            self._entries[key] = (now + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return copy.deepcopy(value)
+
+    def discard(self, predicate) -> None:
+        with self._lock:
+            self._generation += 1
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "ttlSeconds": self.ttl,
+            }
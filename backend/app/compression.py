@@ -0,0 +1,67 @@
+"""Transparent compression of large text attributes.
+
+A value of at least COMPRESS_MIN_BYTES is stored as `<field>Z`, a zlib
+Binary attribute, with `<field>Encoding` marking the codec and
+`<field>Preview` holding its opening characters. List views return the
+preview, so only reads of a whole item decompress.
+"""
+
+import zlib
+
+ENCODING = "zlib"
+
+# Items are billed per 1 KB written, so smaller values gain nothing
+COMPRESS_MIN_BYTES = 1024
+
+# Levels above 3 save a few percent more at several times the CPU, which a
+# small Lambda pays on every save (see scripts/bench_note_compression.py)
+COMPRESS_LEVEL = 3
+
+PREVIEW_CHARS = 300
+
+
+def stored_attributes(field: str) -> list[str]:
+    return [f"{field}Z", f"{field}Encoding", f"{field}Preview"]
+
+
+def pack(field: str, value: str) -> tuple[dict, list[str]]:
+    """Attributes to SET and to REMOVE so that `field` holds `value`."""
+    data = value.encode()
+    if len(data) >= COMPRESS_MIN_BYTES:
+        compressed = zlib.compress(data, COMPRESS_LEVEL)
+        preview = value[:PREVIEW_CHARS]
+        # Text that does not shrink by more than its preview is stored as is
+        if len(compressed) + len(preview.encode()) < len(data):
+            attributes = {f"{field}Z": compressed, f"{field}Encoding": ENCODING, f"{field}Preview": preview}
+            return attributes, [field]
+    return {field: value}, stored_attributes(field)
+
+
+def packed(item: dict, field: str) -> dict:
+    """A whole item as it is stored."""
+    attributes, remove = pack(field, item[field])
+    return {**{k: v for k, v in item.items() if k not in remove}, **attributes}
+
+
+def _without_stored(item: dict, field: str) -> dict:
+    stored = stored_attributes(field)
+    return {k: v for k, v in item.items() if k not in stored}
+
+
+def unpack(item: dict, field: str, value: str | None = None) -> dict:
+    """The item with `field` as it was written; pass `value` if the caller already has it."""
+    if item.get(f"{field}Encoding") != ENCODING:
+        return item
+    if value is None:
+        data = item[f"{field}Z"]
+        # boto3 wraps Binary attributes; the raw bytes are .value
+        value = zlib.decompress(bytes(getattr(data, "value", data))).decode()
+    return {**_without_stored(item, field), field: value}
+
+
+def preview(item: dict, field: str) -> dict:
+    """The item as list views return it: a compressed field becomes its
+    preview, with `<field>Truncated` set."""
+    if item.get(f"{field}Encoding") != ENCODING:
+        return item
+    return {**_without_stored(item, field), field: item[f"{field}Preview"], f"{field}Truncated": True}
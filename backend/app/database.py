@@ -1,7 +1,28 @@
+import asyncio
 import os
-import boto3
+from contextlib import AsyncExitStack
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
+from pydantic import BaseModel
 
-AWS_REGION = os.getenv("AWS_REGION", "ap-northeast-1")
+from app import aws
+from app.cache import TTLCache
+
+# Points the app at DynamoDB Local or another stand-in instead of AWS
+DYNAMODB_ENDPOINT_URL = os.getenv("DYNAMODB_ENDPOINT_URL") or None
+
+# DynamoDB request limits
+BATCH_WRITE_LIMIT = 25
+BATCH_GET_LIMIT = 100
+BATCH_GET_RETRIES = 5
+
+# Upper bound on concurrent DynamoDB calls fanned out by one request
+FAN_OUT_CONCURRENCY = 8
+
+# Cached tables: how long another container's writes may go unseen, and
+# how many items or list pages each table keeps
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "30"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "256"))
 
 # Table names from environment
 TASKS_TABLE = os.getenv("TASKS_TABLE", "orangewall-dev-tasks")
@@ -14,27 +35,439 @@ KANBAN_CARDS_TABLE = os.getenv("KANBAN_CARDS_TABLE", "orangewall-dev-kanban_card
 CALENDAR_EVENTS_TABLE = os.getenv("CALENDAR_EVENTS_TABLE", "orangewall-dev-calendar_events")
 ROUTINES_TABLE = os.getenv("ROUTINES_TABLE", "orangewall-dev-routines")
 SCHEDULE_BLOCKS_TABLE = os.getenv("SCHEDULE_BLOCKS_TABLE", "orangewall-dev-schedule_blocks")
+SCHEDULE_TEMPLATES_TABLE = os.getenv("SCHEDULE_TEMPLATES_TABLE", "orangewall-dev-schedule_templates")
 CONTACTS_TABLE = os.getenv("CONTACTS_TABLE", "orangewall-dev-contacts")
 USER_PREFERENCES_TABLE = os.getenv("USER_PREFERENCES_TABLE", "orangewall-dev-user_preferences")
 RECIPES_TABLE = os.getenv("RECIPES_TABLE", "orangewall-dev-recipes")
 GROCERY_LISTS_TABLE = os.getenv("GROCERY_LISTS_TABLE", "orangewall-dev-grocery_lists")
 MEAL_PLANS_TABLE = os.getenv("MEAL_PLANS_TABLE", "orangewall-dev-meal_plans")
+JOBS_TABLE = os.getenv("JOBS_TABLE", "orangewall-dev-jobs")
+COUNTERS_TABLE = os.getenv("COUNTERS_TABLE", "orangewall-dev-counters")
+SEARCH_INDEX_TABLE = os.getenv("SEARCH_INDEX_TABLE", "orangewall-dev-search_index")
+NOTE_TAGS_TABLE = os.getenv("NOTE_TAGS_TABLE", "orangewall-dev-note_tags")
+
+
+class _Connection:
+    """The DynamoDB resource and Table objects for one event loop.
+
+    The resource's HTTP connection pool belongs to the loop it was opened
+    on: Mangum reuses one loop across a warm container's invocations, and
+    uvicorn serves every request on one loop.
+    """
+
+    def __init__(self):
+        self.stack = AsyncExitStack()
+        self.resource = None
+        self.tables = {}
+
+    async def open(self) -> "_Connection":
+        self.resource = await self.stack.enter_async_context(
+            aws.resource("dynamodb", endpoint_url=DYNAMODB_ENDPOINT_URL)
+        )
+        return self
+
+
+_connections: dict[asyncio.AbstractEventLoop, asyncio.Task] = {}
+
+
+async def _connection() -> _Connection:
+    loop = asyncio.get_running_loop()
+    # Concurrent first calls share one opening task
+    if loop not in _connections:
+        _connections[loop] = loop.create_task(_Connection().open())
+    try:
+        return await asyncio.shield(_connections[loop])
+    except Exception:
+        _connections.pop(loop, None)
+        raise
+
+
+async def get_table(name: str):
+    connection = await _connection()
+    if name not in connection.tables:
+        connection.tables[name] = await connection.resource.Table(name)
+    return connection.tables[name]
+
+
+async def close_connection() -> None:
+    """Close the running loop's DynamoDB connection, if it opened one."""
+    task = _connections.pop(asyncio.get_running_loop(), None)
+    if task is not None:
+        await (await task).stack.aclose()
+
+
+# Counter scopes: per-collection item counts and version stamps, order
+# sequences per list, and notes per tag and per folder
+COUNTS = "counts"
+SEQUENCES = "sequences"
+NOTE_FACETS = "note_facets"
+
+
+async def parallel_map(fn, items) -> list:
+    """Await `fn(item)` for every item concurrently, preserving input order."""
+    limit = asyncio.Semaphore(FAN_OUT_CONCURRENCY)
+
+    async def run(item):
+        async with limit:
+            return await fn(item)
+
+    return list(await asyncio.gather(*(run(item) for item in items)))
+
+
+def is_condition_failure(error: ClientError) -> bool:
+    return error.response["Error"]["Code"] == "ConditionalCheckFailedException"
+
+
+def set_fields(model: BaseModel) -> dict:
+    """Top-level fields of a partial-update model that were given a value."""
+    return {k: v for k, v in model.model_dump().items() if v is not None}
+
+
+async def update_item(table, key: dict, updates: BaseModel | dict, not_found: str, remove=(), derive=None,
+                      previous: dict | None = None, add: dict | None = None,
+                      if_missing: dict | None = None) -> dict:
+    """Apply a partial update in a single round trip and return the new item.
+
+    Non-None fields become a SET expression, guarded by attribute_exists so a
+    missing item maps to a 404 instead of being created. `derive` computes
+    attributes that depend on other fields (e.g. composite sort keys); if the
+    patch did not carry enough to compute them up front, they are fixed up
+    with a second write. A `previous` dict receives the item as it was
+    before this update, from the same write. `add` atomically adds to
+    numeric attributes (e.g. revisions), starting from zero, and
+    `if_missing` sets attributes only where the item has none yet.
+    """
+    if isinstance(updates, BaseModel):
+        updates = set_fields(updates)
+    add = add or {}
+    if_missing = if_missing or {}
+    if not updates and not remove and not add and not if_missing:
+        item = await get_item(table, key, not_found)
+        if previous is not None:
+            previous.update(item)
+        return item
+
+    names = {f"#{k}": k for k in key}
+    values = {}
+    clauses = []
+    if updates or if_missing:
+        sets = [f"#{k} = :{k}" for k in updates] + [f"#{k} = if_not_exists(#{k}, :init_{k})" for k in if_missing]
+        clauses.append("SET " + ", ".join(sets))
+        names.update({f"#{k}": k for k in [*updates, *if_missing]})
+        values.update({f":{k}": v for k, v in updates.items()})
+        values.update({f":init_{k}": v for k, v in if_missing.items()})
+    if remove:
+        clauses.append("REMOVE " + ", ".join(f"#{k}" for k in remove))
+        names.update({f"#{k}": k for k in remove})
+    if add:
+        clauses.append("ADD " + ", ".join(f"#{k} :add_{k}" for k in add))
+        names.update({f"#{k}": k for k in add})
+        values.update({f":add_{k}": v for k, v in add.items()})
+
+    kwargs = {
+        "Key": key,
+        "UpdateExpression": " ".join(clauses),
+        "ConditionExpression": " AND ".join(f"attribute_exists(#{k})" for k in key),
+        "ExpressionAttributeNames": names,
+        "ReturnValues": "ALL_NEW" if previous is None else "ALL_OLD",
+    }
+    if values:
+        kwargs["ExpressionAttributeValues"] = values
+
+    try:
+        item = (await table.update_item(**kwargs))["Attributes"]
+    except ClientError as e:
+        if is_condition_failure(e):
+            raise HTTPException(status_code=404, detail=not_found)
+        raise
+    if previous is not None:
+        # The old item plus the patch is exactly what ALL_NEW would have returned
+        previous.update(item)
+        added = {k: item.get(k, 0) + v for k, v in add.items()}
+        kept = {k: item.get(k, v) for k, v in if_missing.items()}
+        item = {k: v for k, v in {**item, **updates, **added, **kept}.items() if k not in remove}
+
+    if derive:
+        stale = {k: v for k, v in derive(item).items() if item.get(k) != v}
+        if stale:
+            return await update_item(table, key, stale, not_found)
+    return item
+
+
+async def get_item(table, key: dict, not_found: str) -> dict:
+    item = (await table.get_item(Key=key)).get("Item")
+    if not item:
+        raise HTTPException(status_code=404, detail=not_found)
+    return item
+
+
+async def delete_item(table, key: dict, not_found: str) -> dict:
+    """Delete in one round trip and return the deleted item; a missing item maps to a 404."""
+    try:
+        response = await table.delete_item(
+            Key=key,
+            ConditionExpression=" AND ".join(f"attribute_exists(#{k})" for k in key),
+            ExpressionAttributeNames={f"#{k}": k for k in key},
+            ReturnValues="ALL_OLD",
+        )
+    except ClientError as e:
+        if is_condition_failure(e):
+            raise HTTPException(status_code=404, detail=not_found)
+        raise
+    return response["Attributes"]
+
+
+async def add_to_counter(scope: str, name: str, amount: int = 1) -> int:
+    """Atomically add to a counter, creating it at zero, and return the new value."""
+    counters = await get_table(COUNTERS_TABLE)
+    response = await counters.update_item(
+        Key={"scope": scope, "name": name},
+        UpdateExpression="ADD #value :amount",
+        ExpressionAttributeNames={"#value": "value"},
+        ExpressionAttributeValues={":amount": amount},
+        ReturnValues="UPDATED_NEW",
+    )
+    return int(response["Attributes"]["value"])
+
+
+async def raise_counter(scope: str, name: str, minimum: int) -> None:
+    """Make sure a counter is at least `minimum`."""
+    counters = await get_table(COUNTERS_TABLE)
+    try:
+        await counters.update_item(
+            Key={"scope": scope, "name": name},
+            UpdateExpression="SET #value = :minimum",
+            ConditionExpression="attribute_not_exists(#value) OR #value < :minimum",
+            ExpressionAttributeNames={"#value": "value"},
+            ExpressionAttributeValues={":minimum": minimum},
+        )
+    except ClientError as e:
+        if not is_condition_failure(e):
+            raise
+
+
+async def get_counters(scope: str) -> dict[str, int]:
+    counters = await get_table(COUNTERS_TABLE)
+    items = []
+    kwargs = {
+        "KeyConditionExpression": "#scope = :scope",
+        "ExpressionAttributeNames": {"#scope": "scope"},
+        "ExpressionAttributeValues": {":scope": scope},
+    }
+    while True:
+        response = await counters.query(**kwargs)
+        items.extend(response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            return {item["name"]: int(item["value"]) for item in items}
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+async def batch_get_items(table, keys: list[dict], attributes=None, consistent: bool = False) -> list[dict]:
+    items = []
+    for start in range(0, len(keys), BATCH_GET_LIMIT):
+        request = {"Keys": keys[start:start + BATCH_GET_LIMIT], "ConsistentRead": consistent}
+        if attributes:
+            request["ProjectionExpression"] = ", ".join(f"#{a}" for a in attributes)
+            request["ExpressionAttributeNames"] = {f"#{a}": a for a in attributes}
+
+        for attempt in range(BATCH_GET_RETRIES + 1):
+            response = await table.meta.client.batch_get_item(RequestItems={table.name: request})
+            items.extend(response["Responses"].get(table.name, []))
+            unprocessed = response.get("UnprocessedKeys", {}).get(table.name)
+            if not unprocessed:
+                break
+            if attempt == BATCH_GET_RETRIES:
+                raise HTTPException(status_code=503, detail="Database is busy, try again")
+            request = unprocessed
+            await asyncio.sleep(0.05 * 2 ** attempt)
+    return items
+
+
+class Repository:
+    """Single-item operations with the same semantics on every table.
+
+    Reads, updates and deletes of a missing item raise a 404 carrying
+    `not_found`; updates and deletes are conditional writes, so none of
+    them needs a pre-read.
+
+    A table with a `counter` name has one item in the counters table holding
+    its exact item count and a version stamp; every write through the
+    repository adjusts the count (puts always create) and bumps the version.
+    `cached` tables serve item reads, list pages and views from an
+    in-process TTL cache that those writes invalidate. They also keep their
+    version stamp there, and every entry is keyed on the stamp it was read
+    under, so another container's write is picked up (and a response's
+    ETag never runs ahead of its body) once the stamp expires.
+    """
+
+    def __init__(self, table_name: str, not_found: str, key: str = "id", counter: str | None = None,
+                 cached: bool = False):
+        self.table_name = table_name
+        self.not_found = not_found
+        self.key = key
+        self.counter = counter
+        self.cache = TTLCache(table_name, CACHE_TTL_SECONDS, CACHE_MAX_ENTRIES) if cached else None
+
+    async def table(self):
+        return await get_table(self.table_name)
+
+    async def _read(self, key: tuple, load):
+        if self.cache is None:
+            return await load()
+        return await self.cache.get((*key, await self.version()), load)
+
+    def invalidate(self, item_id: str | None = None) -> None:
+        """Forget a written item (or every item), all cached list pages and views, and the version stamp."""
+        if self.cache is not None:
+            self.cache.discard(lambda key: key[0] != "item" or item_id is None or key[1] == item_id)
+
+    async def written(self, item_id: str | None = None, added: int = 0) -> None:
+        """Record a write to one item (or to many, with no `item_id`).
+
+        Writes that bypass the repository must call this too, or cached
+        copies and version stamps go stale.
+        """
+        self.invalidate(item_id)
+        if self.counter:
+            counters = await get_table(COUNTERS_TABLE)
+            await counters.update_item(
+                Key={"scope": COUNTS, "name": self.counter},
+                UpdateExpression="ADD #value :added, #version :one",
+                ExpressionAttributeNames={"#value": "value", "#version": "version"},
+                ExpressionAttributeValues={":added": added, ":one": 1},
+            )
+            if self.cache is not None:
+                # A read between the write and the bump may have cached the old stamp
+                self.cache.discard(lambda key: key == ("version",))
+
+    async def _counter(self, attribute: str) -> int:
+        counters = await get_table(COUNTERS_TABLE)
+        item = (await counters.get_item(
+            Key={"scope": COUNTS, "name": self.counter},
+            ProjectionExpression="#attribute",
+            ExpressionAttributeNames={"#attribute": attribute},
+            ConsistentRead=True,
+        )).get("Item")
+        return int(item[attribute]) if item and attribute in item else 0
+
+    async def version(self) -> int:
+        """The table's version stamp; cached tables keep it for the cache TTL."""
+        if self.cache is None:
+            return await self._counter("version")
+        return await self.cache.get(("version",), lambda: self._counter("version"))
+
+    async def count(self) -> int:
+        return await self._counter("value")
+
+    def _key(self, item_id: str) -> dict:
+        return {self.key: item_id}
+
+    async def find(self, item_id: str) -> dict | None:
+        async def load():
+            table = await self.table()
+            return (await table.get_item(Key=self._key(item_id))).get("Item")
+
+        return await self._read(("item", item_id), load)
+
+    async def get(self, item_id: str) -> dict:
+        item = await self.find(item_id)
+        if not item:
+            raise HTTPException(status_code=404, detail=self.not_found)
+        return item
+
+    async def cached_page(self, page, load) -> dict:
+        """A list page from `load(table)`, through the cache on cached tables."""
+        async def read():
+            return await load(await self.table())
+
+        return await self._read(("page", page.limit, page.cursor), read)
+
+    async def cached_view(self, key: tuple, load):
+        """A value computed by `load(table)` from many items, through the cache on cached tables."""
+        async def read():
+            return await load(await self.table())
+
+        return await self._read(("view", *key), read)
+
+    async def put(self, item: dict, conflict: str | None = None) -> dict:
+        """Write a whole item; with `conflict`, refuse to overwrite and raise a 400."""
+        table = await self.table()
+        if conflict is None:
+            await table.put_item(Item=item)
+            await self.written(item[self.key], added=1)
+            return item
+        try:
+            await table.put_item(
+                Item=item,
+                ConditionExpression="attribute_not_exists(#key)",
+                ExpressionAttributeNames={"#key": self.key},
+            )
+        except ClientError as e:
+            if is_condition_failure(e):
+                raise HTTPException(status_code=400, detail=conflict)
+            raise
+        await self.written(item[self.key], added=1)
+        return item
+
+    async def update(self, item_id: str, updates: BaseModel | dict, remove=(), derive=None,
+                     previous: dict | None = None, add: dict | None = None,
+                     if_missing: dict | None = None) -> dict:
+        table = await self.table()
+        item = await update_item(
+            table, self._key(item_id), updates, self.not_found,
+            remove=remove, derive=derive, previous=previous, add=add, if_missing=if_missing,
+        )
+        await self.written(item_id)
+        return item
+
+    async def delete(self, item_id: str) -> dict:
+        """Delete an item and return it as it was."""
+        item = await delete_item(await self.table(), self._key(item_id), self.not_found)
+        await self.written(item_id, added=-1)
+        return item
+
+    async def batch_get(self, item_ids, attributes=None) -> list[dict]:
+        """Fetch items by id with BatchGetItem, retrying UnprocessedKeys.
+
+        Missing ids are simply absent from the result, which is unordered.
+        """
+        return await batch_get_items(await self.table(), [self._key(i) for i in item_ids], attributes)
+
+    async def batch_write(self, puts=(), deletes=()) -> None:
+        """Put and delete many items in BatchWriteItem calls of up to 25.
+
+        The batch writer resends unprocessed items until they are accepted.
+        Deletes are unconditional, so callers wanting 404s (or exact
+        counts) check that the items exist first.
+        """
+        puts, deletes = list(puts), list(deletes)
+        table = await self.table()
+        async with table.batch_writer(overwrite_by_pkeys=[self.key]) as writer:
+            for item in puts:
+                await writer.put_item(Item=item)
+            for item_id in deletes:
+                await writer.delete_item(Key=self._key(item_id))
+        await self.written(added=len(puts) - len(deletes))
+
 
-dynamodb = boto3.resource("dynamodb", region_name=AWS_REGION)
-
-# Table references
-tasks_table = dynamodb.Table(TASKS_TABLE)
-statuses_table = dynamodb.Table(STATUSES_TABLE)
-notes_table = dynamodb.Table(NOTES_TABLE)
-note_folders_table = dynamodb.Table(NOTE_FOLDERS_TABLE)
-kanban_boards_table = dynamodb.Table(KANBAN_BOARDS_TABLE)
-kanban_columns_table = dynamodb.Table(KANBAN_COLUMNS_TABLE)
-kanban_cards_table = dynamodb.Table(KANBAN_CARDS_TABLE)
-calendar_events_table = dynamodb.Table(CALENDAR_EVENTS_TABLE)
-routines_table = dynamodb.Table(ROUTINES_TABLE)
-schedule_blocks_table = dynamodb.Table(SCHEDULE_BLOCKS_TABLE)
-contacts_table = dynamodb.Table(CONTACTS_TABLE)
-user_preferences_table = dynamodb.Table(USER_PREFERENCES_TABLE)
-recipes_table = dynamodb.Table(RECIPES_TABLE)
-grocery_lists_table = dynamodb.Table(GROCERY_LISTS_TABLE)
-meal_plans_table = dynamodb.Table(MEAL_PLANS_TABLE)
+tasks_repo = Repository(TASKS_TABLE, "Task not found", counter="tasks")
+statuses_repo = Repository(STATUSES_TABLE, "Status not found", counter="statuses", cached=True)
+notes_repo = Repository(NOTES_TABLE, "Note not found", counter="notes")
+note_folders_repo = Repository(NOTE_FOLDERS_TABLE, "Folder not found", counter="note_folders", cached=True)
+kanban_boards_repo = Repository(KANBAN_BOARDS_TABLE, "Board not found", counter="kanban_boards", cached=True)
+kanban_columns_repo = Repository(KANBAN_COLUMNS_TABLE, "Column not found", counter="kanban_columns")
+kanban_cards_repo = Repository(KANBAN_CARDS_TABLE, "Card not found", counter="kanban_cards")
+calendar_events_repo = Repository(CALENDAR_EVENTS_TABLE, "Event not found", counter="calendar_events")
+routines_repo = Repository(ROUTINES_TABLE, "Routine not found", counter="routines", cached=True)
+schedule_blocks_repo = Repository(SCHEDULE_BLOCKS_TABLE, "Block not found", counter="schedule_blocks")
+schedule_templates_repo = Repository(
+    SCHEDULE_TEMPLATES_TABLE, "Template not found", counter="schedule_templates", cached=True
+)
+contacts_repo = Repository(CONTACTS_TABLE, "Contact not found", counter="contacts")
+user_preferences_repo = Repository(
+    USER_PREFERENCES_TABLE, "Preferences not found", key="userId", counter="user_preferences", cached=True
+)
+recipes_repo = Repository(RECIPES_TABLE, "Recipe not found", counter="recipes")
+grocery_lists_repo = Repository(GROCERY_LISTS_TABLE, "List not found", counter="grocery_lists")
+meal_plans_repo = Repository(MEAL_PLANS_TABLE, "Meal plan not found", counter="meal_plans")
+jobs_repo = Repository(JOBS_TABLE, "Job not found")
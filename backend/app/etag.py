@@ -0,0 +1,63 @@
+"""Conditional GETs against per-table version stamps.
+
+Every write through a Repository bumps its table's version (see
+Repository.written), so a response's ETag is just the versions of the
+tables it was read from, plus a digest of what else selects the body: the
+path, the query string and the user. Checking If-None-Match costs one
+counter read instead of the query and the serialized payload, and none at
+all for cached tables, whose stamps are kept in memory with their entries.
+"""
+
+import hashlib
+
+from fastapi import Depends, HTTPException, Request, Response
+
+from app.database import COUNTERS_TABLE, COUNTS, Repository, batch_get_items, get_table
+
+
+async def _versions(repos: tuple[Repository, ...]) -> list[int]:
+    live = [repo for repo in repos if repo.cache is None]
+    found = {}
+    if len(live) == 1:
+        found[live[0].counter] = await live[0].version()
+    elif live:
+        items = await batch_get_items(
+            await get_table(COUNTERS_TABLE),
+            [{"scope": COUNTS, "name": repo.counter} for repo in live],
+            attributes=["name", "version"],
+            consistent=True,
+        )
+        found = {item["name"]: int(item.get("version", 0)) for item in items}
+    return [await repo.version() if repo.cache is not None else found.get(repo.counter, 0) for repo in repos]
+
+
+def _variant(request: Request) -> str:
+    """A short digest of the request's path, query string and user."""
+    selector = "\n".join((request.url.path, request.url.query, request.headers.get("X-User-Id", "")))
+    return hashlib.blake2b(selector.encode(), digest_size=6).hexdigest()
+
+
+def _matches(header: str | None, tag: str) -> bool:
+    if not header:
+        return False
+    candidates = [c.strip().removeprefix("W/") for c in header.split(",")]
+    return "*" in candidates or tag in candidates
+
+
+def versioned(*repos: Repository):
+    """Route dependency: answer 304 if the client's ETag is current, else tag the response.
+
+    The versions are read before the route runs, so a write racing the
+    read can only make the tag older than the body, never newer. The tag is
+    left on `request.state.etag` for routes that cache what they build.
+    """
+    async def check(request: Request, response: Response):
+        versions = ".".join(str(v) for v in await _versions(repos))
+        tag = f'"{versions}-{_variant(request)}"'
+        request.state.etag = tag
+        headers = {"ETag": tag, "Cache-Control": "no-cache", "Vary": "Authorization, X-User-Id"}
+        if _matches(request.headers.get("If-None-Match"), tag):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+    return Depends(check)
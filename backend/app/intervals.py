@@ -0,0 +1,79 @@
+"""Interval index over the time blocks of one day.
+
+Blocks are kept sorted by start minute beside a running maximum of their
+end minutes. That maximum never decreases, so an overlap query finds its
+candidates with two binary searches. The free gaps between blocks are
+precomputed in start order, so a free-time query is a binary search and
+then a walk over the gaps it returns.
+"""
+
+import bisect
+import re
+from itertools import accumulate
+
+DAY_MINUTES = 24 * 60
+
+# "HH:MM" from 00:00 to 23:59, or 24:00 for the end of the day
+TIME_PATTERN = r"^(([01]\d|2[0-3]):[0-5]\d|24:00)$"
+
+
+def to_minutes(time: str) -> int:
+    """Minutes since midnight of an "HH:MM" time ("24:00" is the end of the day)."""
+    if not isinstance(time, str) or not re.fullmatch(TIME_PATTERN, time):
+        raise ValueError(f"not an HH:MM time: {time!r}")
+    hours, minutes = time.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def to_time(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class DayIntervals:
+    """Half-open [start, end) intervals in minutes, each with an id."""
+
+    def __init__(self, intervals=()):
+        self._entries = sorted(intervals)
+        self._reindex()
+
+    def _reindex(self) -> None:
+        self._starts = [start for start, _, _ in self._entries]
+        self._max_ends = list(accumulate((end for _, end, _ in self._entries), max))
+        gaps = []
+        busy_until = 0
+        for start, end, _ in self._entries:
+            if end == start:
+                continue
+            if start > busy_until:
+                gaps.append((busy_until, start))
+            busy_until = max(busy_until, end)
+        if busy_until < DAY_MINUTES:
+            gaps.append((busy_until, DAY_MINUTES))
+        self._gaps = gaps
+        self._gap_ends = [end for _, end in gaps]
+
+    def add(self, start: int, end: int, item_id: str) -> None:
+        bisect.insort(self._entries, (start, end, item_id))
+        self._reindex()
+
+    def remove(self, item_id: str) -> None:
+        self._entries = [entry for entry in self._entries if entry[2] != item_id]
+        self._reindex()
+
+    def overlapping(self, start: int, end: int) -> list[str]:
+        """Ids of intervals that share time with [start, end), in start order."""
+        # Entries before `first` all end by `start`; entries from `last` on start at or after `end`
+        first = bisect.bisect_right(self._max_ends, start)
+        last = bisect.bisect_left(self._starts, end)
+        return [item_id for s, e, item_id in self._entries[first:last] if e > start]
+
+    def free(self, min_minutes: int, after: int = 0, before: int = DAY_MINUTES) -> list[tuple[int, int]]:
+        """Free [start, end) ranges of at least `min_minutes` within [after, before)."""
+        slots = []
+        for start, end in self._gaps[bisect.bisect_right(self._gap_ends, after):]:
+            if start >= before:
+                break
+            start, end = max(start, after), min(end, before)
+            if end - start >= min_minutes:
+                slots.append((start, end))
+        return slots
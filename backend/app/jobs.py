@@ -0,0 +1,145 @@
+"""Background jobs for work that may not fit in one API request.
+
+A job is a row in the jobs table plus an asynchronous invocation of this
+same Lambda carrying {"job": <id>}. Handlers must be idempotent: when an
+invocation runs low on time it re-invokes itself, and the handler resumes
+from whatever is still left in the database.
+"""
+
+import asyncio
+import json
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from botocore.exceptions import ClientError
+
+from app import aws
+from app.database import is_condition_failure, jobs_repo
+
+# Finished jobs are removed by the table's TTL
+JOB_RETENTION = timedelta(days=7)
+
+# Stop and re-invoke when less than this much of the invocation is left
+TIME_RESERVE_MS = 5000
+
+# An unfinished job not updated for this long is presumed dead and may be restarted
+STALE_AFTER = timedelta(minutes=15)
+
+HANDLERS = {}
+
+# Jobs running on the local development server's event loop
+_local_jobs: set[asyncio.Task] = set()
+
+
+def job_handler(kind: str):
+    """Register `async fn(job, deadline) -> bool` to run jobs of `kind`; it returns True once done."""
+    def register(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return register
+
+
+class Deadline:
+    def __init__(self, context=None):
+        self.context = context
+
+    def expired(self) -> bool:
+        # Local runs have no Lambda context and no time limit
+        return self.context is not None and self.context.get_remaining_time_in_millis() < TIME_RESERVE_MS
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def dispatch(job_id: str) -> None:
+    function_name = os.getenv("AWS_LAMBDA_FUNCTION_NAME")
+    if function_name:
+        async with aws.client("lambda") as client:
+            await client.invoke(
+                FunctionName=function_name,
+                InvocationType="Event",
+                Payload=json.dumps({"job": job_id}),
+            )
+    else:
+        # Local development server: run next to the request instead
+        task = asyncio.get_running_loop().create_task(execute_job(job_id))
+        _local_jobs.add(task)
+        task.add_done_callback(_local_jobs.discard)
+
+
+async def start_job(kind: str, payload: dict, total: int, job_id: str | None = None) -> dict | None:
+    """Record and dispatch a job.
+
+    With a fixed `job_id` the job is a singleton: None is returned while
+    one with that id is still live.
+    """
+    now = _now()
+    job = {
+        "id": job_id or str(uuid.uuid4()),
+        "kind": kind,
+        "status": "pending",
+        "payload": payload,
+        "total": total,
+        "done": 0,
+        "createdAt": now.isoformat(),
+        "updatedAt": now.isoformat(),
+        "expiresAt": int((now + JOB_RETENTION).timestamp()),
+    }
+    if job_id is None:
+        await jobs_repo.put(job)
+    else:
+        table = await jobs_repo.table()
+        try:
+            await table.put_item(
+                Item=job,
+                ConditionExpression="attribute_not_exists(id) OR #status IN (:completed, :failed) OR #updatedAt < :stale",
+                ExpressionAttributeNames={"#status": "status", "#updatedAt": "updatedAt"},
+                ExpressionAttributeValues={
+                    ":completed": "completed",
+                    ":failed": "failed",
+                    ":stale": (now - STALE_AFTER).isoformat(),
+                },
+            )
+        except ClientError as e:
+            if is_condition_failure(e):
+                return None
+            raise
+    await dispatch(job["id"])
+    return job
+
+
+async def add_progress(job_id: str, count: int) -> None:
+    table = await jobs_repo.table()
+    await table.update_item(
+        Key={"id": job_id},
+        UpdateExpression="ADD #done :count SET #status = :running, #updatedAt = :now",
+        ExpressionAttributeNames={"#done": "done", "#status": "status", "#updatedAt": "updatedAt"},
+        ExpressionAttributeValues={":count": count, ":running": "running", ":now": _now().isoformat()},
+    )
+
+
+async def execute_job(job_id: str, context=None) -> None:
+    job = await jobs_repo.get(job_id)
+    if job["status"] in ("completed", "failed"):
+        return
+
+    try:
+        finished = await HANDLERS[job["kind"]](job, Deadline(context))
+    except Exception as e:
+        await jobs_repo.update(job_id, {"status": "failed", "error": str(e), "updatedAt": _now().isoformat()})
+        raise
+
+    if finished:
+        await jobs_repo.update(job_id, {"status": "completed", "updatedAt": _now().isoformat()})
+    else:
+        await dispatch(job_id)
+
+
+def run_job(job_id: str, context=None) -> None:
+    """Lambda entry point for a job invocation.
+
+    Runs on the same event loop Mangum serves HTTP events on, so the
+    container's open DynamoDB connection is reused.
+    """
+    asyncio.get_event_loop().run_until_complete(execute_job(job_id, context))
@@ -1,6 +1,8 @@
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from mangum import Mangum
 
 from app.routes import (
     tasks_router,
@@ -15,12 +17,26 @@ from app.routes import (
     recipes_router,
     grocery_router,
     meal_plans_router,
+    jobs_router,
+    stats_router,
+    agenda_router,
 )
+from app.database import close_connection
+from app.jobs import run_job
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # uvicorn shutdown; Lambda containers are frozen with the connection open
+    await close_connection()
+
 
 app = FastAPI(
     title="Orangewall API",
     description="Backend API for Orangewall personal hub",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # CORS - allow all origins
@@ -46,12 +62,28 @@ app.include_router(preferences_router, prefix="/api")
 app.include_router(recipes_router, prefix="/api")
 app.include_router(grocery_router, prefix="/api")
 app.include_router(meal_plans_router, prefix="/api")
+app.include_router(jobs_router, prefix="/api")
+app.include_router(stats_router, prefix="/api")
+app.include_router(agenda_router, prefix="/api")
 
 
 @app.get("/health")
-def health_check():
+async def health_check():
     return {"status": "ok"}
 
 
-# Lambda handler
-handler = Mangum(app)
+# Lambda handler. Mangum is only needed for HTTP events, so job
+# invocations (and the import itself) skip loading it. Its lifespan support
+# stays off: it would run around every invocation and close the connection.
+@lru_cache(maxsize=None)
+def http_handler():
+    from mangum import Mangum
+
+    return Mangum(app, lifespan="off")
+
+
+def handler(event, context):
+    # Background jobs arrive as asynchronous self-invocations
+    if "job" in event:
+        return run_job(event["job"], context)
+    return http_handler()(event, context)
@@ -0,0 +1,146 @@
+"""Fractional ordering keys.
+
+A key is a variable-length integer part followed by an optional fraction,
+all in base-62 digits that sort in ASCII order. The head character gives
+the integer's length ("a" -> 2 characters, "b" -> 3, ..., "Z" -> 2 for
+negatives), so appending or prepending keeps keys short, while the fraction
+makes room between any two neighbours. Fractions never end in "0".
+"""
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+
+FIRST_KEY = "a0"
+SMALLEST_INTEGER = "A" + DIGITS[0] * 26
+
+
+def _integer_length(head: str) -> int:
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"Invalid order key head {head!r}")
+
+
+def _split(key: str) -> tuple[str, str]:
+    length = _integer_length(key[0])
+    if len(key) < length:
+        raise ValueError(f"Invalid order key {key!r}")
+    return key[:length], key[length:]
+
+
+def validate_key(key: str) -> str:
+    if not key or any(c not in DIGITS for c in key):
+        raise ValueError("Order key must be base-62 digits")
+    integer, fraction = _split(key)
+    if (integer == SMALLEST_INTEGER and not fraction) or fraction.endswith(DIGITS[0]):
+        raise ValueError(f"Invalid order key {key!r}")
+    return key
+
+
+def _midpoint(a: str, b: str | None) -> str:
+    """Fraction strictly between a and b, where "" is 0 and None is 1."""
+    if b is not None:
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else DIGITS[0]) == b[n]:
+            n += 1
+        if n:
+            return b[:n] + _midpoint(a[n:], b[n:])
+
+    low = DIGITS.index(a[0]) if a else 0
+    high = DIGITS.index(b[0]) if b is not None else len(DIGITS)
+    if high - low > 1:
+        return DIGITS[(low + high) // 2]
+    if b is not None and len(b) > 1:
+        return b[:1]
+    return DIGITS[low] + _midpoint(a[1:], None)
+
+
+def _increment(integer: str) -> str | None:
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        value = DIGITS.index(digits[i]) + 1
+        if value < len(DIGITS):
+            digits[i] = DIGITS[value]
+            return head + "".join(digits)
+        digits[i] = DIGITS[0]
+
+    # Carried out of every digit: move to the next integer length
+    if head == "Z":
+        return "a" + DIGITS[0]
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append(DIGITS[0])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _decrement(integer: str) -> str | None:
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        value = DIGITS.index(digits[i]) - 1
+        if value >= 0:
+            digits[i] = DIGITS[value]
+            return head + "".join(digits)
+        digits[i] = DIGITS[-1]
+
+    if head == "a":
+        return "Z" + DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def integer_key(n: int) -> str:
+    """The n-th key counting up from FIRST_KEY by repeated key_between(key, None)."""
+    width, start = 1, 0
+    while n >= start + len(DIGITS) ** width:
+        start += len(DIGITS) ** width
+        width += 1
+    value = n - start
+    digits = ""
+    for _ in range(width):
+        value, digit = divmod(value, len(DIGITS))
+        digits = DIGITS[digit] + digits
+    return chr(ord("a") + width - 1) + digits
+
+
+def key_between(a: str | None, b: str | None) -> str:
+    """Key sorting after `a` and before `b`; None means no bound on that side."""
+    if a is not None and b is not None and a >= b:
+        raise ValueError(f"{a!r} does not sort before {b!r}")
+
+    if a is None:
+        if b is None:
+            return FIRST_KEY
+        integer_b, fraction_b = _split(b)
+        if integer_b == SMALLEST_INTEGER:
+            return integer_b + _midpoint("", fraction_b)
+        if integer_b < b:
+            return integer_b
+        previous = _decrement(integer_b)
+        if previous is None:
+            raise ValueError("Cannot decrement any further")
+        return previous
+
+    integer_a, fraction_a = _split(a)
+    if b is None:
+        following = _increment(integer_a)
+        return following if following is not None else integer_a + _midpoint(fraction_a, None)
+
+    integer_b, fraction_b = _split(b)
+    if integer_a == integer_b:
+        return integer_a + _midpoint(fraction_a, fraction_b)
+    following = _increment(integer_a)
+    if following is None:
+        raise ValueError("Cannot increment any further")
+    if following < b:
+        return following
+    return integer_a + _midpoint(fraction_a, None)
@@ -0,0 +1,169 @@
+"""Manually ordered lists keyed by fractional `order` strings.
+
+There is always a key between any two others (see app.order_keys), so
+inserting or moving an item writes only that item, and no request counts
+or renumbers its siblings. Items added at the end take their key from an
+atomic per-list sequence, so concurrent appends never share a key.
+"""
+
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
+
+from app.database import (
+    SEQUENCES, Repository, add_to_counter, is_condition_failure, parallel_map, raise_counter,
+    tasks_repo, statuses_repo, kanban_columns_repo, kanban_cards_repo,
+)
+from app.jobs import job_handler, start_job
+from app.order_keys import integer_key, key_between
+from app.pagination import collection_query, query_all
+
+# Keys grow as items are squeezed between the same neighbours; past this
+# length the list is respaced in the background
+MAX_KEY_LENGTH = 24
+
+# Conditional writes per deadline check while rebalancing
+REBALANCE_SLICE = 200
+
+REBALANCE_JOB = "ordering.rebalance"
+
+
+class Ordering:
+    """Order keys for one table, scoped by a GSI whose range key is `order`.
+
+    `movable` tables let an item change scope (a card changing column);
+    placing it next to neighbours moves it into their scope.
+    """
+
+    def __init__(self, name: str, repo: Repository, index: str, scope_key: str, movable: bool = False):
+        self.name = name
+        self.repo = repo
+        self.index = index
+        self.scope_key = scope_key
+        self.movable = movable
+        ORDERINGS[name] = self
+
+    def _query(self, scope: str, descending: bool = False, below: str | None = None, above: str | None = None) -> dict:
+        kwargs = collection_query(scope, index=self.index, key=self.scope_key, descending=descending)
+        kwargs["ExpressionAttributeNames"]["#order"] = "order"
+        kwargs["ProjectionExpression"] = "#order"
+        if below is not None:
+            kwargs["KeyConditionExpression"] += " AND #order < :bound"
+            kwargs["ExpressionAttributeValues"][":bound"] = below
+        elif above is not None:
+            kwargs["KeyConditionExpression"] += " AND #order > :bound"
+            kwargs["ExpressionAttributeValues"][":bound"] = above
+        return kwargs
+
+    async def _neighbour(self, scope: str, **kwargs) -> str | None:
+        table = await self.repo.table()
+        items = (await table.query(**self._query(scope, **kwargs), Limit=1)).get("Items", [])
+        return items[0]["order"] if items else None
+
+    async def _checked(self, scope: str, key: str) -> str:
+        if len(key) > MAX_KEY_LENGTH:
+            await request_rebalance(self, scope)
+        return key
+
+    def sequence(self, scope: str) -> str:
+        return f"{self.name}:{scope}"
+
+    async def append(self, scope: str, count: int = 1) -> list[str]:
+        """Keys for `count` new items at the end of `scope`."""
+        end = await add_to_counter(SEQUENCES, self.sequence(scope), count)
+        return [integer_key(n) for n in range(end - count, end)]
+
+    async def between(self, after_id: str | None, before_id: str | None, scope: str | None = None) -> tuple[str, str]:
+        """Scope and key for an item placed after `after_id` and before `before_id`.
+
+        With only one neighbour given, the item goes directly next to it.
+        """
+        ids = [i for i in (after_id, before_id) if i]
+        neighbours = await self.repo.batch_get(ids, attributes=["id", "order", self.scope_key])
+        found = {item["id"]: item for item in neighbours}
+        for item_id in ids:
+            if item_id not in found:
+                raise HTTPException(status_code=404, detail=self.repo.not_found)
+            if scope is not None and found[item_id].get(self.scope_key) != scope:
+                raise HTTPException(status_code=400, detail="Neighbours must be in the same list")
+            scope = found[item_id].get(self.scope_key)
+
+        after = found[after_id]["order"] if after_id else None
+        before = found[before_id]["order"] if before_id else None
+        if after_id and not before_id:
+            before = await self._neighbour(scope, above=after)
+            if before is None:
+                return scope, (await self.append(scope))[0]
+        elif before_id and not after_id:
+            after = await self._neighbour(scope, descending=True, below=before)
+
+        try:
+            key = key_between(after, before)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="afterId must come before beforeId")
+        return scope, await self._checked(scope, key)
+
+    async def apply_move(self, updates: dict) -> dict:
+        """Resolve afterId/beforeId in a partial update into an `order` key.
+
+        On movable tables, changing scope without neighbours appends.
+        """
+        after_id = updates.pop("afterId", None)
+        before_id = updates.pop("beforeId", None)
+        scope = updates.get(self.scope_key) if self.movable else None
+        if after_id or before_id:
+            scope, updates["order"] = await self.between(after_id, before_id, scope)
+            if self.movable:
+                updates[self.scope_key] = scope
+        elif scope is not None and "order" not in updates:
+            updates["order"] = (await self.append(scope))[0]
+        return updates
+
+    async def rebalance(self, scope: str, deadline=None) -> bool:
+        """Rewrite `scope` with consecutive short keys; False if the deadline cut it short."""
+        items = await query_all(await self.repo.table(), **self._query(scope) | {"ProjectionExpression": "#order, id"})
+        # Later appends must sort after every rewritten key
+        await raise_counter(SEQUENCES, self.sequence(scope), len(items))
+        keys = [integer_key(n) for n in range(len(items))]
+        changes = [(item, key) for item, key in zip(items, keys) if item["order"] != key]
+        for start in range(0, len(changes), REBALANCE_SLICE):
+            if deadline is not None and deadline.expired():
+                return False
+            await parallel_map(lambda change: self._rekey(*change), changes[start:start + REBALANCE_SLICE])
+            await self.repo.written()
+        return True
+
+    async def _rekey(self, item: dict, key: str) -> None:
+        # Skip items that moved while the rebalance was running
+        table = await self.repo.table()
+        try:
+            await table.update_item(
+                Key={"id": item["id"]},
+                UpdateExpression="SET #order = :key",
+                ConditionExpression="#order = :old",
+                ExpressionAttributeNames={"#order": "order"},
+                ExpressionAttributeValues={":key": key, ":old": item["order"]},
+            )
+        except ClientError as e:
+            if not is_condition_failure(e):
+                raise
+
+
+ORDERINGS: dict[str, Ordering] = {}
+
+tasks_ordering = Ordering("tasks", tasks_repo, "collection-index", "collection")
+statuses_ordering = Ordering("statuses", statuses_repo, "collection-index", "collection")
+columns_ordering = Ordering("kanban_columns", kanban_columns_repo, "board-index", "boardId")
+cards_ordering = Ordering("kanban_cards", kanban_cards_repo, "column-index", "columnId", movable=True)
+
+
+async def request_rebalance(ordering: Ordering, scope: str) -> None:
+    # One job per list; a running job is not started twice
+    await start_job(
+        REBALANCE_JOB, {"ordering": ordering.name, "scope": scope}, total=0,
+        job_id=f"rebalance-{ordering.name}-{scope}",
+    )
+
+
+@job_handler(REBALANCE_JOB)
+async def rebalance_job(job: dict, deadline) -> bool:
+    return await ORDERINGS[job["payload"]["ordering"]].rebalance(job["payload"]["scope"], deadline)
@@ -0,0 +1,180 @@
+import base64
+import binascii
+import json
+from decimal import Decimal
+from fastapi import HTTPException, Query
+
+from app.database import parallel_map
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Every sorted collection carries a constant "collection" attribute so a GSI
+# keyed on it can return the whole table in sort-key order.
+COLLECTION_INDEX = "collection-index"
+
+
+class PageParams:
+    """Query parameters shared by every paginated list endpoint."""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: str | None = None,
+    ):
+        self.limit = limit
+        self.cursor = cursor
+
+
+def _encode_number(value):
+    if isinstance(value, Decimal):
+        return int(value) if value % 1 == 0 else float(value)
+    raise TypeError(f"Cannot encode {type(value).__name__} in cursor")
+
+
+def encode_cursor(stage: int, start_key: dict | None) -> str:
+    payload = json.dumps({"s": stage, "k": start_key}, default=_encode_number, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None) -> tuple[int, dict | None]:
+    if not cursor:
+        return 0, None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded), parse_float=Decimal)
+        return int(payload["s"]), payload["k"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def collection_query(
+    collection: str,
+    index: str = COLLECTION_INDEX,
+    key: str = "collection",
+    descending: bool = False,
+) -> dict:
+    """Query kwargs that read a whole collection in sort-key order."""
+    return {
+        "IndexName": index,
+        "KeyConditionExpression": "#pk = :pk",
+        "ExpressionAttributeNames": {"#pk": key},
+        "ExpressionAttributeValues": {":pk": collection},
+        "ScanIndexForward": not descending,
+    }
+
+
+def with_filter(kwargs: dict, expression: str, names: dict | None = None, values: dict | None = None) -> dict:
+    """Return a copy of query kwargs with an extra FilterExpression ANDed in."""
+    kwargs = dict(kwargs)
+    if kwargs.get("FilterExpression"):
+        kwargs["FilterExpression"] = f"({kwargs['FilterExpression']}) AND ({expression})"
+    else:
+        kwargs["FilterExpression"] = expression
+    if names:
+        kwargs["ExpressionAttributeNames"] = {**kwargs.get("ExpressionAttributeNames", {}), **names}
+    if values:
+        kwargs["ExpressionAttributeValues"] = {**kwargs.get("ExpressionAttributeValues", {}), **values}
+    return kwargs
+
+
+def with_projection(kwargs: dict, attributes) -> dict:
+    """Return a copy of query kwargs that reads only `attributes`."""
+    names = {f"#p_{a}": a for a in attributes}
+    return {
+        **kwargs,
+        "ProjectionExpression": ", ".join(names),
+        "ExpressionAttributeNames": {**kwargs.get("ExpressionAttributeNames", {}), **names},
+    }
+
+
+async def _fetch_page(fetch, page: PageParams, stages: list[dict]) -> dict:
+    stage, start_key = decode_cursor(page.cursor)
+    items = []
+
+    # Keep following LastEvaluatedKey until the page is full: filters may
+    # drop items after DynamoDB has applied Limit.
+    while stage < len(stages) and len(items) < page.limit:
+        kwargs = dict(stages[stage], Limit=page.limit - len(items))
+        if start_key:
+            kwargs["ExclusiveStartKey"] = start_key
+        response = await fetch(**kwargs)
+        items.extend(response.get("Items", []))
+        start_key = response.get("LastEvaluatedKey")
+        if not start_key:
+            stage += 1
+
+    next_cursor = encode_cursor(stage, start_key) if stage < len(stages) else None
+    return {"items": items, "nextCursor": next_cursor}
+
+
+async def query_page(table, page: PageParams, *stages: dict) -> dict:
+    """Return one page from a sequence of queries.
+
+    Stages are read in order, so e.g. pinned notes can be served before the
+    rest without merging in memory. The cursor records the current stage and
+    the LastEvaluatedKey within it.
+    """
+    return await _fetch_page(table.query, page, list(stages))
+
+
+async def query_page_parallel(table, page: PageParams, *stages: dict, key_attributes) -> dict:
+    """Return one page from queries over disjoint, ordered partitions.
+
+    Every stage covers a range of the sort order that the next one follows
+    (e.g. one month bucket each), so the merged result is the stages'
+    concatenation. The remaining stages are queried concurrently rather than
+    one after another. The cursor holds a start key built from
+    `key_attributes` of the last item returned.
+    """
+    first, start_key = decode_cursor(page.cursor)
+
+    async def fetch(stage: int) -> dict:
+        kwargs = dict(stages[stage], Limit=page.limit)
+        if stage == first and start_key:
+            kwargs["ExclusiveStartKey"] = start_key
+        return await table.query(**kwargs)
+
+    responses = await parallel_map(fetch, range(first, len(stages)))
+    items = []
+    for stage, response in enumerate(responses, first):
+        found = response.get("Items", [])
+        last_key = response.get("LastEvaluatedKey")
+        taken = found[:page.limit - len(items)]
+        items.extend(taken)
+        if len(taken) < len(found):
+            return {"items": items, "nextCursor": encode_cursor(stage, {a: taken[-1][a] for a in key_attributes})}
+        if last_key:
+            # Later stages sort after the rest of this one, so they wait
+            return {"items": items, "nextCursor": encode_cursor(stage, last_key)}
+        if len(items) == page.limit:
+            next_cursor = encode_cursor(stage + 1, None) if stage + 1 < len(stages) else None
+            return {"items": items, "nextCursor": next_cursor}
+    return {"items": items, "nextCursor": None}
+
+
+async def query_all(table, **kwargs) -> list[dict]:
+    """Follow LastEvaluatedKey until the query is exhausted."""
+    items = []
+    while True:
+        response = await table.query(**kwargs)
+        items.extend(response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            return items
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+async def scan_all(table, **kwargs) -> list[dict]:
+    """Follow LastEvaluatedKey until the scan is exhausted."""
+    items = []
+    while True:
+        response = await table.scan(**kwargs)
+        items.extend(response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            return items
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+async def scan_page(table, page: PageParams, **kwargs) -> dict:
+    """Return one page of an unordered table scan."""
+    return await _fetch_page(table.scan, page, [kwargs])
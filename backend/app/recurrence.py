@@ -0,0 +1,120 @@
+"""Expansion of recurring calendar events into occurrences.
+
+A series is stored once: its `date` is the first occurrence and its
+`recurrence` an RRULE-style rule (freq, interval, byWeekday, until or
+count, exdates). Reads expand only the occurrences inside the requested
+window, and a warm instance keeps each series' expansion per window.
+"""
+
+from datetime import date, timedelta
+from functools import lru_cache
+from itertools import islice
+from typing import Iterator
+
+# Open-ended series end after every real date
+OPEN_END = "9999-12-31"
+
+EXPANSION_CACHE_SIZE = 4096
+
+
+def rule_key(rule: dict) -> tuple:
+    """A stored rule as a hashable key; DynamoDB returns its numbers as Decimal."""
+    return (
+        rule["freq"],
+        int(rule.get("interval") or 1),
+        tuple(sorted({int(d) for d in rule.get("byWeekday") or ()})),
+        rule.get("until"),
+        int(rule["count"]) if rule.get("count") else None,
+        frozenset(rule.get("exdates") or ()),
+    )
+
+
+def _dates(first: date, freq: str, interval: int, weekdays: tuple) -> Iterator[date]:
+    """Every date the rule produces from `first` on, ignoring its end and exceptions.
+
+    Monthly and yearly rules skip months and years without the day
+    (e.g. the 31st, or 29 February), as RFC 5545 does.
+    """
+    if freq == "daily":
+        day = first
+        while True:
+            yield day
+            day += timedelta(days=interval)
+    elif freq == "weekly":
+        week = first - timedelta(days=first.weekday())
+        offsets = weekdays or (first.weekday(),)
+        while True:
+            for offset in offsets:
+                day = week + timedelta(days=offset)
+                if day >= first:
+                    yield day
+            week += timedelta(weeks=interval)
+    else:
+        step = interval * (12 if freq == "yearly" else 1)
+        for n in range(0, (date.max.year - first.year) * 12, step):
+            month = first.month - 1 + n
+            try:
+                yield date(first.year + month // 12, month % 12 + 1, first.day)
+            except ValueError:
+                continue
+
+
+def _period_days(freq: str, interval: int) -> int | None:
+    return {"daily": interval, "weekly": 7 * interval}.get(freq)
+
+
+def occurrences(start: str, rule: tuple, after: date) -> Iterator[date]:
+    """Occurrences of a series on or after `after`, in order, up to its end."""
+    freq, interval, weekdays, until, count, exdates = rule
+    first = date.fromisoformat(start)
+    period = _period_days(freq, interval)
+    if count is None and period and after > first:
+        # Without a count, whole periods before `after` can be skipped
+        first += timedelta(days=(after - first).days // period * period)
+    dates = _dates(first, freq, interval, weekdays)
+    if count is not None:
+        dates = islice(dates, count)
+    last = date.fromisoformat(until) if until else date.max
+    for day in dates:
+        if day > last:
+            return
+        if day >= after and day.isoformat() not in exdates:
+            yield day
+
+
+@lru_cache(maxsize=EXPANSION_CACHE_SIZE)
+def occurrence_dates(start: str, rule: tuple, window_start: str, window_end: str) -> tuple[str, ...]:
+    """ISO dates of a series' occurrences within the window, inclusive.
+
+    The rule is part of the key, so editing a series never hits a stale entry.
+    """
+    end = date.fromisoformat(window_end)
+    dates = []
+    for day in occurrences(start, rule, date.fromisoformat(window_start)):
+        if day > end:
+            break
+        dates.append(day.isoformat())
+    return tuple(dates)
+
+
+def recurrence_end(start: str, rule: tuple) -> str:
+    """The last date a series can occur on, or OPEN_END."""
+    freq, interval, weekdays, until, count, _ = rule
+    if until:
+        return until
+    if count is None:
+        return OPEN_END
+    last = first = date.fromisoformat(start)
+    for last in islice(_dates(first, freq, interval, weekdays), count):
+        pass
+    return last.isoformat()
+
+
+def expand(event: dict, window_start: str, window_end: str) -> list[dict]:
+    """The occurrences of a stored series inside the window, as events.
+
+    Each keeps the series id; `seriesStart` is the date the series is stored under.
+    """
+    dates = occurrence_dates(event["date"], rule_key(event["recurrence"]), window_start, window_end)
+    time = event.get("startTime") or ""
+    return [{**event, "date": d, "dateTime": f"{d}#{time}", "seriesStart": event["date"]} for d in dates]
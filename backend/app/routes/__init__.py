@@ -10,6 +10,9 @@ from .preferences import router as preferences_router
 from .recipes import router as recipes_router
 from .grocery import router as grocery_router
 from .meal_plans import router as meal_plans_router
+from .jobs import router as jobs_router
+from .stats import router as stats_router
+from .agenda import router as agenda_router
 
 __all__ = [
     "tasks_router",
@@ -24,4 +27,7 @@ __all__ = [
     "recipes_router",
     "grocery_router",
     "meal_plans_router",
+    "jobs_router",
+    "stats_router",
+    "agenda_router",
 ]
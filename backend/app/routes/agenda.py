@@ -0,0 +1,118 @@
+import asyncio
+import heapq
+from datetime import date, timedelta
+from fastapi import APIRouter, Query, Request
+
+from app.cache import TTLCache
+from app.database import (
+    CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS,
+    calendar_events_repo, routines_repo, schedule_blocks_repo, tasks_repo,
+)
+from app.etag import versioned
+from app.pagination import collection_query, query_all, with_filter
+from app.routes.calendar import events_between
+from app.routes.routines import check_window, due_routines
+from app.routes.schedule import DAY_ORDER
+from app.routes.tasks import due_query
+from app.schemas import AgendaResponse
+
+router = APIRouter(prefix="/agenda", tags=["agenda"])
+
+# A six-week month grid
+MAX_AGENDA_DAYS = 42
+
+# Keyed by window and the ETag of the four tables, so entries never go
+# stale; the TTL only bounds how long unused windows are kept
+agenda_cache = TTLCache("agenda", CACHE_TTL_SECONDS, CACHE_MAX_ENTRIES)
+
+
+def days(start: date, end: date) -> list[date]:
+    return [start + timedelta(days=n) for n in range((end - start).days + 1)]
+
+
+def agenda_key(item: dict) -> tuple[str, str]:
+    # All-day and untimed items come first in their day
+    return item["date"], item.get("startTime") or ""
+
+
+async def event_items(start: date, end: date) -> list[dict]:
+    # Events come sorted by date and start time; all-day ones move to the top of their day
+    items = [
+        {
+            "kind": "event",
+            "id": event["id"],
+            "title": event["title"],
+            "date": event["date"],
+            "startTime": None if event.get("allDay") else event.get("startTime"),
+            "endTime": None if event.get("allDay") else event.get("endTime"),
+            "color": event.get("color"),
+        }
+        for event in await events_between(start, end)
+    ]
+    return sorted(items, key=agenda_key)
+
+
+async def block_items(start: date, end: date) -> list[dict]:
+    """Weekly blocks placed on every matching date; they are read in start-time order."""
+    table = await schedule_blocks_repo.table()
+    blocks = await query_all(table, **collection_query("schedule_blocks"))
+    by_weekday: dict[int, list[dict]] = {}
+    for block in blocks:
+        if block.get("day") in DAY_ORDER:
+            by_weekday.setdefault(DAY_ORDER[block["day"]], []).append(block)
+    return [
+        {
+            "kind": "block",
+            "id": block["id"],
+            "title": block["title"],
+            "date": day.isoformat(),
+            "startTime": block["startTime"],
+            "endTime": block["endTime"],
+            "color": block.get("color"),
+        }
+        for day in days(start, end)
+        for block in by_weekday.get(day.weekday(), [])
+    ]
+
+
+async def routine_items(start: date, end: date) -> list[dict]:
+    return [
+        {"kind": "routine", "id": routine["id"], "title": routine["title"], "date": day["date"],
+         "color": routine.get("color")}
+        for day in await due_routines(start, end)
+        for routine in day["routines"]
+    ]
+
+
+async def task_items(start: date, end: date) -> list[dict]:
+    """Open tasks due in the window, read from the due-index in due-date order."""
+    query = with_filter(
+        due_query(start, end), "#status <> :completed", {"#status": "status"}, {":completed": "completed"},
+    )
+    return [
+        {"kind": "task", "id": task["id"], "title": task["title"], "date": task["dueDate"][:10]}
+        for task in await query_all(await tasks_repo.table(), **query)
+    ]
+
+
+@router.get(
+    "",
+    response_model=AgendaResponse,
+    dependencies=[versioned(calendar_events_repo, routines_repo, schedule_blocks_repo, tasks_repo)],
+)
+async def get_agenda(request: Request, start: date = Query(alias="from"), end: date = Query(alias="to")):
+    """Events, schedule blocks, due routines and open tasks due from `from` to
+    `to`, inclusive, as one stream in date and time order.
+
+    Each source is read concurrently and is already in that order, so the
+    stream is a k-way merge of the four.
+    """
+    check_window(start, end, MAX_AGENDA_DAYS)
+
+    async def load():
+        sources = await asyncio.gather(
+            event_items(start, end), block_items(start, end), routine_items(start, end), task_items(start, end),
+        )
+        return {"items": list(heapq.merge(*sources, key=agenda_key))}
+
+    return await agenda_cache.get((start, end, request.state.etag), load)
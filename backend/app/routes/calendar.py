@@ -1,30 +1,126 @@
+import asyncio
 import uuid
-from fastapi import APIRouter, HTTPException
+from datetime import date, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query
 
-from app.database import calendar_events_table
-from app.schemas import EventCreate, EventUpdate, EventResponse
+from app.database import calendar_events_repo, parallel_map, set_fields
+from app.etag import versioned
+from app.pagination import PageParams, collection_query, decode_cursor, query_all, query_page, query_page_parallel
+from app.recurrence import expand, recurrence_end, rule_key
+from app.batch import run_batch
+from app.schemas import Page, BatchRequest, BatchResponse, EventCreate, EventUpdate, EventResponse
 
 router = APIRouter(prefix="/calendar", tags=["calendar"])
 
+# Events are bucketed by month ("YYYY-MM"), so a month view queries a
+# single partition. Recurring events share one bucket of their own and are
+# expanded when read.
+MONTH_INDEX = "month-index"
+SERIES_BUCKET = "recurring"
+MAX_RANGE_MONTHS = 24
+
+
+def index_attributes(event: dict) -> dict:
+    """Index keys for an event: sorted by date, then start time."""
+    event_date = event.get("date", "")
+    attributes = {
+        "collection": "calendar_events",
+        "month": event_date[:7],
+        "dateTime": f"{event_date}#{event.get('startTime') or ''}",
+    }
+    if event.get("recurrence"):
+        attributes["month"] = SERIES_BUCKET
+        attributes["recurrenceEnd"] = recurrence_end(event_date, rule_key(event["recurrence"]))
+    return attributes
+
+
+def patch_index_attributes(event: EventUpdate, updates: dict) -> dict:
+    """The index keys a patch determines by itself, to be written with it.
+
+    dateTime needs the date and start time; the month bucket, and a series'
+    end, also depend on whether the event repeats. Keys the patch leaves
+    open are fixed up by index_attributes in a second write, if they moved.
+    """
+    if event.date is None:
+        return {}
+    known = index_attributes(updates)
+    attributes = {}
+    if event.startTime is not None:
+        attributes["dateTime"] = known["dateTime"]
+    if "recurrence" in event.model_fields_set:
+        attributes["month"] = known["month"]
+        if "recurrenceEnd" in known:
+            attributes["recurrenceEnd"] = known["recurrenceEnd"]
+    return attributes
+
+
+def months(start: date, end: date) -> list[str]:
+    """Month buckets from `start` to `end`, inclusive."""
+    first, last = start.year * 12 + start.month - 1, end.year * 12 + end.month - 1
+    return [f"{m // 12:04d}-{m % 12 + 1:02d}" for m in range(first, last + 1)]
+
+
+def range_queries(start: date, end: date) -> list[dict]:
+    """One query per month bucket, in date order."""
+    buckets = months(start, end)
+    if len(buckets) > MAX_RANGE_MONTHS:
+        raise HTTPException(status_code=400, detail=f"Date range is limited to {MAX_RANGE_MONTHS} months")
+    # dateTime is "date#time", so every event on `end` sorts before the next day
+    bounds = {":start": start.isoformat(), ":end": (end + timedelta(days=1)).isoformat()}
+    return [
+        {
+            "IndexName": MONTH_INDEX,
+            "KeyConditionExpression": "#month = :month AND #dateTime BETWEEN :start AND :end",
+            "ExpressionAttributeNames": {"#month": "month", "#dateTime": "dateTime"},
+            "ExpressionAttributeValues": {":month": month, **bounds},
+        }
+        for month in buckets
+    ]
+
+
+def series_query(start: date, end: date) -> dict:
+    """Recurring events that start by `end` and have not ended before `start`."""
+    return {
+        "IndexName": MONTH_INDEX,
+        "KeyConditionExpression": "#month = :month AND #dateTime < :end",
+        "FilterExpression": "#recurrenceEnd >= :start",
+        "ExpressionAttributeNames": {"#month": "month", "#dateTime": "dateTime", "#recurrenceEnd": "recurrenceEnd"},
+        "ExpressionAttributeValues": {
+            ":month": SERIES_BUCKET,
+            ":start": start.isoformat(),
+            ":end": (end + timedelta(days=1)).isoformat(),
+        },
+    }
 
-@router.get("/events", response_model=list[EventResponse])
-def get_events():
-    response = calendar_events_table.scan()
-    items = response.get("Items", [])
-    return sorted(items, key=lambda x: (x.get("date", ""), x.get("startTime", "")))
 
+def position(buckets: list[str], cursor: str | None) -> tuple[str, str] | None:
+    """The (dateTime, id) a range cursor resumes after; None once the range is done."""
+    if not cursor:
+        return None
+    stage, start_key = decode_cursor(cursor)
+    if start_key:
+        return start_key["dateTime"], start_key["id"]
+    # A bucket's events all sort after its own "YYYY-MM"
+    return buckets[stage], ""
 
-@router.get("/events/{event_id}", response_model=EventResponse)
-def get_event(event_id: str):
-    response = calendar_events_table.get_item(Key={"id": event_id})
-    item = response.get("Item")
-    if not item:
-        raise HTTPException(status_code=404, detail="Event not found")
-    return item
 
+def sort_key(event: dict) -> tuple[str, str]:
+    return event["dateTime"], event["id"]
 
-@router.post("/events", response_model=EventResponse, status_code=201)
-def create_event(event: EventCreate):
+
+async def events_between(start: date, end: date) -> list[dict]:
+    """Every event and occurrence from `start` to `end`, inclusive, in date order."""
+    table = await calendar_events_repo.table()
+    buckets, series = await asyncio.gather(
+        parallel_map(lambda query: query_all(table, **query), range_queries(start, end)),
+        query_all(table, **series_query(start, end)),
+    )
+    window = (start.isoformat(), end.isoformat())
+    occurrences = [occurrence for event in series for occurrence in expand(event, *window)]
+    return sorted([event for bucket in buckets for event in bucket] + occurrences, key=sort_key)
+
+
+def new_event(event: EventCreate) -> dict:
     item = {
         "id": str(uuid.uuid4()),
         "title": event.title,
@@ -35,44 +131,79 @@ def create_event(event: EventCreate):
         "color": event.color,
         "description": event.description,
     }
-    calendar_events_table.put_item(Item=item)
+    if event.recurrence:
+        item["recurrence"] = event.recurrence.model_dump(mode="json", exclude_none=True)
+    item.update(index_attributes(item))
     return item
 
 
+@router.get("/events", response_model=Page[EventResponse], dependencies=[versioned(calendar_events_repo)])
+async def get_events(
+    page: PageParams = Depends(),
+    start: date | None = Query(None, alias="from"),
+    end: date | None = Query(None, alias="to"),
+):
+    """Every stored event in date order, or with `from` and `to` the events and
+    occurrences of recurring events in that inclusive range.
+
+    `limit` counts stored events. Each page of a range also carries the
+    occurrences that fall between its first and last stored event.
+    """
+    table = await calendar_events_repo.table()
+    if start is None and end is None:
+        return await query_page(table, page, collection_query("calendar_events"))
+    if start is None or end is None:
+        raise HTTPException(status_code=400, detail="Both from and to are required")
+    if end < start:
+        raise HTTPException(status_code=400, detail="to must not be before from")
+
+    buckets = months(start, end)
+    result, series = await asyncio.gather(
+        query_page_parallel(table, page, *range_queries(start, end), key_attributes=("id", "month", "dateTime")),
+        query_all(table, **series_query(start, end)),
+    )
+    after, until = position(buckets, page.cursor), position(buckets, result["nextCursor"])
+    window = (start.isoformat(), end.isoformat())
+    occurrences = [
+        occurrence
+        for event in series
+        for occurrence in expand(event, *window)
+        if (after is None or sort_key(occurrence) > after) and (until is None or sort_key(occurrence) <= until)
+    ]
+    return {"items": sorted(result["items"] + occurrences, key=sort_key), "nextCursor": result["nextCursor"]}
+
+
+@router.get("/events/{event_id}", response_model=EventResponse, dependencies=[versioned(calendar_events_repo)])
+async def get_event(event_id: str):
+    return await calendar_events_repo.get(event_id)
+
+
+@router.post("/events", response_model=EventResponse, status_code=201)
+async def create_event(event: EventCreate):
+    return await calendar_events_repo.put(new_event(event))
+
+
 @router.patch("/events/{event_id}", response_model=EventResponse)
-def update_event(event_id: str, event: EventUpdate):
-    response = calendar_events_table.get_item(Key={"id": event_id})
-    item = response.get("Item")
-    if not item:
-        raise HTTPException(status_code=404, detail="Event not found")
-
-    update_expr = []
-    expr_values = {}
-    expr_names = {}
-
-    for field in ["title", "date", "startTime", "endTime", "allDay", "color", "description"]:
-        value = getattr(event, field)
-        if value is not None:
-            update_expr.append(f"#{field} = :{field}")
-            expr_values[f":{field}"] = value
-            expr_names[f"#{field}"] = field
-
-    if update_expr:
-        calendar_events_table.update_item(
-            Key={"id": event_id},
-            UpdateExpression="SET " + ", ".join(update_expr),
-            ExpressionAttributeValues=expr_values,
-            ExpressionAttributeNames=expr_names,
-        )
-
-    response = calendar_events_table.get_item(Key={"id": event_id})
-    return response.get("Item")
+async def update_event(event_id: str, event: EventUpdate):
+    updates, remove = set_fields(event), []
+    if event.recurrence:
+        updates["recurrence"] = event.recurrence.model_dump(mode="json", exclude_none=True)
+    elif "recurrence" in event.model_fields_set:
+        remove = ["recurrence", "recurrenceEnd"]
+    updates.update(patch_index_attributes(event, updates))
+    return await calendar_events_repo.update(event_id, updates, remove=remove, derive=index_attributes)
 
 
 @router.delete("/events/{event_id}", status_code=204)
-def delete_event(event_id: str):
-    response = calendar_events_table.get_item(Key={"id": event_id})
-    if not response.get("Item"):
-        raise HTTPException(status_code=404, detail="Event not found")
-    calendar_events_table.delete_item(Key={"id": event_id})
+async def delete_event(event_id: str):
+    await calendar_events_repo.delete(event_id)
     return None
+
+
+@router.post("/events/batch", response_model=BatchResponse[EventResponse])
+async def batch_events(batch: BatchRequest):
+    return await run_batch(
+        calendar_events_repo, batch.operations,
+        EventCreate, lambda events: [new_event(e) for e in events],
+        EventUpdate, update_event,
+    )
@@ -1,31 +1,21 @@
 import uuid
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends
 
-from app.database import contacts_table
-from app.schemas import ContactCreate, ContactUpdate, ContactResponse
+from app.database import contacts_repo, set_fields
+from app.etag import versioned
+from app.pagination import PageParams, collection_query, query_page, with_filter
+from app.batch import run_batch
+from app.schemas import Page, BatchRequest, BatchResponse, ContactCreate, ContactUpdate, ContactResponse
 
 router = APIRouter(prefix="/contacts", tags=["contacts"])
 
 
-@router.get("", response_model=list[ContactResponse])
-def get_contacts():
-    response = contacts_table.scan()
-    items = response.get("Items", [])
-    # Sort alphabetically by name
-    return sorted(items, key=lambda x: x.get("name", "").lower())
+def index_attributes(contact: dict) -> dict:
+    """Index keys for a contact: sorted case-insensitively by name."""
+    return {"collection": "contacts", "nameSort": contact.get("name", "").lower()}
 
 
-@router.get("/{contact_id}", response_model=ContactResponse)
-def get_contact(contact_id: str):
-    response = contacts_table.get_item(Key={"id": contact_id})
-    item = response.get("Item")
-    if not item:
-        raise HTTPException(status_code=404, detail="Contact not found")
-    return item
-
-
-@router.post("", response_model=ContactResponse, status_code=201)
-def create_contact(contact: ContactCreate):
+def new_contact(contact: ContactCreate) -> dict:
     item = {
         "id": str(uuid.uuid4()),
         "name": contact.name,
@@ -37,50 +27,46 @@ def create_contact(contact: ContactCreate):
         "lastContact": contact.lastContact,
         "nextFollowUp": contact.nextFollowUp,
     }
-    contacts_table.put_item(Item=item)
+    item.update(index_attributes(item))
     return item
 
 
+@router.get("", response_model=Page[ContactResponse], dependencies=[versioned(contacts_repo)])
+async def get_contacts(category: str | None = None, page: PageParams = Depends()):
+    query = collection_query("contacts")
+    if category is not None:
+        query = with_filter(query, "#category = :category", {"#category": "category"}, {":category": category})
+    return await query_page(await contacts_repo.table(), page, query)
+
+
+@router.get("/{contact_id}", response_model=ContactResponse, dependencies=[versioned(contacts_repo)])
+async def get_contact(contact_id: str):
+    return await contacts_repo.get(contact_id)
+
+
+@router.post("", response_model=ContactResponse, status_code=201)
+async def create_contact(contact: ContactCreate):
+    return await contacts_repo.put(new_contact(contact))
+
+
 @router.patch("/{contact_id}", response_model=ContactResponse)
-def update_contact(contact_id: str, contact: ContactUpdate):
-    response = contacts_table.get_item(Key={"id": contact_id})
-    item = response.get("Item")
-    if not item:
-        raise HTTPException(status_code=404, detail="Contact not found")
-
-    update_expr = []
-    expr_values = {}
-    expr_names = {}
-
-    for field in ["name", "company", "role", "category", "notes", "lastContact", "nextFollowUp"]:
-        value = getattr(contact, field)
-        if value is not None:
-            update_expr.append(f"#{field} = :{field}")
-            expr_values[f":{field}"] = value
-            expr_names[f"#{field}"] = field
-
-    # Handle links separately (it's a list of objects)
-    if contact.links is not None:
-        update_expr.append("#links = :links")
-        expr_values[":links"] = [link.model_dump() for link in contact.links]
-        expr_names["#links"] = "links"
-
-    if update_expr:
-        contacts_table.update_item(
-            Key={"id": contact_id},
-            UpdateExpression="SET " + ", ".join(update_expr),
-            ExpressionAttributeValues=expr_values,
-            ExpressionAttributeNames=expr_names,
-        )
-
-    response = contacts_table.get_item(Key={"id": contact_id})
-    return response.get("Item")
+async def update_contact(contact_id: str, contact: ContactUpdate):
+    updates = set_fields(contact)
+    if contact.name is not None:
+        updates.update(index_attributes(updates))
+    return await contacts_repo.update(contact_id, updates)
 
 
 @router.delete("/{contact_id}", status_code=204)
-def delete_contact(contact_id: str):
-    response = contacts_table.get_item(Key={"id": contact_id})
-    if not response.get("Item"):
-        raise HTTPException(status_code=404, detail="Contact not found")
-    contacts_table.delete_item(Key={"id": contact_id})
+async def delete_contact(contact_id: str):
+    await contacts_repo.delete(contact_id)
     return None
+
+
+@router.post("/batch", response_model=BatchResponse[ContactResponse])
+async def batch_contacts(batch: BatchRequest):
+    return await run_batch(
+        contacts_repo, batch.operations,
+        ContactCreate, lambda contacts: [new_contact(c) for c in contacts],
+        ContactUpdate, update_contact,
+    )
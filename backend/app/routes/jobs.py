@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+
+from app.database import jobs_repo
+from app.schemas import JobResponse
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    return await jobs_repo.get(job_id)
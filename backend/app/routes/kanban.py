@@ -1,239 +1,193 @@
+import asyncio
 import uuid
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
 
-from app.database import kanban_boards_table, kanban_columns_table, kanban_cards_table
+from app.database import (
+    kanban_boards_repo, kanban_columns_repo, kanban_cards_repo,
+    parallel_map, set_fields,
+)
+from app.etag import versioned
+from app.jobs import add_progress, job_handler, start_job
+from app.ordering import columns_ordering, cards_ordering
+from app.pagination import PageParams, collection_query, query_all, query_page, scan_page
 from app.schemas import (
-    BoardCreate, BoardUpdate, BoardResponse,
+    Page,
+    BoardCreate, BoardUpdate, BoardResponse, BoardFullResponse,
     ColumnCreate, ColumnUpdate, ColumnResponse,
     CardCreate, CardUpdate, CardResponse,
+    JobResponse,
 )
 
 router = APIRouter(prefix="/kanban", tags=["kanban"])
 
+# Cascades touching more cards than this run as a background job
+CASCADE_INLINE_LIMIT = 1000
+
+# Cards deleted per concurrent batch writer, and per progress update in jobs
+DELETE_SLICE = 250
+
+DELETE_COLUMNS_JOB = "kanban.delete_columns"
+
+
+async def board_columns(board_id: str, **kwargs) -> list[dict]:
+    table = await kanban_columns_repo.table()
+    return await query_all(table, **collection_query(board_id, index="board-index", key="boardId"), **kwargs)
+
+
+async def column_cards(column_id: str, **kwargs) -> list[dict]:
+    table = await kanban_cards_repo.table()
+    return await query_all(table, **collection_query(column_id, index="column-index", key="columnId"), **kwargs)
+
+
+async def card_ids(column_ids: list[str]) -> list[str]:
+    pages = await parallel_map(lambda cid: column_cards(cid, ProjectionExpression="id"), column_ids)
+    return [card["id"] for cards in pages for card in cards]
+
+
+async def delete_cards(ids: list[str]) -> None:
+    slices = [ids[start:start + DELETE_SLICE] for start in range(0, len(ids), DELETE_SLICE)]
+    await parallel_map(lambda chunk: kanban_cards_repo.batch_write(deletes=chunk), slices)
+
+
+async def delete_remaining_columns(column_ids: list[str]) -> None:
+    # Only columns that still exist, so item counts stay exact on retries
+    existing = await kanban_columns_repo.batch_get(column_ids, attributes=["id"])
+    await kanban_columns_repo.batch_write(deletes=[col["id"] for col in existing])
+
+
+async def delete_columns(column_ids: list[str]):
+    """Delete columns and their cards, or hand a large cascade to a job (202)."""
+    ids = await card_ids(column_ids)
+    if len(ids) > CASCADE_INLINE_LIMIT:
+        job = await start_job(DELETE_COLUMNS_JOB, {"columnIds": column_ids}, total=len(ids))
+        return JSONResponse(status_code=202, content=JobResponse(**job).model_dump())
+    await delete_cards(ids)
+    await delete_remaining_columns(column_ids)
+    return None
+
+
+@job_handler(DELETE_COLUMNS_JOB)
+async def delete_columns_job(job: dict, deadline) -> bool:
+    # Re-reads what is left on every run, so resuming after a timeout is safe
+    column_ids = job["payload"]["columnIds"]
+    for start in range(0, len(column_ids), DELETE_SLICE):
+        chunk = column_ids[start:start + DELETE_SLICE]
+        ids = await card_ids(chunk)
+        for offset in range(0, len(ids), DELETE_SLICE * 4):
+            if deadline.expired():
+                return False
+            batch = ids[offset:offset + DELETE_SLICE * 4]
+            await delete_cards(batch)
+            await add_progress(job["id"], len(batch))
+        await delete_remaining_columns(chunk)
+    return True
+
 
 # Boards
-@router.get("/boards", response_model=list[BoardResponse])
-def get_boards():
-    response = kanban_boards_table.scan()
-    return response.get("Items", [])
+@router.get("/boards", response_model=Page[BoardResponse], dependencies=[versioned(kanban_boards_repo)])
+async def get_boards(page: PageParams = Depends()):
+    return await kanban_boards_repo.cached_page(page, lambda table: scan_page(table, page))
 
 
 @router.post("/boards", response_model=BoardResponse, status_code=201)
-def create_board(board: BoardCreate):
+async def create_board(board: BoardCreate):
     item = {
         "id": str(uuid.uuid4()),
         "title": board.title,
     }
-    kanban_boards_table.put_item(Item=item)
+    await kanban_boards_repo.put(item)
     return item
 
 
+@router.get(
+    "/boards/{board_id}/full",
+    response_model=BoardFullResponse,
+    dependencies=[versioned(kanban_boards_repo, kanban_columns_repo, kanban_cards_repo)],
+)
+async def get_board_full(board_id: str):
+    """Board, its ordered columns and each column's ordered cards in one response."""
+    board, columns = await asyncio.gather(kanban_boards_repo.get(board_id), board_columns(board_id))
+    cards = await parallel_map(lambda col: column_cards(col["id"]), columns)
+    return {**board, "columns": [{**col, "cards": col_cards} for col, col_cards in zip(columns, cards)]}
+
+
 @router.patch("/boards/{board_id}", response_model=BoardResponse)
-def update_board(board_id: str, board: BoardUpdate):
-    response = kanban_boards_table.get_item(Key={"id": board_id})
-    if not response.get("Item"):
-        raise HTTPException(status_code=404, detail="Board not found")
-
-    if board.title is not None:
-        kanban_boards_table.update_item(
-            Key={"id": board_id},
-            UpdateExpression="SET #title = :title",
-            ExpressionAttributeValues={":title": board.title},
-            ExpressionAttributeNames={"#title": "title"},
-        )
-
-    response = kanban_boards_table.get_item(Key={"id": board_id})
-    return response.get("Item")
-
-
-@router.delete("/boards/{board_id}", status_code=204)
-def delete_board(board_id: str):
-    response = kanban_boards_table.get_item(Key={"id": board_id})
-    if not response.get("Item"):
-        raise HTTPException(status_code=404, detail="Board not found")
-
-    # Delete all columns and cards for this board
-    columns = kanban_columns_table.query(
-        IndexName="board-index",
-        KeyConditionExpression="boardId = :bid",
-        ExpressionAttributeValues={":bid": board_id}
-    ).get("Items", [])
-
-    for col in columns:
-        # Delete cards in column
-        cards = kanban_cards_table.query(
-            IndexName="column-index",
-            KeyConditionExpression="columnId = :cid",
-            ExpressionAttributeValues={":cid": col["id"]}
-        ).get("Items", [])
-        for card in cards:
-            kanban_cards_table.delete_item(Key={"id": card["id"]})
-        kanban_columns_table.delete_item(Key={"id": col["id"]})
-
-    kanban_boards_table.delete_item(Key={"id": board_id})
-    return None
+async def update_board(board_id: str, board: BoardUpdate):
+    return await kanban_boards_repo.update(board_id, board)
+
+
+@router.delete("/boards/{board_id}", status_code=204, responses={202: {"model": JobResponse}})
+async def delete_board(board_id: str):
+    await kanban_boards_repo.delete(board_id)
+    columns = await board_columns(board_id, ProjectionExpression="id")
+    return await delete_columns([col["id"] for col in columns])
 
 
 # Columns
-@router.get("/boards/{board_id}/columns", response_model=list[ColumnResponse])
-def get_columns(board_id: str):
-    response = kanban_columns_table.query(
-        IndexName="board-index",
-        KeyConditionExpression="boardId = :bid",
-        ExpressionAttributeValues={":bid": board_id}
-    )
-    items = response.get("Items", [])
-    return sorted(items, key=lambda x: x.get("order", 0))
+@router.get(
+    "/boards/{board_id}/columns",
+    response_model=Page[ColumnResponse],
+    dependencies=[versioned(kanban_columns_repo)],
+)
+async def get_columns(board_id: str, page: PageParams = Depends()):
+    table = await kanban_columns_repo.table()
+    return await query_page(table, page, collection_query(board_id, index="board-index", key="boardId"))
 
 
 @router.post("/columns", response_model=ColumnResponse, status_code=201)
-def create_column(column: ColumnCreate):
-    # Get count for order
-    response = kanban_columns_table.query(
-        IndexName="board-index",
-        KeyConditionExpression="boardId = :bid",
-        ExpressionAttributeValues={":bid": column.boardId},
-        Select="COUNT"
-    )
-    count = response.get("Count", 0)
-
+async def create_column(column: ColumnCreate):
     item = {
         "id": str(uuid.uuid4()),
         "title": column.title,
         "boardId": column.boardId,
-        "order": count,
+        "order": (await columns_ordering.append(column.boardId))[0],
     }
-    kanban_columns_table.put_item(Item=item)
+    await kanban_columns_repo.put(item)
     return item
 
 
 @router.patch("/columns/{column_id}", response_model=ColumnResponse)
-def update_column(column_id: str, column: ColumnUpdate):
-    response = kanban_columns_table.get_item(Key={"id": column_id})
-    if not response.get("Item"):
-        raise HTTPException(status_code=404, detail="Column not found")
-
-    update_expr = []
-    expr_values = {}
-    expr_names = {}
-
-    if column.title is not None:
-        update_expr.append("#title = :title")
-        expr_values[":title"] = column.title
-        expr_names["#title"] = "title"
-    if column.order is not None:
-        update_expr.append("#order = :order")
-        expr_values[":order"] = column.order
-        expr_names["#order"] = "order"
-
-    if update_expr:
-        kanban_columns_table.update_item(
-            Key={"id": column_id},
-            UpdateExpression="SET " + ", ".join(update_expr),
-            ExpressionAttributeValues=expr_values,
-            ExpressionAttributeNames=expr_names,
-        )
-
-    response = kanban_columns_table.get_item(Key={"id": column_id})
-    return response.get("Item")
-
-
-@router.delete("/columns/{column_id}", status_code=204)
-def delete_column(column_id: str):
-    response = kanban_columns_table.get_item(Key={"id": column_id})
-    if not response.get("Item"):
-        raise HTTPException(status_code=404, detail="Column not found")
-
-    # Delete all cards in column
-    cards = kanban_cards_table.query(
-        IndexName="column-index",
-        KeyConditionExpression="columnId = :cid",
-        ExpressionAttributeValues={":cid": column_id}
-    ).get("Items", [])
-    for card in cards:
-        kanban_cards_table.delete_item(Key={"id": card["id"]})
-
-    kanban_columns_table.delete_item(Key={"id": column_id})
-    return None
+async def update_column(column_id: str, column: ColumnUpdate):
+    return await kanban_columns_repo.update(column_id, await columns_ordering.apply_move(set_fields(column)))
+
+
+@router.delete("/columns/{column_id}", status_code=204, responses={202: {"model": JobResponse}})
+async def delete_column(column_id: str):
+    await kanban_columns_repo.delete(column_id)
+    return await delete_columns([column_id])
 
 
 # Cards
-@router.get("/columns/{column_id}/cards", response_model=list[CardResponse])
-def get_cards(column_id: str):
-    response = kanban_cards_table.query(
-        IndexName="column-index",
-        KeyConditionExpression="columnId = :cid",
-        ExpressionAttributeValues={":cid": column_id}
-    )
-    items = response.get("Items", [])
-    return sorted(items, key=lambda x: x.get("order", 0))
+@router.get(
+    "/columns/{column_id}/cards",
+    response_model=Page[CardResponse],
+    dependencies=[versioned(kanban_cards_repo)],
+)
+async def get_cards(column_id: str, page: PageParams = Depends()):
+    table = await kanban_cards_repo.table()
+    return await query_page(table, page, collection_query(column_id, index="column-index", key="columnId"))
 
 
 @router.post("/cards", response_model=CardResponse, status_code=201)
-def create_card(card: CardCreate):
-    # Get count for order
-    response = kanban_cards_table.query(
-        IndexName="column-index",
-        KeyConditionExpression="columnId = :cid",
-        ExpressionAttributeValues={":cid": card.columnId},
-        Select="COUNT"
-    )
-    count = response.get("Count", 0)
-
+async def create_card(card: CardCreate):
     item = {
         "id": str(uuid.uuid4()),
         "title": card.title,
         "description": card.description,
         "columnId": card.columnId,
-        "order": count,
+        "order": (await cards_ordering.append(card.columnId))[0],
     }
-    kanban_cards_table.put_item(Item=item)
+    await kanban_cards_repo.put(item)
     return item
 
 
 @router.patch("/cards/{card_id}", response_model=CardResponse)
-def update_card(card_id: str, card: CardUpdate):
-    response = kanban_cards_table.get_item(Key={"id": card_id})
-    if not response.get("Item"):
-        raise HTTPException(status_code=404, detail="Card not found")
-
-    update_expr = []
-    expr_values = {}
-    expr_names = {}
-
-    if card.title is not None:
-        update_expr.append("#title = :title")
-        expr_values[":title"] = card.title
-        expr_names["#title"] = "title"
-    if card.description is not None:
-        update_expr.append("#description = :description")
-        expr_values[":description"] = card.description
-        expr_names["#description"] = "description"
-    if card.columnId is not None:
-        update_expr.append("#columnId = :columnId")
-        expr_values[":columnId"] = card.columnId
-        expr_names["#columnId"] = "columnId"
-    if card.order is not None:
-        update_expr.append("#order = :order")
-        expr_values[":order"] = card.order
-        expr_names["#order"] = "order"
-
-    if update_expr:
-        kanban_cards_table.update_item(
-            Key={"id": card_id},
-            UpdateExpression="SET " + ", ".join(update_expr),
-            ExpressionAttributeValues=expr_values,
-            ExpressionAttributeNames=expr_names,
-        )
-
-    response = kanban_cards_table.get_item(Key={"id": card_id})
-    return response.get("Item")
+async def update_card(card_id: str, card: CardUpdate):
+    return await kanban_cards_repo.update(card_id, await cards_ordering.apply_move(set_fields(card)))
 
 
 @router.delete("/cards/{card_id}", status_code=204)
-def delete_card(card_id: str):
-    response = kanban_cards_table.get_item(Key={"id": card_id})
-    if not response.get("Item"):
-        raise HTTPException(status_code=404, detail="Card not found")
-    kanban_cards_table.delete_item(Key={"id": card_id})
+async def delete_card(card_id: str):
+    await kanban_cards_repo.delete(card_id)
     return None
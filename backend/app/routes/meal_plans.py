@@ -1,8 +1,11 @@
 import uuid
 from datetime import datetime
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 
-from app.database import meal_plans_table, recipes_table, grocery_lists_table
+from app.database import meal_plans_repo, recipes_repo, grocery_lists_repo
+from app.etag import versioned
+from app.pagination import PageParams, collection_query, query_page
+from app.schemas import Page
 from app.schemas.meal_plan import (
     MealPlanCreate,
     MealPlanUpdate,
@@ -11,137 +14,115 @@ from app.schemas.meal_plan import (
 
 router = APIRouter(prefix="/meal-plans", tags=["meal-plans"])
 
+# Grocery lists generated from a plan get ids derived from the plan and
+# its revision, so generating twice from the same revision is one list
+GROCERY_LIST_NAMESPACE = uuid.UUID("6f1c2a52-8d43-4c1e-9b7a-2f0e5d3c9a41")
 
-@router.get("", response_model=list[MealPlanResponse])
-def get_meal_plans():
-    response = meal_plans_table.scan()
-    items = response.get("Items", [])
-    return sorted(items, key=lambda x: x.get("startDate", ""), reverse=True)
 
+@router.get("", response_model=Page[MealPlanResponse], dependencies=[versioned(meal_plans_repo)])
+async def get_meal_plans(page: PageParams = Depends()):
+    return await query_page(await meal_plans_repo.table(), page, collection_query("meal_plans", descending=True))
 
-@router.get("/{plan_id}", response_model=MealPlanResponse)
-def get_meal_plan(plan_id: str):
-    response = meal_plans_table.get_item(Key={"id": plan_id})
-    item = response.get("Item")
-    if not item:
-        raise HTTPException(status_code=404, detail="Meal plan not found")
-    return item
+
+@router.get("/{plan_id}", response_model=MealPlanResponse, dependencies=[versioned(meal_plans_repo)])
+async def get_meal_plan(plan_id: str):
+    return await meal_plans_repo.get(plan_id)
 
 
 @router.post("", response_model=MealPlanResponse, status_code=201)
-def create_meal_plan(data: MealPlanCreate):
+async def create_meal_plan(data: MealPlanCreate):
     item = {
         "id": str(uuid.uuid4()),
         "name": data.name,
         "startDate": data.startDate,
         "days": [d.model_dump() for d in data.days],
+        "collection": "meal_plans",
         "createdAt": datetime.utcnow().isoformat(),
+        "revision": 1,
     }
-    meal_plans_table.put_item(Item=item)
+    await meal_plans_repo.put(item)
     return item
 
 
 @router.patch("/{plan_id}", response_model=MealPlanResponse)
-def update_meal_plan(plan_id: str, data: MealPlanUpdate):
-    response = meal_plans_table.get_item(Key={"id": plan_id})
-    item = response.get("Item")
-    if not item:
-        raise HTTPException(status_code=404, detail="Meal plan not found")
-
-    update_expr = []
-    expr_values = {}
-    expr_names = {}
-
-    if data.name is not None:
-        update_expr.append("#name = :name")
-        expr_values[":name"] = data.name
-        expr_names["#name"] = "name"
-
-    if data.startDate is not None:
-        update_expr.append("startDate = :startDate")
-        expr_values[":startDate"] = data.startDate
-
-    if data.days is not None:
-        update_expr.append("days = :days")
-        expr_values[":days"] = [d.model_dump() for d in data.days]
-
-    if update_expr:
-        update_kwargs = {
-            "Key": {"id": plan_id},
-            "UpdateExpression": "SET " + ", ".join(update_expr),
-            "ExpressionAttributeValues": expr_values,
-        }
-        if expr_names:
-            update_kwargs["ExpressionAttributeNames"] = expr_names
-        meal_plans_table.update_item(**update_kwargs)
-
-    response = meal_plans_table.get_item(Key={"id": plan_id})
-    return response.get("Item")
+async def update_meal_plan(plan_id: str, data: MealPlanUpdate):
+    # Every edit starts a new revision, so the next grocery list is regenerated
+    return await meal_plans_repo.update(plan_id, data, add={"revision": 1})
 
 
 @router.delete("/{plan_id}", status_code=204)
-def delete_meal_plan(plan_id: str):
-    response = meal_plans_table.get_item(Key={"id": plan_id})
-    if not response.get("Item"):
-        raise HTTPException(status_code=404, detail="Meal plan not found")
-    meal_plans_table.delete_item(Key={"id": plan_id})
+async def delete_meal_plan(plan_id: str):
+    await meal_plans_repo.delete(plan_id)
     return None
 
 
 @router.post("/{plan_id}/generate-grocery")
-def generate_grocery_from_meal_plan(plan_id: str, list_name: str = None):
+async def generate_grocery_from_meal_plan(plan_id: str, list_name: str = None):
     """
     Generate a grocery list from all recipes referenced in the meal plan.
     Aggregates ingredients from all linked recipes.
+
+    The list's id is derived from the plan id and revision, and written
+    only if absent: generating again before the plan changes returns the
+    list already made instead of a duplicate.
     """
     # Get the meal plan
-    response = meal_plans_table.get_item(Key={"id": plan_id})
-    plan = response.get("Item")
-    if not plan:
-        raise HTTPException(status_code=404, detail="Meal plan not found")
+    plan = await meal_plans_repo.get(plan_id)
 
-    # Collect all recipe IDs from the meal plan
-    recipe_ids = set()
+    # Collect all recipe IDs from the meal plan, numbered in the order they are planned
+    recipe_ids = {}
     for day in plan.get("days", []):
         for meal_type in ["breakfast", "lunch", "snack", "dinner"]:
             meal = day.get(meal_type)
             if meal and meal.get("recipeId"):
-                recipe_ids.add(meal["recipeId"])
+                recipe_ids.setdefault(meal["recipeId"], len(recipe_ids))
 
-    # Fetch all referenced recipes
+    # One BatchGetItem per 100 recipes, reading only what the list needs
+    found = await recipes_repo.batch_get(recipe_ids, attributes=["id", "ingredients"])
+    recipes = sorted(found, key=lambda recipe: recipe_ids[recipe["id"]])
     ingredients_map = {}  # name -> {category, quantity, unit}
 
-    for recipe_id in recipe_ids:
-        recipe_resp = recipes_table.get_item(Key={"id": recipe_id})
-        recipe = recipe_resp.get("Item")
-        if recipe:
-            for ingredient in recipe.get("ingredients", []):
-                # Parse ingredient string (e.g., "2 cups rice" or just "rice")
-                name = ingredient.strip().lower()
-                if name not in ingredients_map:
-                    ingredients_map[name] = {
-                        "id": str(uuid.uuid4()),
-                        "name": ingredient.strip(),
-                        "category": guess_category(name),
-                        "checked": False,
-                        "quantity": 1,
-                        "unit": "",
-                    }
+    for recipe in recipes:
+        for ingredient in recipe.get("ingredients", []):
+            # Parse ingredient string (e.g., "2 cups rice" or just "rice")
+            name = ingredient.strip().lower()
+            if name not in ingredients_map:
+                ingredients_map[name] = {
+                    "id": str(uuid.uuid4()),
+                    "name": ingredient.strip(),
+                    "category": guess_category(name),
+                    "checked": False,
+                    "quantity": 1,
+                    "unit": "",
+                }
 
     # Create grocery list
+    revision = int(plan.get("revision", 0))
     grocery_list = {
-        "id": str(uuid.uuid4()),
+        "id": str(uuid.uuid5(GROCERY_LIST_NAMESPACE, f"{plan_id}#{revision}")),
         "name": list_name or f"Groceries for {plan['name']}",
         "items": list(ingredients_map.values()),
+        "collection": "grocery_lists",
         "createdAt": datetime.utcnow().isoformat(),
+        "mealPlanId": plan_id,
+        "mealPlanRevision": revision,
     }
-    grocery_lists_table.put_item(Item=grocery_list)
-
+    created = True
+    try:
+        await grocery_lists_repo.put(grocery_list, conflict="Grocery list already generated")
+    except HTTPException as e:
+        if e.status_code != 400:
+            raise
+        created = False
+        grocery_list = await grocery_lists_repo.get(grocery_list["id"])
+
+    item_count = len(grocery_list["items"])
     return {
-        "message": f"Created grocery list with {len(ingredients_map)} items",
+        "message": f"{'Created' if created else 'Already generated'} grocery list with {item_count} items",
         "groceryListId": grocery_list["id"],
         "groceryListName": grocery_list["name"],
-        "itemCount": len(ingredients_map),
+        "itemCount": item_count,
+        "created": created,
     }
 
 
@@ -1,184 +1,364 @@
+import asyncio
 import uuid
 from datetime import datetime
-from fastapi import APIRouter, HTTPException
+from botocore.exceptions import ClientError
+from fastapi import APIRouter, Depends, HTTPException, Query
 
-from app.database import notes_table, note_folders_table
+from app.database import (
+    NOTE_FACETS, NOTE_TAGS_TABLE, notes_repo, note_folders_repo,
+    add_to_counter, get_counters, get_table, is_condition_failure, parallel_map, set_fields,
+)
+from app import compression
+from app.etag import versioned
+from app.pagination import PageParams, collection_query, query_page, with_filter, with_projection
+from app.search import SearchIndex
+from app.batch import run_batch
 from app.schemas import (
-    NoteCreate, NoteUpdate, NoteResponse,
+    Page, BatchRequest, BatchResponse,
+    NoteCreate, NoteUpdate, NoteResponse, NoteFacetsResponse,
+    NoteContentOp, NoteContentPatch, NoteContentResponse,
     NoteFolderCreate, NoteFolderUpdate, NoteFolderResponse
 )
 
 router = APIRouter(prefix="/notes", tags=["notes"])
 
+# What list views read: everything but a compressed body, which they show by its preview
+LIST_ATTRIBUTES = [*NoteResponse.model_fields, "contentPreview", "contentEncoding"]
+
+notes_search = SearchIndex(
+    "notes", notes_repo, {"title": 3, "tags": 2, "content": 1},
+    unpack=lambda item: compression.unpack(item, "content"), attributes=LIST_ATTRIBUTES,
+)
+
+# Fields whose changes must be reflected in the search index
+SEARCHED_FIELDS = ("title", "tags", "content")
+
+# Flag -> key of its sparse index, which holds only the notes with the flag set
+SPARSE_KEYS = {"pinned": "pinnedCollection", "archived": "archivedCollection", "starred": "starredCollection"}
+
+
+def index_attributes(note: dict) -> dict:
+    """Index keys for a note.
+
+    Flagged notes also land in the sparse pinned-, archived- and
+    starred-indexes, and filed notes in the folder-index. None marks a key
+    the note must not carry: DynamoDB rejects a null index key.
+    """
+    attributes = {"collection": "notes", "folderId": note.get("folderId") or None}
+    for flag, key in SPARSE_KEYS.items():
+        attributes[key] = "notes" if note.get(flag) else None
+    return attributes
+
+
+def new_note(note: NoteCreate) -> dict:
+    now = datetime.utcnow().isoformat()
+    item = {
+        "id": str(uuid.uuid4()),
+        "title": note.title,
+        "content": note.content,
+        "color": note.color,
+        "pinned": note.pinned,
+        "starred": note.starred,
+        "archived": note.archived,
+        "tags": note.tags,
+        "folderId": note.folderId,
+        "createdAt": now,
+        "updatedAt": now,
+        "revision": 1,
+    }
+    item.update(index_attributes(item))
+    return {k: v for k, v in item.items() if v is not None}
+
+
+def apply_ops(content: str, ops: list[NoteContentOp]) -> str:
+    """Apply insert/delete ops in order; positions count UTF-16 code units."""
+    # Two bytes per code unit, so positions index the encoded text directly
+    text = bytearray(content.encode("utf-16-le"))
+    for op in ops:
+        start = op.pos * 2
+        end = start + op.count * 2 if op.op == "delete" else start
+        if end > len(text):
+            raise HTTPException(status_code=400, detail=f"Op at {op.pos} is past the end of the content")
+        text[start:end] = op.text.encode("utf-16-le") if op.op == "insert" else b""
+    try:
+        return text.decode("utf-16-le")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Ops split a character")
+
+
+def list_view(note: dict) -> dict:
+    return compression.preview(note, "content")
+
+
+def tag_rows(note: dict) -> dict[str, dict]:
+    """note_tags rows for a note: what tag filters need to sort and filter without reading notes."""
+    fields = {k: note[k] for k in ("updatedAt", "folderId", *SPARSE_KEYS.values()) if note.get(k)}
+    return {tag: {"tag": tag, "noteId": note["id"], **fields} for tag in note.get("tags") or [] if tag}
+
+
+async def write_tags(old: dict | None, new: dict | None) -> None:
+    """Replace a note's note_tags rows; every write changes updatedAt, so all are rewritten."""
+    table = await get_table(NOTE_TAGS_TABLE)
+    rows = tag_rows(new) if new else {}
+    stale = tag_rows(old).keys() - rows.keys() if old else set()
+    note_id = (new or old)["id"]
+    async with table.batch_writer(overwrite_by_pkeys=["tag", "noteId"]) as writer:
+        for tag in stale:
+            await writer.delete_item(Key={"tag": tag, "noteId": note_id})
+        for row in rows.values():
+            await writer.put_item(Item=row)
+
+
+def note_query(folder_id: str | None, tag: str | None, flags: dict) -> tuple[bool, dict]:
+    """Query kwargs for notes matching the filters, newest first.
+
+    The narrowest index is read: the folder's, the tag's rows in note_tags
+    (flagged True when so), or the sparse index of a flag that must be set.
+    Remaining filters apply to what that index returns.
+    """
+    if folder_id:
+        kwargs = collection_query(folder_id, index="folder-index", key="folderId", descending=True)
+        if tag:
+            kwargs = with_filter(kwargs, "contains(#tags, :tag)", {"#tags": "tags"}, {":tag": tag})
+    elif tag:
+        kwargs = collection_query(tag, index="updated-index", key="tag", descending=True)
+    else:
+        flag = next((flag for flag, value in flags.items() if value), None)
+        if flag:
+            kwargs = collection_query("notes", index=f"{flag}-index", key=SPARSE_KEYS[flag], descending=True)
+        else:
+            kwargs = collection_query("notes", descending=True)
+
+    for flag, value in flags.items():
+        if value is None or kwargs["IndexName"] == f"{flag}-index":
+            continue
+        key = SPARSE_KEYS[flag]
+        test = "attribute_exists" if value else "attribute_not_exists"
+        kwargs = with_filter(kwargs, f"{test}(#{key})", {f"#{key}": key})
+    return bool(tag and not folder_id), kwargs
+
+
+def facet_names(note: dict | None) -> set[str]:
+    """Facet counters a note counts towards: one per tag, and its folder ("" if none)."""
+    if not note:
+        return set()
+    return {f"tag#{tag}" for tag in note.get("tags") or []} | {f"folder#{note.get('folderId') or ''}"}
+
+
+async def count_facets(old: dict | None, new: dict | None) -> None:
+    """Move a note's facet counts from its old tags and folder to its new ones."""
+    before, after = facet_names(old), facet_names(new)
+    changes = [(name, -1) for name in before - after] + [(name, 1) for name in after - before]
+    await parallel_map(lambda change: add_to_counter(NOTE_FACETS, *change), changes)
+
 
 # Note Folder endpoints (must be before /{note_id} to avoid route conflicts)
-@router.get("/folders", response_model=list[NoteFolderResponse])
-def get_folders():
-    response = note_folders_table.scan()
-    items = response.get("Items", [])
-    return sorted(items, key=lambda x: x.get("name", ""))
+@router.get("/folders", response_model=Page[NoteFolderResponse], dependencies=[versioned(note_folders_repo)])
+async def get_folders(page: PageParams = Depends()):
+    return await note_folders_repo.cached_page(
+        page, lambda table: query_page(table, page, collection_query("note_folders"))
+    )
 
 
 @router.post("/folders", response_model=NoteFolderResponse, status_code=201)
-def create_folder(folder: NoteFolderCreate):
+async def create_folder(folder: NoteFolderCreate):
     now = datetime.utcnow().isoformat()
     item = {
         "id": str(uuid.uuid4()),
         "name": folder.name,
         "color": folder.color,
+        "collection": "note_folders",
         "createdAt": now,
     }
-    note_folders_table.put_item(Item=item)
+    await note_folders_repo.put(item)
     return item
 
 
-@router.get("/folders/{folder_id}", response_model=NoteFolderResponse)
-def get_folder(folder_id: str):
-    response = note_folders_table.get_item(Key={"id": folder_id})
-    item = response.get("Item")
-    if not item:
-        raise HTTPException(status_code=404, detail="Folder not found")
-    return item
+@router.get("/folders/{folder_id}", response_model=NoteFolderResponse, dependencies=[versioned(note_folders_repo)])
+async def get_folder(folder_id: str):
+    return await note_folders_repo.get(folder_id)
 
 
 @router.patch("/folders/{folder_id}", response_model=NoteFolderResponse)
-def update_folder(folder_id: str, folder: NoteFolderUpdate):
-    response = note_folders_table.get_item(Key={"id": folder_id})
-    item = response.get("Item")
-    if not item:
-        raise HTTPException(status_code=404, detail="Folder not found")
-
-    update_expr = []
-    expr_values = {}
-    expr_names = {}
-
-    if folder.name is not None:
-        update_expr.append("#name = :name")
-        expr_values[":name"] = folder.name
-        expr_names["#name"] = "name"
-    if folder.color is not None:
-        update_expr.append("#color = :color")
-        expr_values[":color"] = folder.color
-        expr_names["#color"] = "color"
-
-    if update_expr:
-        note_folders_table.update_item(
-            Key={"id": folder_id},
-            UpdateExpression="SET " + ", ".join(update_expr),
-            ExpressionAttributeValues=expr_values,
-            ExpressionAttributeNames=expr_names,
-        )
-
-    response = note_folders_table.get_item(Key={"id": folder_id})
-    return response.get("Item")
+async def update_folder(folder_id: str, folder: NoteFolderUpdate):
+    return await note_folders_repo.update(folder_id, folder)
 
 
 @router.delete("/folders/{folder_id}", status_code=204)
-def delete_folder(folder_id: str):
-    response = note_folders_table.get_item(Key={"id": folder_id})
-    if not response.get("Item"):
-        raise HTTPException(status_code=404, detail="Folder not found")
-    note_folders_table.delete_item(Key={"id": folder_id})
+async def delete_folder(folder_id: str):
+    await note_folders_repo.delete(folder_id)
     return None
 
 
 # Note endpoints
-@router.get("", response_model=list[NoteResponse])
-def get_notes():
-    response = notes_table.scan()
-    items = response.get("Items", [])
-    # Sort: pinned first, then by updatedAt
-    return sorted(items, key=lambda x: (not x.get("pinned", False), x.get("updatedAt", "")), reverse=True)
+@router.get("", response_model=Page[NoteResponse], dependencies=[versioned(notes_repo)])
+async def get_notes(
+    folderId: str | None = None,
+    tag: str | None = None,
+    archived: bool | None = None,
+    pinned: bool | None = None,
+    starred: bool | None = None,
+    page: PageParams = Depends(),
+):
+    # Pinned first, then the rest (unless filtered to one of them); both by updatedAt descending
+    flags = {"pinned": pinned, "archived": archived, "starred": starred}
+    variants = [flags] if pinned is not None else [{**flags, "pinned": True}, {**flags, "pinned": False}]
+    queries = [note_query(folderId, tag, variant) for variant in variants]
+    if not queries[0][0]:
+        stages = [with_projection(kwargs, LIST_ATTRIBUTES) for _, kwargs in queries]
+        result = await query_page(await notes_repo.table(), page, *stages)
+        return {**result, "items": [list_view(note) for note in result["items"]]}
+
+    result = await query_page(await get_table(NOTE_TAGS_TABLE), page, *(kwargs for _, kwargs in queries))
+    ids = [row["noteId"] for row in result["items"]]
+    found = {note["id"]: note for note in await notes_repo.batch_get(ids, attributes=LIST_ATTRIBUTES)}
+    return {"items": [list_view(found[i]) for i in ids if i in found], "nextCursor": result["nextCursor"]}
+
+
+@router.get("/search", response_model=Page[NoteResponse], dependencies=[versioned(notes_repo)])
+async def search_notes(q: str = Query(min_length=1, max_length=200), page: PageParams = Depends()):
+    """Notes containing every word of `q` in their title, tags or content, best match first."""
+    result = await notes_search.search(q, page)
+    return {**result, "items": [list_view(note) for note in result["items"]]}
+
+
+@router.get("/facets", response_model=NoteFacetsResponse, dependencies=[versioned(notes_repo)])
+async def get_facets():
+    """Notes per tag and per folder, from one query of the counters table."""
+    facets = {"tags": {}, "folders": {}, "unfiled": 0}
+    for name, count in (await get_counters(NOTE_FACETS)).items():
+        kind, _, value = name.partition("#")
+        if count <= 0:
+            continue
+        if kind == "tag":
+            facets["tags"][value] = count
+        elif value:
+            facets["folders"][value] = count
+        else:
+            facets["unfiled"] = count
+    return facets
 
 
 @router.post("", response_model=NoteResponse, status_code=201)
-def create_note(note: NoteCreate):
-    now = datetime.utcnow().isoformat()
-    item = {
-        "id": str(uuid.uuid4()),
-        "title": note.title,
-        "content": note.content,
-        "color": note.color,
-        "pinned": note.pinned,
-        "starred": note.starred,
-        "archived": note.archived,
-        "tags": note.tags,
-        "folderId": note.folderId,
-        "createdAt": now,
-        "updatedAt": now,
-    }
-    notes_table.put_item(Item=item)
+async def create_note(note: NoteCreate):
+    item = new_note(note)
+    await notes_repo.put(compression.packed(item, "content"))
+    await asyncio.gather(notes_search.index(item), count_facets(None, item), write_tags(None, item))
     return item
 
 
-@router.get("/{note_id}", response_model=NoteResponse)
-def get_note(note_id: str):
-    response = notes_table.get_item(Key={"id": note_id})
-    item = response.get("Item")
-    if not item:
-        raise HTTPException(status_code=404, detail="Note not found")
-    return item
+@router.get("/{note_id}", response_model=NoteResponse, dependencies=[versioned(notes_repo)])
+async def get_note(note_id: str):
+    return compression.unpack(await notes_repo.get(note_id), "content")
 
 
 @router.patch("/{note_id}", response_model=NoteResponse)
-def update_note(note_id: str, note: NoteUpdate):
-    response = notes_table.get_item(Key={"id": note_id})
-    item = response.get("Item")
-    if not item:
-        raise HTTPException(status_code=404, detail="Note not found")
-
-    update_expr = ["#updatedAt = :updatedAt"]
-    expr_values = {":updatedAt": datetime.utcnow().isoformat()}
-    expr_names = {"#updatedAt": "updatedAt"}
-
-    if note.title is not None:
-        update_expr.append("#title = :title")
-        expr_values[":title"] = note.title
-        expr_names["#title"] = "title"
-    if note.content is not None:
-        update_expr.append("#content = :content")
-        expr_values[":content"] = note.content
-        expr_names["#content"] = "content"
-    if note.color is not None:
-        update_expr.append("#color = :color")
-        expr_values[":color"] = note.color
-        expr_names["#color"] = "color"
-    if note.pinned is not None:
-        update_expr.append("#pinned = :pinned")
-        expr_values[":pinned"] = note.pinned
-        expr_names["#pinned"] = "pinned"
-    if note.starred is not None:
-        update_expr.append("#starred = :starred")
-        expr_values[":starred"] = note.starred
-        expr_names["#starred"] = "starred"
-    if note.archived is not None:
-        update_expr.append("#archived = :archived")
-        expr_values[":archived"] = note.archived
-        expr_names["#archived"] = "archived"
-    if note.tags is not None:
-        update_expr.append("#tags = :tags")
-        expr_values[":tags"] = note.tags
-        expr_names["#tags"] = "tags"
-    if note.folderId is not None:
-        update_expr.append("#folderId = :folderId")
-        expr_values[":folderId"] = note.folderId
-        expr_names["#folderId"] = "folderId"
-
-    notes_table.update_item(
-        Key={"id": note_id},
-        UpdateExpression="SET " + ", ".join(update_expr),
-        ExpressionAttributeValues=expr_values,
-        ExpressionAttributeNames=expr_names,
-    )
+async def update_note(note_id: str, note: NoteUpdate):
+    updates = {**set_fields(note), "updatedAt": datetime.utcnow().isoformat()}
+    remove = []
+    for flag, key in SPARSE_KEYS.items():
+        if flag in updates:
+            if updates[flag]:
+                updates[key] = "notes"
+            else:
+                remove.append(key)
+    if updates.get("folderId") == "":
+        # An empty folder unfiles the note; DynamoDB rejects an empty index key
+        del updates["folderId"]
+        remove.append("folderId")
+    add = {}
+    if "content" in updates:
+        attributes, stale = compression.pack("content", updates.pop("content"))
+        updates.update(attributes)
+        remove.extend(stale)
+        # Content patches based on an earlier revision now fail
+        add["revision"] = 1
+    previous = {}
+    item = await notes_repo.update(note_id, updates, remove=remove, previous=previous, add=add)
+    item = compression.unpack(item, "content", note.content)
+    await asyncio.gather(count_facets(previous, item), write_tags(previous, item))
+    if any(getattr(note, field) is not None for field in SEARCHED_FIELDS):
+        await notes_search.index(item)
+    return item
+
 
-    response = notes_table.get_item(Key={"id": note_id})
-    return response.get("Item")
+@router.patch("/{note_id}/content", response_model=NoteContentResponse)
+async def patch_note_content(note_id: str, patch: NoteContentPatch):
+    """Apply an edit diff to a note's content, if it is still at `baseRevision`.
+
+    Autosave sends only what changed rather than the whole body. A note
+    changed since the base revision gets a 409, and the client reloads it.
+    """
+    table = await notes_repo.table()
+    note = (await table.get_item(Key={"id": note_id}, ConsistentRead=True)).get("Item")
+    if not note:
+        raise HTTPException(status_code=404, detail=notes_repo.not_found)
+    if note.get("revision", 0) != patch.baseRevision:
+        raise HTTPException(status_code=409, detail="Note has changed since the base revision")
+    note = compression.unpack(note, "content")
+    content = apply_ops(note["content"], patch.ops)
+
+    attributes, stale = compression.pack("content", content)
+    updates = {**attributes, "updatedAt": datetime.utcnow().isoformat(), "revision": patch.baseRevision + 1}
+    names = {f"#{k}": k for k in [*updates, *stale]}
+    values = {f":{k}": v for k, v in updates.items()}
+    if patch.baseRevision:
+        condition = "#revision = :base"
+        values[":base"] = patch.baseRevision
+    else:
+        # Notes written before revisions existed are at revision 0
+        condition = "attribute_exists(#id) AND attribute_not_exists(#revision)"
+        names["#id"] = "id"
+    try:
+        await table.update_item(
+            Key={"id": note_id},
+            UpdateExpression="SET " + ", ".join(f"#{k} = :{k}" for k in updates)
+            + " REMOVE " + ", ".join(f"#{k}" for k in stale),
+            ConditionExpression=condition,
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values,
+        )
+    except ClientError as e:
+        if is_condition_failure(e):
+            raise HTTPException(status_code=409, detail="Note has changed since the base revision")
+        raise
+    await notes_repo.written(note_id)
+
+    item = {**note, "content": content, "updatedAt": updates["updatedAt"], "revision": updates["revision"]}
+    await asyncio.gather(write_tags(note, item), notes_search.index(item))
+    return item
 
 
 @router.delete("/{note_id}", status_code=204)
-def delete_note(note_id: str):
-    response = notes_table.get_item(Key={"id": note_id})
-    if not response.get("Item"):
-        raise HTTPException(status_code=404, detail="Note not found")
-    notes_table.delete_item(Key={"id": note_id})
+async def delete_note(note_id: str):
+    note = await notes_repo.delete(note_id)
+    await asyncio.gather(notes_search.unindex(note_id), count_facets(note, None), write_tags(note, None))
     return None
+
+
+@router.post("/batch", response_model=BatchResponse[NoteResponse])
+async def batch_notes(batch: BatchRequest):
+    # Batch deletes do not return the deleted items, so read their tags and folder first
+    deleting = [operation.id for operation in batch.operations if operation.op == "delete" and operation.id]
+    before = {n["id"]: n for n in await notes_repo.batch_get(deleting, attributes=["id", "tags", "folderId"])}
+    written = {}
+
+    def new_items(notes):
+        items = [new_note(n) for n in notes]
+        written.update((item["id"], item) for item in items)
+        return [compression.packed(item, "content") for item in items]
+
+    response = await run_batch(notes_repo, batch.operations, NoteCreate, new_items, NoteUpdate, update_note)
+    for result in response["results"]:
+        if result["op"] == "create" and result["status"] == 201:
+            result["item"] = written[result["id"]]
+    # Updates were indexed and counted by update_note
+    created = [r["item"] for r in response["results"] if r["op"] == "create" and r["status"] == 201]
+    deleted = [r["id"] for r in response["results"] if r["op"] == "delete" and r["status"] == 204]
+    await parallel_map(notes_search.index, created)
+    await parallel_map(notes_search.unindex, deleted)
+    await parallel_map(lambda item: count_facets(None, item), created)
+    await parallel_map(lambda item: write_tags(None, item), created)
+    await parallel_map(lambda note_id: count_facets(before.get(note_id), None), deleted)
+    await parallel_map(lambda note_id: write_tags(before.get(note_id, {"id": note_id}), None), deleted)
+    return response
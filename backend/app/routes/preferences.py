@@ -1,10 +1,18 @@
+from datetime import datetime
 from fastapi import APIRouter, Request
 
-from app.database import user_preferences_table
+from app.database import user_preferences_repo, set_fields
+from app.etag import versioned
 from app.schemas import UserPreferencesUpdate, UserPreferencesResponse
 
 router = APIRouter(prefix="/preferences", tags=["preferences"])
 
+DEFAULT_PREFERENCES = {
+    "favoriteTools": [],
+    "theme": "system",
+    "sidebarCollapsed": False,
+}
+
 
 def get_user_id(request: Request) -> str:
     # In production, extract from JWT claims
@@ -12,66 +20,50 @@ def get_user_id(request: Request) -> str:
     return request.headers.get("X-User-Id", "default-user")
 
 
-@router.get("", response_model=UserPreferencesResponse)
-def get_preferences(request: Request):
+@router.get("", response_model=UserPreferencesResponse, dependencies=[versioned(user_preferences_repo)])
+async def get_preferences(request: Request):
     user_id = get_user_id(request)
-    response = user_preferences_table.get_item(Key={"userId": user_id})
-    item = response.get("Item")
+    item = await user_preferences_repo.find(user_id)
 
     if not item:
         # Return defaults
-        return {
-            "userId": user_id,
-            "favoriteTools": [],
-            "theme": "system",
-            "sidebarCollapsed": False,
-        }
+        return {"userId": user_id, **DEFAULT_PREFERENCES}
     return item
 
 
 @router.patch("", response_model=UserPreferencesResponse)
-def update_preferences(request: Request, prefs: UserPreferencesUpdate):
+async def update_preferences(request: Request, prefs: UserPreferencesUpdate):
     user_id = get_user_id(request)
+    updates = set_fields(prefs)
 
-    # Get existing or create new
-    response = user_preferences_table.get_item(Key={"userId": user_id})
-    item = response.get("Item")
-
-    if not item:
-        item = {
-            "userId": user_id,
-            "favoriteTools": [],
-            "theme": "system",
-            "sidebarCollapsed": False,
-        }
-
-    update_expr = []
+    # Upsert in one round trip: given fields are set, the rest keep their
+    # stored value or fall back to the defaults on first write.
+    set_expr = []
     expr_values = {}
     expr_names = {}
+    for field, default in DEFAULT_PREFERENCES.items():
+        expr_names[f"#{field}"] = field
+        if field in updates:
+            set_expr.append(f"#{field} = :{field}")
+            expr_values[f":{field}"] = updates[field]
+        else:
+            set_expr.append(f"#{field} = if_not_exists(#{field}, :{field})")
+            expr_values[f":{field}"] = default
 
-    if prefs.favoriteTools is not None:
-        update_expr.append("#favoriteTools = :favoriteTools")
-        expr_values[":favoriteTools"] = prefs.favoriteTools
-        expr_names["#favoriteTools"] = "favoriteTools"
-    if prefs.theme is not None:
-        update_expr.append("#theme = :theme")
-        expr_values[":theme"] = prefs.theme
-        expr_names["#theme"] = "theme"
-    if prefs.sidebarCollapsed is not None:
-        update_expr.append("#sidebarCollapsed = :sidebarCollapsed")
-        expr_values[":sidebarCollapsed"] = prefs.sidebarCollapsed
-        expr_names["#sidebarCollapsed"] = "sidebarCollapsed"
-
-    if update_expr:
-        user_preferences_table.update_item(
-            Key={"userId": user_id},
-            UpdateExpression="SET " + ", ".join(update_expr),
-            ExpressionAttributeValues=expr_values,
-            ExpressionAttributeNames=expr_names,
-        )
-    else:
-        # Create if doesn't exist
-        user_preferences_table.put_item(Item=item)
+    # createdAt only takes this write's timestamp if the item is new
+    now = datetime.utcnow().isoformat()
+    set_expr.append("#createdAt = if_not_exists(#createdAt, :now)")
+    expr_names["#createdAt"] = "createdAt"
+    expr_values[":now"] = now
 
-    response = user_preferences_table.get_item(Key={"userId": user_id})
-    return response.get("Item") or item
+    table = await user_preferences_repo.table()
+    response = await table.update_item(
+        Key={"userId": user_id},
+        UpdateExpression="SET " + ", ".join(set_expr),
+        ExpressionAttributeValues=expr_values,
+        ExpressionAttributeNames=expr_names,
+        ReturnValues="ALL_NEW",
+    )
+    item = response["Attributes"]
+    await user_preferences_repo.written(user_id, added=1 if item["createdAt"] == now else 0)
+    return item
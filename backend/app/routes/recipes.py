@@ -1,32 +1,25 @@
 import uuid
 from datetime import datetime
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends
 
-from app.database import recipes_table
-from app.schemas import RecipeCreate, RecipeUpdate, RecipeResponse
+from app.database import recipes_repo, set_fields
+from app.etag import versioned
+from app.pagination import PageParams, collection_query, query_page, with_filter
+from app.batch import run_batch
+from app.schemas import Page, BatchRequest, BatchResponse, RecipeCreate, RecipeUpdate, RecipeResponse
 
 router = APIRouter(prefix="/recipes", tags=["recipes"])
 
 
-@router.get("", response_model=list[RecipeResponse])
-def get_recipes():
-    response = recipes_table.scan()
-    items = response.get("Items", [])
-    # Sort: favorites first, then by created date
-    return sorted(items, key=lambda x: (not x.get("isFavorite", False), x.get("createdAt", "")), reverse=True)
+def index_attributes(recipe: dict) -> dict:
+    """Index keys for a recipe: favorites also land in the sparse favorite-index."""
+    attributes = {"collection": "recipes"}
+    if recipe.get("isFavorite"):
+        attributes["favoriteCollection"] = "recipes"
+    return attributes
 
 
-@router.get("/{recipe_id}", response_model=RecipeResponse)
-def get_recipe(recipe_id: str):
-    response = recipes_table.get_item(Key={"id": recipe_id})
-    item = response.get("Item")
-    if not item:
-        raise HTTPException(status_code=404, detail="Recipe not found")
-    return item
-
-
-@router.post("", response_model=RecipeResponse, status_code=201)
-def create_recipe(recipe: RecipeCreate):
+def new_recipe(recipe: RecipeCreate) -> dict:
     item = {
         "id": str(uuid.uuid4()),
         "title": recipe.title,
@@ -43,50 +36,60 @@ def create_recipe(recipe: RecipeCreate):
         "rating": recipe.rating,
         "createdAt": datetime.utcnow().isoformat(),
     }
-    recipes_table.put_item(Item=item)
+    item.update(index_attributes(item))
     return item
 
 
+@router.get("", response_model=Page[RecipeResponse], dependencies=[versioned(recipes_repo)])
+async def get_recipes(category: str | None = None, page: PageParams = Depends()):
+    # Favorites first, then the rest; both by created date descending
+    favorites = collection_query("recipes", index="favorite-index", key="favoriteCollection", descending=True)
+    others = with_filter(
+        collection_query("recipes", descending=True),
+        "attribute_not_exists(#favoriteCollection)",
+        {"#favoriteCollection": "favoriteCollection"},
+    )
+    stages = [favorites, others]
+    if category is not None:
+        stages = [
+            with_filter(stage, "#category = :category", {"#category": "category"}, {":category": category})
+            for stage in stages
+        ]
+    return await query_page(await recipes_repo.table(), page, *stages)
+
+
+@router.get("/{recipe_id}", response_model=RecipeResponse, dependencies=[versioned(recipes_repo)])
+async def get_recipe(recipe_id: str):
+    return await recipes_repo.get(recipe_id)
+
+
+@router.post("", response_model=RecipeResponse, status_code=201)
+async def create_recipe(recipe: RecipeCreate):
+    return await recipes_repo.put(new_recipe(recipe))
+
+
 @router.patch("/{recipe_id}", response_model=RecipeResponse)
-def update_recipe(recipe_id: str, recipe: RecipeUpdate):
-    response = recipes_table.get_item(Key={"id": recipe_id})
-    item = response.get("Item")
-    if not item:
-        raise HTTPException(status_code=404, detail="Recipe not found")
-
-    update_expr = []
-    expr_values = {}
-    expr_names = {}
-
-    fields = [
-        "title", "description", "category", "prepTime", "cookTime",
-        "servings", "difficulty", "ingredients", "instructions",
-        "tags", "isFavorite", "rating"
-    ]
-
-    for field in fields:
-        value = getattr(recipe, field)
-        if value is not None:
-            update_expr.append(f"#{field} = :{field}")
-            expr_values[f":{field}"] = value
-            expr_names[f"#{field}"] = field
-
-    if update_expr:
-        recipes_table.update_item(
-            Key={"id": recipe_id},
-            UpdateExpression="SET " + ", ".join(update_expr),
-            ExpressionAttributeValues=expr_values,
-            ExpressionAttributeNames=expr_names,
-        )
-
-    response = recipes_table.get_item(Key={"id": recipe_id})
-    return response.get("Item")
+async def update_recipe(recipe_id: str, recipe: RecipeUpdate):
+    updates = set_fields(recipe)
+    remove = []
+    if recipe.isFavorite is not None:
+        if recipe.isFavorite:
+            updates["favoriteCollection"] = "recipes"
+        else:
+            remove.append("favoriteCollection")
+    return await recipes_repo.update(recipe_id, updates, remove=remove)
 
 
 @router.delete("/{recipe_id}", status_code=204)
-def delete_recipe(recipe_id: str):
-    response = recipes_table.get_item(Key={"id": recipe_id})
-    if not response.get("Item"):
-        raise HTTPException(status_code=404, detail="Recipe not found")
-    recipes_table.delete_item(Key={"id": recipe_id})
+async def delete_recipe(recipe_id: str):
+    await recipes_repo.delete(recipe_id)
     return None
+
+
+@router.post("/batch", response_model=BatchResponse[RecipeResponse])
+async def batch_recipes(batch: BatchRequest):
+    return await run_batch(
+        recipes_repo, batch.operations,
+        RecipeCreate, lambda recipes: [new_recipe(r) for r in recipes],
+        RecipeUpdate, update_recipe,
+    )
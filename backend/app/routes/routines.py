@@ -1,29 +1,105 @@
 import uuid
-from fastapi import APIRouter, HTTPException
+from datetime import date, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query
 
-from app.database import routines_table
-from app.schemas import RoutineCreate, RoutineUpdate, RoutineResponse
+from app.database import routines_repo
+from app.etag import versioned
+from app.pagination import PageParams, scan_all, scan_page
+from app.schemas import Page, RoutineCreate, RoutineUpdate, RoutineResponse, RoutinesDueResponse
 
 router = APIRouter(prefix="/routines", tags=["routines"])
 
+# A routine's recurrence compiles into one bitmask over three fields of a
+# date: its weekday (Sunday first, as clients count), its week of the month
+# (days 1-7, 8-14, ...) and its day of the month. A date is due when the
+# mask has all three of its bits; a field the recurrence does not constrain
+# has every bit set.
+WEEKDAY_SHIFT, WEEK_SHIFT, MONTH_DAY_SHIFT = 0, 7, 12
+ALL_WEEKDAYS = 0x7F << WEEKDAY_SHIFT
+ALL_WEEKS = 0x1F << WEEK_SHIFT
+ALL_MONTH_DAYS = 0x7FFFFFFF << MONTH_DAY_SHIFT
 
-@router.get("", response_model=list[RoutineResponse])
-def get_routines():
-    response = routines_table.scan()
-    return response.get("Items", [])
+MAX_DUE_DAYS = 366
 
 
-@router.get("/{routine_id}", response_model=RoutineResponse)
-def get_routine(routine_id: str):
-    response = routines_table.get_item(Key={"id": routine_id})
-    item = response.get("Item")
-    if not item:
-        raise HTTPException(status_code=404, detail="Routine not found")
-    return item
+def _bits(values, shift: int, size: int, first: int = 0) -> int:
+    mask = 0
+    for value in values or ():
+        if first <= int(value) < first + size:
+            mask |= 1 << (shift + int(value) - first)
+    return mask
+
+
+def due_mask(routine: dict) -> int:
+    recurrence = routine.get("recurrenceType")
+    weekdays = _bits(routine.get("daysOfWeek"), WEEKDAY_SHIFT, 7)
+    if recurrence == "weekly":
+        return weekdays | ALL_WEEKS | ALL_MONTH_DAYS
+    if recurrence == "biweekly":
+        return weekdays | _bits(routine.get("weeksOfMonth"), WEEK_SHIFT, 5, first=1) | ALL_MONTH_DAYS
+    if recurrence == "monthly":
+        return ALL_WEEKDAYS | ALL_WEEKS | _bits(routine.get("daysOfMonth"), MONTH_DAY_SHIFT, 31, first=1)
+    # Custom patterns are free text and never due
+    return 0
+
+
+def day_bits(day: date) -> int:
+    return (
+        1 << (WEEKDAY_SHIFT + day.isoweekday() % 7)
+        | 1 << (WEEK_SHIFT + (day.day - 1) // 7)
+        | 1 << (MONTH_DAY_SHIFT + day.day - 1)
+    )
+
+
+def index_attributes(routine: dict) -> dict:
+    """Derived attributes: the recurrence compiled for GET /due."""
+    return {"dueMask": due_mask(routine)}
+
+
+@router.get("", response_model=Page[RoutineResponse], dependencies=[versioned(routines_repo)])
+async def get_routines(page: PageParams = Depends()):
+    return await scan_page(await routines_repo.table(), page)
+
+
+def check_window(start: date, end: date, max_days: int) -> int:
+    """Days from `start` to `end`, inclusive; a 400 if the window is reversed or too long."""
+    if end < start:
+        raise HTTPException(status_code=400, detail="to must not be before from")
+    days = (end - start).days + 1
+    if days > max_days:
+        raise HTTPException(status_code=400, detail=f"Date range is limited to {max_days} days")
+    return days
+
+
+async def due_routines(start: date, end: date) -> list[dict]:
+    """For each day from `start` to `end`, the routines due that day."""
+    async def load(table):
+        routines = [(int(r["dueMask"]) if "dueMask" in r else due_mask(r), r) for r in await scan_all(table)]
+        days = []
+        for n in range((end - start).days + 1):
+            day = start + timedelta(days=n)
+            bits = day_bits(day)
+            due = [routine for mask, routine in routines if mask & bits == bits]
+            days.append({"date": day.isoformat(), "routines": sorted(due, key=lambda r: r["title"])})
+        return days
+
+    return await routines_repo.cached_view(("due", start, end), load)
+
+
+@router.get("/due", response_model=RoutinesDueResponse, dependencies=[versioned(routines_repo)])
+async def get_due_routines(start: date = Query(alias="from"), end: date = Query(alias="to")):
+    """The routines due on each day from `from` to `to`, inclusive."""
+    check_window(start, end, MAX_DUE_DAYS)
+    return {"days": await due_routines(start, end)}
+
+
+@router.get("/{routine_id}", response_model=RoutineResponse, dependencies=[versioned(routines_repo)])
+async def get_routine(routine_id: str):
+    return await routines_repo.get(routine_id)
 
 
 @router.post("", response_model=RoutineResponse, status_code=201)
-def create_routine(routine: RoutineCreate):
+async def create_routine(routine: RoutineCreate):
     item = {
         "id": str(uuid.uuid4()),
         "title": routine.title,
@@ -40,48 +116,18 @@ def create_routine(routine: RoutineCreate):
         item["weeksOfMonth"] = routine.weeksOfMonth
     if routine.daysOfMonth is not None:
         item["daysOfMonth"] = routine.daysOfMonth
+    item.update(index_attributes(item))
 
-    routines_table.put_item(Item=item)
+    await routines_repo.put(item)
     return item
 
 
 @router.patch("/{routine_id}", response_model=RoutineResponse)
-def update_routine(routine_id: str, routine: RoutineUpdate):
-    response = routines_table.get_item(Key={"id": routine_id})
-    item = response.get("Item")
-    if not item:
-        raise HTTPException(status_code=404, detail="Routine not found")
-
-    update_expr = []
-    expr_values = {}
-    expr_names = {}
-
-    fields = ["title", "description", "icon", "color", "recurrenceType", "category",
-              "daysOfWeek", "weeksOfMonth", "daysOfMonth"]
-
-    for field in fields:
-        value = getattr(routine, field)
-        if value is not None:
-            update_expr.append(f"#{field} = :{field}")
-            expr_values[f":{field}"] = value
-            expr_names[f"#{field}"] = field
-
-    if update_expr:
-        routines_table.update_item(
-            Key={"id": routine_id},
-            UpdateExpression="SET " + ", ".join(update_expr),
-            ExpressionAttributeValues=expr_values,
-            ExpressionAttributeNames=expr_names,
-        )
-
-    response = routines_table.get_item(Key={"id": routine_id})
-    return response.get("Item")
+async def update_routine(routine_id: str, routine: RoutineUpdate):
+    return await routines_repo.update(routine_id, routine, derive=index_attributes)
 
 
 @router.delete("/{routine_id}", status_code=204)
-def delete_routine(routine_id: str):
-    response = routines_table.get_item(Key={"id": routine_id})
-    if not response.get("Item"):
-        raise HTTPException(status_code=404, detail="Routine not found")
-    routines_table.delete_item(Key={"id": routine_id})
+async def delete_routine(routine_id: str):
+    await routines_repo.delete(routine_id)
     return None
@@ -1,33 +1,109 @@
+import logging
 import uuid
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import ValidationError
 
-from app.database import schedule_blocks_table
-from app.schemas import ScheduleBlockCreate, ScheduleBlockUpdate, ScheduleBlockResponse
+from app.database import parallel_map, schedule_blocks_repo, schedule_templates_repo
+from app.etag import versioned
+from app.intervals import DAY_MINUTES, TIME_PATTERN, DayIntervals, to_minutes, to_time
+from app.pagination import PageParams, collection_query, query_all, query_page, scan_page
+from app.batch import run_batch
+from app.schemas import (
+    Page, BatchRequest, BatchResponse,
+    ScheduleBlockCreate, ScheduleBlockUpdate, ScheduleBlockResponse, FreeSlotsResponse,
+    ScheduleTemplateCreate, ScheduleTemplateUpdate, ScheduleTemplateResponse,
+    TemplateApply, DayBlocks, ScheduleChangeResponse, TemplateBlock, Weekday,
+)
 
 router = APIRouter(prefix="/schedule", tags=["schedule"])
 
+logger = logging.getLogger(__name__)
 
-@router.get("/blocks", response_model=list[ScheduleBlockResponse])
-def get_blocks():
-    response = schedule_blocks_table.scan()
-    items = response.get("Items", [])
-    # Sort by day order then start time
-    day_order = {"Monday": 0, "Tuesday": 1, "Wednesday": 2, "Thursday": 3,
-                 "Friday": 4, "Saturday": 5, "Sunday": 6}
-    return sorted(items, key=lambda x: (day_order.get(x.get("day", ""), 7), x.get("startTime", "")))
+DAY_ORDER = {"Monday": 0, "Tuesday": 1, "Wednesday": 2, "Thursday": 3,
+             "Friday": 4, "Saturday": 5, "Sunday": 6}
 
 
-@router.get("/blocks/{block_id}", response_model=ScheduleBlockResponse)
-def get_block(block_id: str):
-    response = schedule_blocks_table.get_item(Key={"id": block_id})
-    item = response.get("Item")
-    if not item:
-        raise HTTPException(status_code=404, detail="Block not found")
-    return item
+def index_attributes(block: dict) -> dict:
+    """Index keys for a block: sorted by day order, then start time."""
+    day = DAY_ORDER.get(block.get("day", ""), 7)
+    return {"collection": "schedule_blocks", "slot": f"{day}#{block.get('startTime', '')}"}
 
 
-@router.post("/blocks", response_model=ScheduleBlockResponse, status_code=201)
-def create_block(block: ScheduleBlockCreate):
+def interval(block: dict) -> tuple[int, int, str]:
+    """A block's [start, end) minutes; ValueError if its times are malformed or out of order."""
+    start = to_minutes(block["startTime"])
+    end = to_minutes(block["endTime"])
+    if end <= start:
+        raise ValueError(f"ends at {block['endTime']}, not after {block['startTime']}")
+    return start, end, block["id"]
+
+
+def stored_interval(block: dict) -> tuple[int, int, str] | None:
+    """interval() of a row from the table, or None (logged) for a row written
+    before times were validated, which the index then leaves out."""
+    try:
+        return interval(block)
+    except (KeyError, ValueError) as e:
+        logger.warning("Leaving schedule block %s out of the index: %s", block.get("id"), e)
+        return None
+
+
+class ScheduleIndex:
+    """Interval indexes of every weekday's blocks, kept in this container.
+
+    Writes made here patch the index and advance its version by the one
+    bump they gave the table's version stamp. If the stamp has moved any
+    further, another container wrote too, and the index is rebuilt.
+    """
+
+    def __init__(self):
+        self.days: dict[str, DayIntervals] | None = None
+        self.version: int | None = None
+
+    async def get(self) -> dict[str, DayIntervals]:
+        version = await schedule_blocks_repo.version()
+        if self.days is None or version != self.version:
+            table = await schedule_blocks_repo.table()
+            by_day = {day: [] for day in DAY_ORDER}
+            for block in await query_all(table, **collection_query("schedule_blocks")):
+                span = stored_interval(block) if block.get("day") in by_day else None
+                if span:
+                    by_day[block["day"]].append(span)
+            self.days, self.version = {day: DayIntervals(i) for day, i in by_day.items()}, version
+        return self.days
+
+    def apply(self, old: dict | None, new: dict | None) -> None:
+        """Patch in one write made through the repository since get()."""
+        self.apply_batch([old] if old else [], [new] if new else [])
+
+    def apply_batch(self, deleted: list[dict], created: list[dict]) -> None:
+        """Patch in one batch write, which bumps the version once."""
+        if self.days is None:
+            return
+        for block in deleted:
+            if block.get("day") in self.days:
+                self.days[block["day"]].remove(block["id"])
+        for block in created:
+            span = stored_interval(block) if block.get("day") in self.days else None
+            if span:
+                self.days[block["day"]].add(*span)
+        self.version += 1
+
+
+schedule_index = ScheduleIndex()
+
+
+def with_conflicts(days: dict[str, DayIntervals], block: dict, span: tuple | None = None) -> dict:
+    """The block with the ids of the blocks it overlaps, as a warning for the client."""
+    conflicts = []
+    span = span or (stored_interval(block) if block.get("day") in days else None)
+    if span:
+        start, end, block_id = span
+        conflicts = [i for i in days[block["day"]].overlapping(start, end) if i != block_id]
+    return {**block, "conflicts": conflicts}
+
+
+def new_block(block: ScheduleBlockCreate) -> dict:
     item = {
         "id": str(uuid.uuid4()),
         "title": block.title,
@@ -36,44 +112,162 @@ def create_block(block: ScheduleBlockCreate):
         "endTime": block.endTime,
         "color": block.color,
     }
-    schedule_blocks_table.put_item(Item=item)
+    item.update(index_attributes(item))
     return item
 
 
+def day_query(day: str) -> dict:
+    """The collection query narrowed to one day, whose blocks share a slot prefix."""
+    query = collection_query("schedule_blocks")
+    return {
+        **query,
+        "KeyConditionExpression": "#pk = :pk AND begins_with(#slot, :day)",
+        "ExpressionAttributeNames": {**query["ExpressionAttributeNames"], "#slot": "slot"},
+        "ExpressionAttributeValues": {**query["ExpressionAttributeValues"], ":day": f"{DAY_ORDER[day]}#"},
+    }
+
+
+def day_blocks(day: str, blocks: list[TemplateBlock]) -> list[dict]:
+    return [new_block(ScheduleBlockCreate(day=day, **block.model_dump())) for block in blocks]
+
+
+async def reshape(clear_days, blocks: list[dict]) -> dict:
+    """Delete every block on `clear_days` and create `blocks`, as one batch write.
+
+    Blocks to delete are found by day on the index, so unlike DELETE
+    /blocks/{id} there is no read per block.
+    """
+    days = await schedule_index.get()
+    table = await schedule_blocks_repo.table()
+    found = await parallel_map(lambda day: query_all(table, **day_query(day)), list(clear_days))
+    deleted = [block for day in found for block in day]
+    if deleted or blocks:
+        await schedule_blocks_repo.batch_write(puts=blocks, deletes=[block["id"] for block in deleted])
+        schedule_index.apply_batch(deleted, blocks)
+    return {"created": [with_conflicts(days, block) for block in blocks], "deleted": deleted}
+
+
+@router.get("/blocks", response_model=Page[ScheduleBlockResponse], dependencies=[versioned(schedule_blocks_repo)])
+async def get_blocks(page: PageParams = Depends()):
+    return await query_page(await schedule_blocks_repo.table(), page, collection_query("schedule_blocks"))
+
+
+@router.get("/free", response_model=FreeSlotsResponse, dependencies=[versioned(schedule_blocks_repo)])
+async def get_free_slots(
+    day: str,
+    min_minutes: int = Query(30, alias="minMinutes", ge=1, le=DAY_MINUTES),
+    after: str = Query("00:00", pattern=TIME_PATTERN),
+    before: str = Query("24:00", pattern=TIME_PATTERN),
+):
+    """Gaps of at least `minMinutes` between the blocks on `day`, within [after, before)."""
+    if day not in DAY_ORDER:
+        raise HTTPException(status_code=400, detail=f"day must be one of {', '.join(DAY_ORDER)}")
+    days = await schedule_index.get()
+    slots = days[day].free(min_minutes, to_minutes(after), to_minutes(before))
+    return {
+        "day": day,
+        "slots": [{"startTime": to_time(s), "endTime": to_time(e), "minutes": e - s} for s, e in slots],
+    }
+
+
+@router.get("/blocks/{block_id}", response_model=ScheduleBlockResponse, dependencies=[versioned(schedule_blocks_repo)])
+async def get_block(block_id: str):
+    return await schedule_blocks_repo.get(block_id)
+
+
+@router.post("/blocks", response_model=ScheduleBlockResponse, status_code=201)
+async def create_block(block: ScheduleBlockCreate):
+    item = new_block(block)
+    span = interval(item)
+    days = await schedule_index.get()
+    await schedule_blocks_repo.put(item)
+    schedule_index.apply(None, item)
+    return with_conflicts(days, item, span)
+
+
 @router.patch("/blocks/{block_id}", response_model=ScheduleBlockResponse)
-def update_block(block_id: str, block: ScheduleBlockUpdate):
-    response = schedule_blocks_table.get_item(Key={"id": block_id})
-    item = response.get("Item")
-    if not item:
-        raise HTTPException(status_code=404, detail="Block not found")
-
-    update_expr = []
-    expr_values = {}
-    expr_names = {}
-
-    for field in ["title", "day", "startTime", "endTime", "color"]:
-        value = getattr(block, field)
-        if value is not None:
-            update_expr.append(f"#{field} = :{field}")
-            expr_values[f":{field}"] = value
-            expr_names[f"#{field}"] = field
-
-    if update_expr:
-        schedule_blocks_table.update_item(
-            Key={"id": block_id},
-            UpdateExpression="SET " + ", ".join(update_expr),
-            ExpressionAttributeValues=expr_values,
-            ExpressionAttributeNames=expr_names,
-        )
-
-    response = schedule_blocks_table.get_item(Key={"id": block_id})
-    return response.get("Item")
+async def update_block(block_id: str, block: ScheduleBlockUpdate):
+    if (block.startTime is None) != (block.endTime is None):
+        # The model checks a pair; one new time is checked against the stored other
+        current = await schedule_blocks_repo.get(block_id)
+        start, end = block.startTime or current["startTime"], block.endTime or current["endTime"]
+        if end <= start:
+            raise HTTPException(status_code=422, detail="endTime must be after startTime")
+    days = await schedule_index.get()
+    previous = {}
+    item = await schedule_blocks_repo.update(block_id, block, derive=index_attributes, previous=previous)
+    schedule_index.apply(previous, item)
+    return with_conflicts(days, item)
 
 
 @router.delete("/blocks/{block_id}", status_code=204)
-def delete_block(block_id: str):
-    response = schedule_blocks_table.get_item(Key={"id": block_id})
-    if not response.get("Item"):
-        raise HTTPException(status_code=404, detail="Block not found")
-    schedule_blocks_table.delete_item(Key={"id": block_id})
+async def delete_block(block_id: str):
+    await schedule_index.get()
+    schedule_index.apply(await schedule_blocks_repo.delete(block_id), None)
     return None
+
+
+@router.delete("/blocks", response_model=ScheduleChangeResponse)
+async def clear_blocks(day: list[Weekday] | None = Query(None)):
+    """Delete every block on the given days, or in the whole week."""
+    return await reshape(day or list(DAY_ORDER), [])
+
+
+@router.put("/days/{day}", response_model=ScheduleChangeResponse)
+async def replace_day(day: Weekday, body: DayBlocks):
+    """Replace all of a day's blocks."""
+    return await reshape([day], day_blocks(day, body.blocks))
+
+
+@router.get(
+    "/templates", response_model=Page[ScheduleTemplateResponse], dependencies=[versioned(schedule_templates_repo)],
+)
+async def get_templates(page: PageParams = Depends()):
+    return await schedule_templates_repo.cached_page(page, lambda table: scan_page(table, page))
+
+
+@router.get(
+    "/templates/{template_id}",
+    response_model=ScheduleTemplateResponse,
+    dependencies=[versioned(schedule_templates_repo)],
+)
+async def get_template(template_id: str):
+    return await schedule_templates_repo.get(template_id)
+
+
+@router.post("/templates", response_model=ScheduleTemplateResponse, status_code=201)
+async def create_template(template: ScheduleTemplateCreate):
+    return await schedule_templates_repo.put({"id": str(uuid.uuid4()), **template.model_dump()})
+
+
+@router.patch("/templates/{template_id}", response_model=ScheduleTemplateResponse)
+async def update_template(template_id: str, template: ScheduleTemplateUpdate):
+    return await schedule_templates_repo.update(template_id, template)
+
+
+@router.delete("/templates/{template_id}", status_code=204)
+async def delete_template(template_id: str):
+    await schedule_templates_repo.delete(template_id)
+    return None
+
+
+@router.post("/templates/{template_id}/apply", response_model=ScheduleChangeResponse)
+async def apply_template(template_id: str, body: TemplateApply):
+    """Add a template's blocks to each of `days`, first clearing them if `replace`."""
+    try:
+        # A template stored before block times were checked may not apply
+        template = ScheduleTemplateCreate(**await schedule_templates_repo.get(template_id))
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=f"Template has invalid blocks: {e.error_count()} error(s)")
+    days = list(dict.fromkeys(body.days))
+    blocks = [block for day in days for block in day_blocks(day, template.blocks)]
+    return await reshape(days if body.replace else [], blocks)
+
+
+@router.post("/blocks/batch", response_model=BatchResponse[ScheduleBlockResponse])
+async def batch_blocks(batch: BatchRequest):
+    return await run_batch(
+        schedule_blocks_repo, batch.operations,
+        ScheduleBlockCreate, lambda blocks: [new_block(b) for b in blocks],
+        ScheduleBlockUpdate, update_block,
+    )
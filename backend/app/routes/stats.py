@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+
+from app.aws import pool_stats
+from app.cache import CACHES
+from app.database import COUNTS, get_counters
+from app.schemas import CountsResponse, CacheStatsResponse, PoolStatsResponse
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+@router.get("/counts", response_model=CountsResponse)
+async def get_counts():
+    """Exact item count of every collection, read from the counters table."""
+    return {"counts": await get_counters(COUNTS)}
+
+
+@router.get("/cache", response_model=CacheStatsResponse)
+async def get_cache_stats():
+    """Hit/miss counts of this container's table caches since it started."""
+    return {"caches": {name: cache.stats() for name, cache in CACHES.items()}}
+
+
+@router.get("/pools", response_model=PoolStatsResponse)
+async def get_pool_stats():
+    """Connection pool usage of this container's AWS clients since it started."""
+    return {"pools": pool_stats()}
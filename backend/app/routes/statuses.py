@@ -1,92 +1,44 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends
 
-from app.database import statuses_table
-from app.schemas import StatusCreate, StatusUpdate, StatusResponse
+from app.database import statuses_repo, set_fields
+from app.etag import versioned
+from app.ordering import statuses_ordering
+from app.pagination import PageParams, collection_query, query_page
+from app.schemas import Page, StatusCreate, StatusUpdate, StatusResponse
 
 router = APIRouter(prefix="/statuses", tags=["statuses"])
 
 
-@router.get("", response_model=list[StatusResponse])
-def get_statuses():
-    response = statuses_table.scan()
-    items = response.get("Items", [])
-    return sorted(items, key=lambda x: x.get("order", 0))
+@router.get("", response_model=Page[StatusResponse], dependencies=[versioned(statuses_repo)])
+async def get_statuses(page: PageParams = Depends()):
+    return await statuses_repo.cached_page(page, lambda table: query_page(table, page, collection_query("statuses")))
 
 
-@router.get("/{status_id}", response_model=StatusResponse)
-def get_status(status_id: str):
-    response = statuses_table.get_item(Key={"id": status_id})
-    item = response.get("Item")
-    if not item:
-        raise HTTPException(status_code=404, detail="Status not found")
-    return item
+@router.get("/{status_id}", response_model=StatusResponse, dependencies=[versioned(statuses_repo)])
+async def get_status(status_id: str):
+    return await statuses_repo.get(status_id)
 
 
 @router.post("", response_model=StatusResponse, status_code=201)
-def create_status(status: StatusCreate):
-    existing = statuses_table.get_item(Key={"id": status.id})
-    if existing.get("Item"):
-        raise HTTPException(status_code=400, detail="Status already exists")
-
-    response = statuses_table.scan(Select="COUNT")
-    count = response.get("Count", 0)
-
+async def create_status(status: StatusCreate):
     item = {
         "id": status.id,
         "label": status.label,
         "color": status.color,
         "icon": status.icon,
-        "order": count,
+        "order": (await statuses_ordering.append("statuses"))[0],
+        "collection": "statuses",
     }
-    statuses_table.put_item(Item=item)
+    await statuses_repo.put(item, conflict="Status already exists")
     return item
 
 
 @router.patch("/{status_id}", response_model=StatusResponse)
-def update_status(status_id: str, status: StatusUpdate):
-    response = statuses_table.get_item(Key={"id": status_id})
-    item = response.get("Item")
-    if not item:
-        raise HTTPException(status_code=404, detail="Status not found")
-
-    update_expr = []
-    expr_values = {}
-    expr_names = {}
-
-    if status.label is not None:
-        update_expr.append("#label = :label")
-        expr_values[":label"] = status.label
-        expr_names["#label"] = "label"
-    if status.color is not None:
-        update_expr.append("#color = :color")
-        expr_values[":color"] = status.color
-        expr_names["#color"] = "color"
-    if status.icon is not None:
-        update_expr.append("#icon = :icon")
-        expr_values[":icon"] = status.icon
-        expr_names["#icon"] = "icon"
-    if status.order is not None:
-        update_expr.append("#order = :order")
-        expr_values[":order"] = status.order
-        expr_names["#order"] = "order"
-
-    if update_expr:
-        statuses_table.update_item(
-            Key={"id": status_id},
-            UpdateExpression="SET " + ", ".join(update_expr),
-            ExpressionAttributeValues=expr_values,
-            ExpressionAttributeNames=expr_names,
-        )
-
-    response = statuses_table.get_item(Key={"id": status_id})
-    return response.get("Item")
+async def update_status(status_id: str, status: StatusUpdate):
+    return await statuses_repo.update(status_id, await statuses_ordering.apply_move(set_fields(status)))
 
 
 @router.delete("/{status_id}", status_code=204)
-def delete_status(status_id: str):
-    response = statuses_table.get_item(Key={"id": status_id})
-    if not response.get("Item"):
-        raise HTTPException(status_code=404, detail="Status not found")
-
-    statuses_table.delete_item(Key={"id": status_id})
+async def delete_status(status_id: str):
+    await statuses_repo.delete(status_id)
     return None
@@ -1,109 +1,115 @@
 import uuid
-from datetime import datetime
-from fastapi import APIRouter, HTTPException
+from datetime import date, datetime, timedelta
+from fastapi import APIRouter, Depends
 
-from app.database import tasks_table
-from app.schemas import TaskCreate, TaskUpdate, TaskResponse
+from app.database import tasks_repo, set_fields
+from app.etag import versioned
+from app.ordering import tasks_ordering
+from app.pagination import PageParams, collection_query, query_page, with_filter
+from app.batch import run_batch
+from app.schemas import Page, BatchRequest, BatchResponse, TaskCreate, TaskUpdate, TaskResponse
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+DUE_INDEX = "due-index"
 
-@router.get("", response_model=list[TaskResponse])
-def get_tasks():
-    response = tasks_table.scan()
-    items = response.get("Items", [])
-    return sorted(items, key=lambda x: x.get("order", 0))
 
+def index_attributes(task: dict) -> dict:
+    """Index keys for a task.
 
-@router.get("/{task_id}", response_model=TaskResponse)
-def get_task(task_id: str):
-    response = tasks_table.get_item(Key={"id": task_id})
-    item = response.get("Item")
-    if not item:
-        raise HTTPException(status_code=404, detail="Task not found")
-    return item
+    Only tasks with a due date land in the sparse due-index. None marks a
+    key the task must not carry: DynamoDB rejects a null or empty index
+    key, so a task without a due date has no dueDate either.
+    """
+    due = task.get("dueDate") or None
+    return {"collection": "tasks", "dueCollection": "tasks" if due else None, "dueDate": due}
 
 
-@router.post("", response_model=TaskResponse, status_code=201)
-def create_task(task: TaskCreate):
-    response = tasks_table.scan(Select="COUNT")
-    count = response.get("Count", 0)
+def due_query(start: date, end: date) -> dict:
+    """Tasks due from `start` to `end`, inclusive, in due-date order."""
+    after = (end + timedelta(days=1)).isoformat()
+    # BETWEEN is inclusive, so a task due exactly at `after` is filtered back out
+    return {
+        "IndexName": DUE_INDEX,
+        "KeyConditionExpression": "#pk = :pk AND #dueDate BETWEEN :start AND :after",
+        "FilterExpression": "#dueDate < :after",
+        "ExpressionAttributeNames": {"#pk": "dueCollection", "#dueDate": "dueDate"},
+        "ExpressionAttributeValues": {":pk": "tasks", ":start": start.isoformat(), ":after": after},
+    }
+
+
+async def new_tasks(tasks: list[TaskCreate]) -> list[dict]:
+    orders = await tasks_ordering.append("tasks", len(tasks))
     now = datetime.utcnow().isoformat()
 
-    item = {
-        "id": str(uuid.uuid4()),
-        "title": task.title,
-        "status": task.status,
-        "description": task.description,
-        "priority": task.priority,
-        "dueDate": task.dueDate,
-        "tags": task.tags,
-        "subtasks": [s.model_dump() for s in task.subtasks],
-        "order": count,
-        "createdAt": now,
-        "completedAt": None,
-    }
-    tasks_table.put_item(Item=item)
-    return item
+    items = [
+        {
+            "id": str(uuid.uuid4()),
+            "title": task.title,
+            "status": task.status,
+            "description": task.description,
+            "priority": task.priority,
+            "dueDate": task.dueDate,
+            "tags": task.tags,
+            "subtasks": [s.model_dump() for s in task.subtasks],
+            "order": order,
+            "createdAt": now,
+            "completedAt": None,
+        }
+        for task, order in zip(tasks, orders)
+    ]
+    return [
+        {k: v for k, v in {**item, **index_attributes(item)}.items() if v is not None}
+        for item in items
+    ]
+
+
+@router.get("", response_model=Page[TaskResponse], dependencies=[versioned(tasks_repo)])
+async def get_tasks(status: str | None = None, page: PageParams = Depends()):
+    query = collection_query("tasks")
+    if status is not None:
+        query = with_filter(query, "#status = :status", {"#status": "status"}, {":status": status})
+    return await query_page(await tasks_repo.table(), page, query)
+
+
+@router.get("/{task_id}", response_model=TaskResponse, dependencies=[versioned(tasks_repo)])
+async def get_task(task_id: str):
+    return await tasks_repo.get(task_id)
+
+
+@router.post("", response_model=TaskResponse, status_code=201)
+async def create_task(task: TaskCreate):
+    return await tasks_repo.put((await new_tasks([task]))[0])
 
 
 @router.patch("/{task_id}", response_model=TaskResponse)
-def update_task(task_id: str, task: TaskUpdate):
-    response = tasks_table.get_item(Key={"id": task_id})
-    item = response.get("Item")
-    if not item:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    update_expr = []
-    expr_values = {}
-    expr_names = {}
-
-    fields = ["title", "description", "priority", "dueDate", "tags", "order"]
-    for field in fields:
-        value = getattr(task, field)
-        if value is not None:
-            update_expr.append(f"#{field} = :{field}")
-            expr_values[f":{field}"] = value
-            expr_names[f"#{field}"] = field
-
-    # Handle status change with completedAt
-    if task.status is not None:
-        update_expr.append("#status = :status")
-        expr_values[":status"] = task.status
-        expr_names["#status"] = "status"
-
-        if task.status == "completed" and item.get("status") != "completed":
-            update_expr.append("#completedAt = :completedAt")
-            expr_values[":completedAt"] = datetime.utcnow().isoformat()
-            expr_names["#completedAt"] = "completedAt"
-        elif task.status != "completed":
-            update_expr.append("#completedAt = :completedAt")
-            expr_values[":completedAt"] = None
-            expr_names["#completedAt"] = "completedAt"
-
-    # Handle subtasks
-    if task.subtasks is not None:
-        update_expr.append("#subtasks = :subtasks")
-        expr_values[":subtasks"] = [s.model_dump() for s in task.subtasks]
-        expr_names["#subtasks"] = "subtasks"
-
-    if update_expr:
-        tasks_table.update_item(
-            Key={"id": task_id},
-            UpdateExpression="SET " + ", ".join(update_expr),
-            ExpressionAttributeValues=expr_values,
-            ExpressionAttributeNames=expr_names,
-        )
-
-    response = tasks_table.get_item(Key={"id": task_id})
-    return response.get("Item")
+async def update_task(task_id: str, task: TaskUpdate):
+    updates = await tasks_ordering.apply_move(set_fields(task))
+    remove = ["completedAt"] if task.status not in (None, "completed") else []
+    if "dueDate" in updates:
+        # An empty due date clears it
+        if updates["dueDate"]:
+            updates["dueCollection"] = "tasks"
+        else:
+            del updates["dueDate"]
+            remove.extend(["dueDate", "dueCollection"])
+    # Stamp completedAt only on the transition, so re-saving a completed task keeps it
+    now = datetime.utcnow().isoformat()
+    if_missing = {"completedAt": now} if task.status == "completed" else None
+    item = await tasks_repo.update(task_id, updates, remove=remove, if_missing=if_missing)
+
+    # Tasks written before unset fields were left out hold a null, which if_not_exists keeps
+    if task.status == "completed" and not item.get("completedAt"):
+        item = await tasks_repo.update(task_id, {"completedAt": now})
+    return item
 
 
 @router.delete("/{task_id}", status_code=204)
-def delete_task(task_id: str):
-    response = tasks_table.get_item(Key={"id": task_id})
-    if not response.get("Item"):
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    tasks_table.delete_item(Key={"id": task_id})
+async def delete_task(task_id: str):
+    await tasks_repo.delete(task_id)
     return None
+
+
+@router.post("/batch", response_model=BatchResponse[TaskResponse])
+async def batch_tasks(batch: BatchRequest):
+    return await run_batch(tasks_repo, batch.operations, TaskCreate, new_tasks, TaskUpdate, update_task)
@@ -1,17 +1,27 @@
+from .page import Page
+from .batch import BatchOperation, BatchRequest, BatchResult, BatchResponse
+from .job import JobResponse
+from .stats import CountsResponse, CacheStats, CacheStatsResponse, PoolStats, PoolStatsResponse
 from .task import TaskCreate, TaskUpdate, TaskResponse
 from .status import StatusCreate, StatusUpdate, StatusResponse
 from .note import (
-    NoteCreate, NoteUpdate, NoteResponse,
+    NoteCreate, NoteUpdate, NoteResponse, NoteFacetsResponse,
+    NoteContentOp, NoteContentPatch, NoteContentResponse,
     NoteFolderCreate, NoteFolderUpdate, NoteFolderResponse,
 )
 from .kanban import (
     BoardCreate, BoardUpdate, BoardResponse,
     ColumnCreate, ColumnUpdate, ColumnResponse,
     CardCreate, CardUpdate, CardResponse,
+    ColumnWithCardsResponse, BoardFullResponse,
+)
+from .calendar import Recurrence, EventCreate, EventUpdate, EventResponse
+from .routine import RoutineCreate, RoutineUpdate, RoutineResponse, RoutinesDay, RoutinesDueResponse
+from .schedule import (
+    ScheduleBlockCreate, ScheduleBlockUpdate, ScheduleBlockResponse, FreeSlot, FreeSlotsResponse,
+    TemplateBlock, ScheduleTemplateCreate, ScheduleTemplateUpdate, ScheduleTemplateResponse,
+    TemplateApply, DayBlocks, ScheduleChangeResponse, DeletedBlock, Weekday,
 )
-from .calendar import EventCreate, EventUpdate, EventResponse
-from .routine import RoutineCreate, RoutineUpdate, RoutineResponse
-from .schedule import ScheduleBlockCreate, ScheduleBlockUpdate, ScheduleBlockResponse
 from .contact import ContactCreate, ContactUpdate, ContactResponse, ContactLink
 from .preferences import UserPreferencesUpdate, UserPreferencesResponse
 from .recipe import RecipeCreate, RecipeUpdate, RecipeResponse
@@ -20,21 +30,31 @@ from .meal_plan import (
     MealPlanCreate, MealPlanUpdate, MealPlanResponse,
     MealPlanDay, MealEntry,
 )
+from .agenda import AgendaItem, AgendaResponse
 
 __all__ = [
+    "Page",
+    "BatchOperation", "BatchRequest", "BatchResult", "BatchResponse",
+    "JobResponse",
+    "CountsResponse", "CacheStats", "CacheStatsResponse", "PoolStats", "PoolStatsResponse",
     "TaskCreate", "TaskUpdate", "TaskResponse",
     "StatusCreate", "StatusUpdate", "StatusResponse",
-    "NoteCreate", "NoteUpdate", "NoteResponse",
+    "NoteCreate", "NoteUpdate", "NoteResponse", "NoteFacetsResponse",
+    "NoteContentOp", "NoteContentPatch", "NoteContentResponse",
     "NoteFolderCreate", "NoteFolderUpdate", "NoteFolderResponse",
     "BoardCreate", "BoardUpdate", "BoardResponse",
     "ColumnCreate", "ColumnUpdate", "ColumnResponse",
     "CardCreate", "CardUpdate", "CardResponse",
-    "EventCreate", "EventUpdate", "EventResponse",
-    "RoutineCreate", "RoutineUpdate", "RoutineResponse",
-    "ScheduleBlockCreate", "ScheduleBlockUpdate", "ScheduleBlockResponse",
+    "ColumnWithCardsResponse", "BoardFullResponse",
+    "Recurrence", "EventCreate", "EventUpdate", "EventResponse",
+    "RoutineCreate", "RoutineUpdate", "RoutineResponse", "RoutinesDay", "RoutinesDueResponse",
+    "ScheduleBlockCreate", "ScheduleBlockUpdate", "ScheduleBlockResponse", "FreeSlot", "FreeSlotsResponse",
+    "TemplateBlock", "ScheduleTemplateCreate", "ScheduleTemplateUpdate", "ScheduleTemplateResponse",
+    "TemplateApply", "DayBlocks", "ScheduleChangeResponse", "DeletedBlock", "Weekday",
     "ContactCreate", "ContactUpdate", "ContactResponse",
     "UserPreferencesUpdate", "UserPreferencesResponse",
     "RecipeCreate", "RecipeUpdate", "RecipeResponse",
     "ShoppingListCreate", "ShoppingListUpdate", "ShoppingListResponse", "ShoppingItem",
     "MealPlanCreate", "MealPlanUpdate", "MealPlanResponse", "MealPlanDay", "MealEntry",
+    "AgendaItem", "AgendaResponse",
 ]
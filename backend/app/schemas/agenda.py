@@ -0,0 +1,16 @@
+from typing import Literal
+from pydantic import BaseModel
+
+
+class AgendaItem(BaseModel):
+    kind: Literal["event", "block", "routine", "task"]
+    id: str
+    title: str
+    date: str
+    startTime: str | None = None  # None for all-day and untimed items
+    endTime: str | None = None
+    color: str | None = None
+
+
+class AgendaResponse(BaseModel):
+    items: list[AgendaItem]
@@ -0,0 +1,28 @@
+from typing import Generic, Literal, TypeVar
+from pydantic import BaseModel, Field
+
+T = TypeVar("T")
+
+MAX_BATCH_OPERATIONS = 100
+
+
+class BatchOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    id: str | None = None  # required for update and delete
+    data: dict = {}  # create or update payload for the resource
+
+
+class BatchRequest(BaseModel):
+    operations: list[BatchOperation] = Field(max_length=MAX_BATCH_OPERATIONS)
+
+
+class BatchResult(BaseModel, Generic[T]):
+    op: str
+    id: str | None = None
+    status: int  # HTTP status the equivalent single-item request would return
+    item: T | None = None
+    error: str | None = None
+
+
+class BatchResponse(BaseModel, Generic[T]):
+    results: list[BatchResult[T]]
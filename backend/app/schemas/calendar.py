@@ -1,4 +1,28 @@
-from pydantic import BaseModel
+from datetime import date
+from typing import Annotated, Literal
+from pydantic import AfterValidator, BaseModel, Field
+
+MAX_OCCURRENCES = 1000
+MAX_EXDATES = 500
+
+
+def _calendar_date(value: str) -> str:
+    date.fromisoformat(value)  # ValueError for a day the month lacks
+    return value
+
+
+# Kept as a "YYYY-MM-DD" string, whose prefix is the month-index key
+IsoDate = Annotated[str, Field(pattern=r"^\d{4}-\d{2}-\d{2}$"), AfterValidator(_calendar_date)]
+
+
+class Recurrence(BaseModel):
+    """An RRULE-style rule; the event's date is the first occurrence."""
+    freq: Literal["daily", "weekly", "monthly", "yearly"]
+    interval: int = Field(1, ge=1, le=1000)
+    byWeekday: list[Annotated[int, Field(ge=0, le=6)]] = Field(default_factory=list, max_length=7)  # weekly; 0 = Monday
+    until: date | None = None  # inclusive
+    count: int | None = Field(None, ge=1, le=MAX_OCCURRENCES)
+    exdates: list[date] = Field(default_factory=list, max_length=MAX_EXDATES)  # occurrences to skip
 
 
 class EventBase(BaseModel):
@@ -9,21 +33,25 @@ class EventBase(BaseModel):
     allDay: bool = False
     color: str = "default"
     description: str = ""
+    recurrence: Recurrence | None = None
 
 
 class EventCreate(EventBase):
-    pass
+    # Checked on requests only, so a stored row with a bad date can still be read back
+    date: IsoDate
 
 
 class EventUpdate(BaseModel):
     title: str | None = None
-    date: str | None = None
+    date: IsoDate | None = None
     startTime: str | None = None
     endTime: str | None = None
     allDay: bool | None = None
     color: str | None = None
     description: str | None = None
+    recurrence: Recurrence | None = None  # send null to stop repeating
 
 
 class EventResponse(EventBase):
     id: str
+    seriesStart: str | None = None  # set on an occurrence of a recurring event
@@ -0,0 +1,13 @@
+from typing import Literal
+from pydantic import BaseModel
+
+
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    status: Literal["pending", "running", "completed", "failed"]
+    total: int
+    done: int
+    error: str | None = None
+    createdAt: str
+    updatedAt: str
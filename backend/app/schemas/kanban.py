@@ -1,5 +1,7 @@
 from pydantic import BaseModel
 
+from .ordering import OrderKey
+
 
 # Board
 class BoardBase(BaseModel):
@@ -30,12 +32,14 @@ class ColumnCreate(ColumnBase):
 
 class ColumnUpdate(BaseModel):
     title: str | None = None
-    order: int | None = None
+    order: OrderKey | None = None
+    afterId: str | None = None
+    beforeId: str | None = None
 
 
 class ColumnResponse(ColumnBase):
     id: str
-    order: int
+    order: str
 
 
 # Card
@@ -53,9 +57,20 @@ class CardUpdate(BaseModel):
     title: str | None = None
     description: str | None = None
     columnId: str | None = None
-    order: int | None = None
+    order: OrderKey | None = None
+    afterId: str | None = None
+    beforeId: str | None = None
 
 
 class CardResponse(CardBase):
     id: str
-    order: int
+    order: str
+
+
+# Board with its columns and cards, for rendering a board in one request
+class ColumnWithCardsResponse(ColumnResponse):
+    cards: list[CardResponse] = []
+
+
+class BoardFullResponse(BoardResponse):
+    columns: list[ColumnWithCardsResponse] = []
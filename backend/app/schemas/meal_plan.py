@@ -34,3 +34,4 @@ class MealPlanUpdate(BaseModel):
 class MealPlanResponse(MealPlanBase):
     id: str
     createdAt: str
+    revision: int = 0
@@ -1,4 +1,8 @@
-from pydantic import BaseModel
+from typing import Literal
+from pydantic import BaseModel, Field
+
+# Edits per content patch; an autosave sends a handful
+MAX_CONTENT_OPS = 500
 
 
 class NoteBase(BaseModel):
@@ -31,6 +35,35 @@ class NoteResponse(NoteBase):
     id: str
     createdAt: str
     updatedAt: str
+    # Bumped by every content write; content patches are based on one
+    revision: int = 0
+    # Set on list responses whose content is only the opening of a long note
+    contentTruncated: bool = False
+
+
+class NoteContentOp(BaseModel):
+    op: Literal["insert", "delete"]
+    # In UTF-16 code units, as a browser textarea counts, after the preceding ops
+    pos: int = Field(ge=0)
+    text: str = ""  # insert
+    count: int = Field(0, ge=0)  # delete
+
+
+class NoteContentPatch(BaseModel):
+    baseRevision: int = Field(ge=0)
+    ops: list[NoteContentOp] = Field(max_length=MAX_CONTENT_OPS)
+
+
+class NoteContentResponse(BaseModel):
+    id: str
+    revision: int
+    updatedAt: str
+
+
+class NoteFacetsResponse(BaseModel):
+    tags: dict[str, int]
+    folders: dict[str, int]
+    unfiled: int
 
 
 # Note Folder schemas
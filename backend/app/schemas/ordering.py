@@ -0,0 +1,6 @@
+from typing import Annotated
+from pydantic import AfterValidator
+
+from app.order_keys import validate_key
+
+OrderKey = Annotated[str, AfterValidator(validate_key)]
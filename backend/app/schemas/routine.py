@@ -31,3 +31,12 @@ class RoutineUpdate(BaseModel):
 
 class RoutineResponse(RoutineBase):
     id: str
+
+
+class RoutinesDay(BaseModel):
+    date: str
+    routines: list[RoutineResponse]
+
+
+class RoutinesDueResponse(BaseModel):
+    days: list[RoutinesDay]
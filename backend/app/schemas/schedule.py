@@ -1,4 +1,28 @@
-from pydantic import BaseModel
+from typing import Annotated, Literal
+from pydantic import BaseModel, Field, model_validator
+
+from app.intervals import TIME_PATTERN
+
+Weekday = Literal["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+MAX_TEMPLATE_BLOCKS = 50
+
+Time = Annotated[str, Field(pattern=TIME_PATTERN)]  # HH:MM, or 24:00 for the end of the day
+
+
+class TimeRange(BaseModel):
+    """Blocks must end after they start; either time may be absent on an update.
+
+    Only request models check times: rows stored before the check may
+    hold any string, and responses must still be able to return them.
+    """
+
+    @model_validator(mode="after")
+    def ends_after_start(self):
+        # Zero-padded times compare correctly as strings
+        if self.startTime is not None and self.endTime is not None and self.endTime <= self.startTime:
+            raise ValueError("endTime must be after startTime")
+        return self
 
 
 class ScheduleBlockBase(BaseModel):
@@ -9,17 +33,83 @@ class ScheduleBlockBase(BaseModel):
     color: str = "bg-blue-500"
 
 
-class ScheduleBlockCreate(ScheduleBlockBase):
-    pass
+class ScheduleBlockCreate(ScheduleBlockBase, TimeRange):
+    startTime: Time
+    endTime: Time
 
 
-class ScheduleBlockUpdate(BaseModel):
+class ScheduleBlockUpdate(TimeRange):
     title: str | None = None
     day: str | None = None
-    startTime: str | None = None
-    endTime: str | None = None
+    startTime: Time | None = None
+    endTime: Time | None = None
     color: str | None = None
 
 
 class ScheduleBlockResponse(ScheduleBlockBase):
     id: str
+    conflicts: list[str] = []  # ids of overlapping blocks, on create and update
+
+
+class FreeSlot(BaseModel):
+    startTime: str
+    endTime: str
+    minutes: int
+
+
+class FreeSlotsResponse(BaseModel):
+    day: str
+    slots: list[FreeSlot]
+
+
+class TemplateBlockBase(BaseModel):
+    """A block without a day: the day comes from where it is applied."""
+    title: str
+    startTime: str  # HH:MM
+    endTime: str  # HH:MM
+    color: str = "bg-blue-500"
+
+
+class TemplateBlock(TemplateBlockBase, TimeRange):
+    startTime: Time
+    endTime: Time
+
+
+class ScheduleTemplateCreate(BaseModel):
+    name: str
+    blocks: list[TemplateBlock] = Field(default_factory=list, max_length=MAX_TEMPLATE_BLOCKS)
+
+
+class ScheduleTemplateUpdate(BaseModel):
+    name: str | None = None
+    blocks: list[TemplateBlock] | None = Field(None, max_length=MAX_TEMPLATE_BLOCKS)
+
+
+class ScheduleTemplateResponse(BaseModel):
+    id: str
+    name: str
+    blocks: list[TemplateBlockBase] = []
+
+
+class TemplateApply(BaseModel):
+    days: list[Weekday] = Field(min_length=1, max_length=7)
+    replace: bool = False  # clear those days first
+
+
+class DayBlocks(BaseModel):
+    blocks: list[TemplateBlock] = Field(max_length=MAX_TEMPLATE_BLOCKS)
+
+
+class DeletedBlock(BaseModel):
+    """A deleted row as it was stored, which may predate any field or check."""
+    id: str
+    title: str | None = None
+    day: str | None = None
+    startTime: str | None = None
+    endTime: str | None = None
+    color: str | None = None
+
+
+class ScheduleChangeResponse(BaseModel):
+    created: list[ScheduleBlockResponse]
+    deleted: list[DeletedBlock]  # already gone, so the response must not fail on them
@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+
+
+class CountsResponse(BaseModel):
+    counts: dict[str, int]
+
+
+class CacheStats(BaseModel):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    ttlSeconds: float
+
+
+class CacheStatsResponse(BaseModel):
+    caches: dict[str, CacheStats]
+
+
+class PoolStats(BaseModel):
+    maxConnections: int
+    inFlight: int
+    peakInFlight: int
+    calls: int
+    queued: int
+    errors: int
+    timeouts: int
+    avgMs: float
+
+
+class PoolStatsResponse(BaseModel):
+    pools: dict[str, PoolStats]
@@ -1,5 +1,7 @@
 from pydantic import BaseModel
 
+from .ordering import OrderKey
+
 
 class StatusBase(BaseModel):
     label: str
@@ -15,9 +17,11 @@ class StatusUpdate(BaseModel):
     label: str | None = None
     color: str | None = None
     icon: str | None = None
-    order: int | None = None
+    order: OrderKey | None = None
+    afterId: str | None = None
+    beforeId: str | None = None
 
 
 class StatusResponse(StatusBase):
     id: str
-    order: int
+    order: str
@@ -1,5 +1,7 @@
 from pydantic import BaseModel
 
+from .ordering import OrderKey
+
 
 class Subtask(BaseModel):
     id: str
@@ -29,11 +31,13 @@ class TaskUpdate(BaseModel):
     dueDate: str | None = None
     tags: list[str] | None = None
     subtasks: list[Subtask] | None = None
-    order: int | None = None
+    order: OrderKey | None = None
+    afterId: str | None = None
+    beforeId: str | None = None
 
 
 class TaskResponse(TaskBase):
     id: str
-    order: int
+    order: str
     createdAt: str
     completedAt: str | None = None
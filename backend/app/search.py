@@ -0,0 +1,193 @@
+"""Full-text search over an inverted index table.
+
+Each indexed item has one posting per distinct term, keyed
+(`term`, `docId`), so a search queries only the postings of its own
+terms and its cost grows with the number of matches, not with the size of
+the collection. A per-item entry records which terms were posted, so a
+write replaces only the postings that changed.
+
+English and other space-separated text is indexed by word; Japanese,
+Chinese and Korean runs, which have no spaces, by overlapping character
+bigrams.
+"""
+
+import asyncio
+import logging
+import math
+import re
+import unicodedata
+
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
+
+from app.database import SEARCH_INDEX_TABLE, Repository, batch_get_items, get_table, parallel_map
+from app.pagination import PageParams, decode_cursor, encode_cursor, query_all
+
+# Hiragana, katakana, CJK ideographs and Hangul syllables
+CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+TOKEN = re.compile(rf"[{CJK}]+|[^\W{CJK}_]+")
+CJK_RUN = re.compile(rf"[{CJK}]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from in is it of on or that the this to was with".split()
+)
+
+# Longer queries are matched on their first terms and checked against
+# the full query when the results are loaded
+MAX_QUERY_TERMS = 12
+
+# Longer words (URLs, base64, pasted blobs) are cut to this many
+# characters, which keeps posting keys far below DynamoDB's 2048-byte limit
+MAX_TERM_LENGTH = 64
+
+# BM25 term-frequency saturation
+K1 = 1.2
+
+DOC = "@"
+
+logger = logging.getLogger(__name__)
+
+
+def tokenize(text: str) -> list[str]:
+    """Index terms of `text`, in order and with repeats.
+
+    Text is NFKC-normalized and case-folded, so full-width and half-width
+    forms match. A CJK run yields its bigrams (a lone character yields
+    itself), so queries need at least two characters to match inside a run.
+    """
+    terms = []
+    for run in TOKEN.findall(unicodedata.normalize("NFKC", text).casefold()):
+        if CJK_RUN.fullmatch(run):
+            terms.extend(run[i:i + 2] for i in range(max(len(run) - 1, 1)))
+        elif run not in STOPWORDS and (len(run) > 1 or run.isdigit()):
+            terms.append(run[:MAX_TERM_LENGTH])
+    return terms
+
+
+class SearchIndex:
+    """Search over `repo` items, weighting each term by the fields it appears in.
+
+    `unpack` turns a stored item back into the one that was written, for
+    tables that store fields compressed. Results are read with only
+    `attributes`, if given, so a search need not load large bodies.
+    """
+
+    def __init__(self, name: str, repo: Repository, fields: dict[str, int], unpack=None, attributes=None):
+        self.name = name
+        self.repo = repo
+        self.fields = fields
+        self.unpack = unpack or (lambda item: item)
+        self.attributes = attributes
+
+    def _term(self, term: str) -> str:
+        return f"{self.name}#{term}"
+
+    def _doc(self, item_id: str) -> dict:
+        return {"term": f"{self.name}{DOC}{item_id}", "docId": DOC}
+
+    def weights(self, item: dict) -> dict[str, int]:
+        """Term -> field-weighted occurrence count for one item."""
+        weights: dict[str, int] = {}
+        item = self.unpack(item)
+        for field, weight in self.fields.items():
+            value = item.get(field) or ""
+            for term in tokenize(" ".join(value) if isinstance(value, list) else value):
+                weights[term] = weights.get(term, 0) + weight
+        return weights
+
+    async def index(self, item: dict) -> None:
+        """Bring an item's postings in line with its current fields.
+
+        The item is already written by then, so a failure is logged rather
+        than failing the request; scripts/build_search_index.py rebuilds
+        the postings.
+        """
+        try:
+            await self._index(item)
+        except ClientError:
+            logger.exception("Could not index %s %s", self.name, item[self.repo.key])
+
+    async def _index(self, item: dict) -> None:
+        table = await get_table(SEARCH_INDEX_TABLE)
+        item_id = item[self.repo.key]
+        entry = (await table.get_item(Key=self._doc(item_id))).get("Item") or {}
+        old = {term: int(weight) for term, weight in entry.get("terms", {}).items()}
+        new = self.weights(item)
+        async with table.batch_writer(overwrite_by_pkeys=["term", "docId"]) as writer:
+            for term in old.keys() - new.keys():
+                await writer.delete_item(Key={"term": self._term(term), "docId": item_id})
+            for term, weight in new.items():
+                if old.get(term) != weight:
+                    await writer.put_item(Item={"term": self._term(term), "docId": item_id, "weight": weight})
+            await writer.put_item(Item={**self._doc(item_id), "terms": new})
+
+    async def unindex(self, item_id: str) -> None:
+        try:
+            await self._unindex(item_id)
+        except ClientError:
+            logger.exception("Could not unindex %s %s", self.name, item_id)
+
+    async def _unindex(self, item_id: str) -> None:
+        table = await get_table(SEARCH_INDEX_TABLE)
+        entry = (await table.get_item(Key=self._doc(item_id))).get("Item")
+        if not entry:
+            return
+        async with table.batch_writer(overwrite_by_pkeys=["term", "docId"]) as writer:
+            for term in entry.get("terms", {}):
+                await writer.delete_item(Key={"term": self._term(term), "docId": item_id})
+            await writer.delete_item(Key=self._doc(item_id))
+
+    async def _postings(self, term: str) -> dict[str, int]:
+        table = await get_table(SEARCH_INDEX_TABLE)
+        items = await query_all(
+            table,
+            KeyConditionExpression="#term = :term",
+            ProjectionExpression="docId, #weight",
+            ExpressionAttributeNames={"#term": "term", "#weight": "weight"},
+            ExpressionAttributeValues={":term": self._term(term)},
+        )
+        return {item["docId"]: int(item["weight"]) for item in items}
+
+    async def rank(self, terms: list[str]) -> list[str]:
+        """Ids of items containing every term, best match first (BM25 without length norm)."""
+        postings = await parallel_map(self._postings, terms[:MAX_QUERY_TERMS])
+        matches = set.intersection(*(set(p) for p in postings))
+        total = max(await self.repo.count(), max(len(p) for p in postings))
+        scores = dict.fromkeys(matches, 0.0)
+        for posting in postings:
+            idf = math.log(1 + (total - len(posting) + 0.5) / (len(posting) + 0.5))
+            for item_id in matches:
+                weight = posting[item_id]
+                scores[item_id] += idf * weight * (K1 + 1) / (weight + K1)
+        return sorted(matches, key=lambda item_id: (-scores[item_id], item_id))
+
+    async def covering(self, ids: list[str], terms: list[str]) -> set[str]:
+        """Those of `ids` whose per-item entry lists every term."""
+        keys = {self._doc(i)["term"]: i for i in ids}
+        entries = await batch_get_items(
+            await get_table(SEARCH_INDEX_TABLE), [self._doc(i) for i in ids], attributes=["term", "terms"],
+        )
+        return {keys[entry["term"]] for entry in entries if set(terms) <= entry.get("terms", {}).keys()}
+
+    async def search(self, query: str, page: PageParams) -> dict:
+        """One page of items matching every term of `query`, best first.
+
+        Ranks are recomputed per page, so the cursor is an offset into them.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            raise HTTPException(status_code=400, detail="Query has no searchable terms")
+        _, start = decode_cursor(page.cursor)
+        offset = int((start or {}).get("offset", 0))
+
+        ranked = await self.rank(terms)
+        ids = ranked[offset:offset + page.limit]
+        found, covered = await asyncio.gather(
+            batch_get_items(await self.repo.table(), [{self.repo.key: i} for i in ids], self.attributes),
+            self.covering(ids, terms),
+        )
+        by_id = {item[self.repo.key]: item for item in found}
+        # Postings are written after the item, so skip any a concurrent write left stale
+        items = [by_id[i] for i in ids if i in by_id and i in covered]
+        end = offset + len(ids)
+        return {"items": items, "nextCursor": encode_cursor(0, {"offset": end}) if end < len(ranked) else None}
@@ -62,6 +62,15 @@ function getDateStr(date: Date): string {
 type ViewMode = "month" | "week" | "day"
 
 export function CalendarPage() {
+  const [currentDate, setCurrentDate] = useState(new Date())
+  // The month grid spans six weeks, padded with the neighbouring months
+  const visibleRange = useMemo(() => {
+    const year = currentDate.getFullYear()
+    const month = currentDate.getMonth()
+    const start = new Date(year, month, 1 - new Date(year, month, 1).getDay())
+    const end = new Date(start.getFullYear(), start.getMonth(), start.getDate() + 41)
+    return { from: getDateStr(start), to: getDateStr(end) }
+  }, [currentDate])
   const {
     events,
     loading,
@@ -69,8 +78,7 @@ export function CalendarPage() {
     createEvent,
     updateEvent,
     deleteEvent: deleteEventApi,
-  } = useCalendar()
-  const [currentDate, setCurrentDate] = useState(new Date())
+  } = useCalendar(visibleRange)
   const [viewMode, setViewMode] = useState<ViewMode>("month")
   const [selectedDate, setSelectedDate] = useState<Date | null>(null)
   const [isDialogOpen, setIsDialogOpen] = useState(false)
@@ -332,7 +340,7 @@ export function CalendarPage() {
                   <div className="space-y-0.5">
                     {dayEvents.slice(0, 3).map((event) => (
                       <div
-                        key={event.id}
+                        key={`${event.id}-${event.date}`}
                         className="text-xs px-1 py-0.5 rounded truncate text-white"
                         style={{ backgroundColor: event.color }}
                         title={event.title}
@@ -389,7 +397,7 @@ export function CalendarPage() {
               <div className="space-y-3">
                 {selectedDateEvents.map((event) => (
                   <div
-                    key={event.id}
+                    key={`${event.id}-${event.date}`}
                     className="group rounded-lg border p-3 hover:bg-primary/5 transition-colors"
                     style={{ borderLeftWidth: "4px", borderLeftColor: event.color }}
                   >
@@ -130,6 +130,7 @@ export function NotesPage() {
     folders,
     loading,
     error,
+    getFullNote,
     createNote,
     updateNote,
     deleteNote: deleteNoteApi,
@@ -219,7 +220,13 @@ export function NotesPage() {
     setIsDialogOpen(true)
   }
 
-  const handleEdit = (note: Note) => {
+  const handleEdit = async (note: Note) => {
+    try {
+      note = await getFullNote(note)
+    } catch (err) {
+      console.error("Failed to load note:", err)
+      return
+    }
     setEditingNote(note)
     setFormData({
       title: note.title,
@@ -302,6 +309,7 @@ export function NotesPage() {
 
   const handleDuplicate = async (note: Note) => {
     try {
+      note = await getFullNote(note)
       await createNote({
         title: `${note.title} (Copy)`,
         content: note.content,
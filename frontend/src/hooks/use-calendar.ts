@@ -1,6 +1,15 @@
 import { useState, useEffect, useCallback } from "react"
 import { api } from "@/lib/api"
 
+export interface Recurrence {
+  freq: "daily" | "weekly" | "monthly" | "yearly"
+  interval?: number
+  byWeekday?: number[]  // 0 = Monday
+  until?: string | null
+  count?: number | null
+  exdates?: string[]
+}
+
 export interface CalendarEvent {
   id: string
   title: string
@@ -14,6 +23,9 @@ export interface CalendarEvent {
   isRecurring: boolean
   recurringType: "daily" | "weekly" | "monthly" | "yearly" | null
   reminder: number
+  recurrence?: Recurrence | null
+  // Set on an occurrence of a recurring event: the date the series starts
+  seriesStart?: string | null
 }
 
 export interface EventCreate {
@@ -28,6 +40,7 @@ export interface EventCreate {
   isRecurring?: boolean
   recurringType?: "daily" | "weekly" | "monthly" | "yearly" | null
   reminder?: number
+  recurrence?: Recurrence | null
 }
 
 export interface EventUpdate {
@@ -42,9 +55,18 @@ export interface EventUpdate {
   isRecurring?: boolean
   recurringType?: "daily" | "weekly" | "monthly" | "yearly" | null
   reminder?: number
+  recurrence?: Recurrence | null
+}
+
+export interface DateRange {
+  from: string
+  to: string
 }
 
-export function useCalendar() {
+// With a range, only events dated within it (inclusive) are fetched
+export function useCalendar(range?: DateRange) {
+  const from = range?.from
+  const to = range?.to
   const [events, setEvents] = useState<CalendarEvent[]>([])
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
@@ -52,7 +74,8 @@ export function useCalendar() {
   const fetchEvents = useCallback(async () => {
     try {
       setLoading(true)
-      const data = await api.get<CalendarEvent[]>("/calendar/events")
+      const params = from && to ? { from, to } : undefined
+      const data = await api.list<CalendarEvent>("/calendar/events", { params })
       setEvents(data)
       setError(null)
     } catch (err) {
@@ -60,7 +83,7 @@ export function useCalendar() {
     } finally {
       setLoading(false)
     }
-  }, [])
+  }, [from, to])
 
   useEffect(() => {
     fetchEvents()
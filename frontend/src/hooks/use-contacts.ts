@@ -61,7 +61,7 @@ export function useContacts() {
   const fetchContacts = useCallback(async () => {
     try {
       setLoading(true)
-      const data = await api.get<Contact[]>("/contacts")
+      const data = await api.list<Contact>("/contacts")
       setContacts(data)
       setError(null)
     } catch (err) {
@@ -37,7 +37,7 @@ export function useGrocery() {
   const fetchLists = useCallback(async () => {
     try {
       setLoading(true)
-      const data = await api.get<GroceryList[]>("/grocery")
+      const data = await api.list<GroceryList>("/grocery")
       setLists(data)
       setError(null)
     } catch (err) {
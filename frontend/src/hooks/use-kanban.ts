@@ -10,7 +10,7 @@ export interface Column {
   id: string
   title: string
   boardId: string
-  order: number
+  order: string
 }
 
 export interface Card {
@@ -18,7 +18,11 @@ export interface Card {
   title: string
   description: string
   columnId: string
-  order: number
+  order: string
+}
+
+export interface BoardFull extends Board {
+  columns: (Column & { cards: Card[] })[]
 }
 
 export function useKanban(boardId?: string) {
@@ -30,7 +34,7 @@ export function useKanban(boardId?: string) {
 
   const fetchBoards = useCallback(async () => {
     try {
-      const data = await api.get<Board[]>("/kanban/boards")
+      const data = await api.list<Board>("/kanban/boards")
       setBoards(data)
     } catch (err) {
       setError(err instanceof Error ? err.message : "Failed to fetch boards")
@@ -39,7 +43,7 @@ export function useKanban(boardId?: string) {
 
   const fetchColumns = useCallback(async (bid: string) => {
     try {
-      const data = await api.get<Column[]>(`/kanban/boards/${bid}/columns`)
+      const data = await api.list<Column>(`/kanban/boards/${bid}/columns`)
       setColumns(data)
       return data
     } catch (err) {
@@ -48,9 +52,20 @@ export function useKanban(boardId?: string) {
     }
   }, [])
 
+  // Columns and cards for one board in a single request
+  const fetchBoard = useCallback(async (bid: string) => {
+    try {
+      const board = await api.get<BoardFull>(`/kanban/boards/${bid}/full`)
+      setColumns(board.columns.map(({ cards: _, ...col }) => col))
+      setCards(Object.fromEntries(board.columns.map(col => [col.id, col.cards])))
+    } catch (err) {
+      setError(err instanceof Error ? err.message : "Failed to fetch board")
+    }
+  }, [])
+
   const fetchCards = useCallback(async (columnId: string) => {
     try {
-      const data = await api.get<Card[]>(`/kanban/columns/${columnId}/cards`)
+      const data = await api.list<Card>(`/kanban/columns/${columnId}/cards`)
       setCards(prev => ({ ...prev, [columnId]: data }))
       return data
     } catch (err) {
@@ -64,15 +79,12 @@ export function useKanban(boardId?: string) {
       setLoading(true)
       await fetchBoards()
       if (boardId) {
-        const cols = await fetchColumns(boardId)
-        for (const col of cols) {
-          await fetchCards(col.id)
-        }
+        await fetchBoard(boardId)
       }
       setLoading(false)
     }
     init()
-  }, [boardId, fetchBoards, fetchColumns, fetchCards])
+  }, [boardId, fetchBoards, fetchBoard])
 
   // Board operations
   const createBoard = async (title: string) => {
@@ -99,7 +111,7 @@ export function useKanban(boardId?: string) {
     return newColumn
   }
 
-  const updateColumn = async (id: string, updates: { title?: string; order?: number }) => {
+  const updateColumn = async (id: string, updates: { title?: string; order?: string; afterId?: string; beforeId?: string }) => {
     const updated = await api.patch<Column>(`/kanban/columns/${id}`, updates)
     setColumns(prev => prev.map(c => c.id === id ? updated : c))
     return updated
@@ -124,7 +136,7 @@ export function useKanban(boardId?: string) {
     return newCard
   }
 
-  const updateCard = async (id: string, updates: { title?: string; description?: string; columnId?: string; order?: number }) => {
+  const updateCard = async (id: string, updates: { title?: string; description?: string; columnId?: string; order?: string; afterId?: string; beforeId?: string }) => {
     const updated = await api.patch<Card>(`/kanban/cards/${id}`, updates)
 
     // Handle column move
@@ -21,6 +21,7 @@ export interface MealPlan {
   startDate: string
   days: MealPlanDay[]
   createdAt: string
+  revision: number
 }
 
 export interface MealPlanCreate {
@@ -43,7 +44,7 @@ export function useMealPlans() {
   const fetchMealPlans = useCallback(async () => {
     try {
       setLoading(true)
-      const data = await api.get<MealPlan[]>("/meal-plans")
+      const data = await api.list<MealPlan>("/meal-plans")
       setMealPlans(data)
       setError(null)
     } catch (err) {
@@ -76,7 +77,7 @@ export function useMealPlans() {
 
   const generateGroceryList = async (id: string, listName?: string) => {
     const params = listName ? `?list_name=${encodeURIComponent(listName)}` : ""
-    const result = await api.post<{ groceryListId: string; groceryListName: string; itemCount: number }>(
+    const result = await api.post<{ groceryListId: string; groceryListName: string; itemCount: number; created: boolean }>(
       `/meal-plans/${id}/generate-grocery${params}`,
       {}
     )
@@ -13,6 +13,9 @@ export interface Note {
   folderId: string | null
   createdAt: string
   updatedAt: string
+  revision: number
+  // List responses carry only the opening of long notes; fetch the note for the rest
+  contentTruncated?: boolean
 }
 
 export interface NoteCreate {
@@ -37,6 +40,39 @@ export interface NoteUpdate {
   folderId?: string | null
 }
 
+export interface ContentOp {
+  op: "insert" | "delete"
+  pos: number
+  text?: string
+  count?: number
+}
+
+const isHighSurrogate = (code: number) => code >= 0xd800 && code <= 0xdbff
+const isLowSurrogate = (code: number) => code >= 0xdc00 && code <= 0xdfff
+
+// The edit from `before` to `after` as ops on the changed middle. Positions
+// are UTF-16 code units, like string indexes, and never split a character.
+export function contentOps(before: string, after: string): ContentOp[] {
+  let start = 0
+  while (start < before.length && start < after.length && before[start] === after[start]) start++
+  if (start > 0 && isHighSurrogate(before.charCodeAt(start - 1))) start--
+
+  let end = 0
+  while (
+    end < before.length - start &&
+    end < after.length - start &&
+    before[before.length - 1 - end] === after[after.length - 1 - end]
+  ) end++
+  if (end > 0 && isLowSurrogate(before.charCodeAt(before.length - end))) end--
+
+  const ops: ContentOp[] = []
+  const removed = before.length - start - end
+  if (removed > 0) ops.push({ op: "delete", pos: start, count: removed })
+  const inserted = after.slice(start, after.length - end)
+  if (inserted) ops.push({ op: "insert", pos: start, text: inserted })
+  return ops
+}
+
 export interface Folder {
   id: string
   name: string
@@ -63,8 +99,8 @@ export function useNotes() {
     try {
       setLoading(true)
       const [notesData, foldersData] = await Promise.all([
-        api.get<Note[]>("/notes"),
-        api.get<Folder[]>("/notes/folders"),
+        api.list<Note>("/notes"),
+        api.list<Folder>("/notes/folders"),
       ])
       setNotes(notesData)
       setFolders(foldersData)
@@ -80,6 +116,11 @@ export function useNotes() {
     fetchNotes()
   }, [fetchNotes])
 
+  const getFullNote = async (note: Note) => {
+    if (!note.contentTruncated) return note
+    return api.get<Note>(`/notes/${note.id}`)
+  }
+
   const createNote = async (note: NoteCreate) => {
     const newNote = await api.post<Note>("/notes", note)
     setNotes(prev => [newNote, ...prev])
@@ -92,6 +133,18 @@ export function useNotes() {
     return updated
   }
 
+  // Autosave: sends only the edit since `note` was loaded (it must not be
+  // truncated). A 409 means the note changed elsewhere and must be reloaded.
+  const saveContent = async (note: Note, content: string) => {
+    const saved = await api.patch<{ revision: number; updatedAt: string }>(`/notes/${note.id}/content`, {
+      baseRevision: note.revision,
+      ops: contentOps(note.content, content),
+    })
+    const updated = { ...note, content, revision: saved.revision, updatedAt: saved.updatedAt }
+    setNotes(prev => prev.map(n => n.id === note.id ? updated : n))
+    return updated
+  }
+
   const deleteNote = async (id: string) => {
     await api.delete(`/notes/${id}`)
     setNotes(prev => prev.filter(n => n.id !== id))
@@ -122,8 +175,10 @@ export function useNotes() {
     loading,
     error,
     refetch: fetchNotes,
+    getFullNote,
     createNote,
     updateNote,
+    saveContent,
     deleteNote,
     createFolder,
     updateFolder,
@@ -56,7 +56,7 @@ export function useRecipes() {
   const fetchRecipes = useCallback(async () => {
     try {
       setLoading(true)
-      const data = await api.get<Recipe[]>("/recipes")
+      const data = await api.list<Recipe>("/recipes")
       setRecipes(data)
       setError(null)
     } catch (err) {
@@ -49,7 +49,7 @@ export function useRoutines() {
   const fetchRoutines = useCallback(async () => {
     try {
       setLoading(true)
-      const data = await api.get<Routine[]>("/routines")
+      const data = await api.list<Routine>("/routines")
       setRoutines(data)
       setError(null)
     } catch (err) {
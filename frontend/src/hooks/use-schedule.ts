@@ -34,7 +34,7 @@ export function useSchedule() {
   const fetchBlocks = useCallback(async () => {
     try {
       setLoading(true)
-      const data = await api.get<ScheduleBlock[]>("/schedule/blocks")
+      const data = await api.list<ScheduleBlock>("/schedule/blocks")
       setBlocks(data)
       setError(null)
     } catch (err) {
@@ -16,7 +16,7 @@ export interface Task {
   dueDate: string | null
   tags: string[]
   subtasks: Subtask[]
-  order: number
+  order: string
   createdAt: string
   completedAt: string | null
 }
@@ -39,7 +39,9 @@ export interface TaskUpdate {
   dueDate?: string | null
   tags?: string[]
   subtasks?: Subtask[]
-  order?: number
+  order?: string
+  afterId?: string
+  beforeId?: string
 }
 
 export function useTasks() {
@@ -50,7 +52,7 @@ export function useTasks() {
   const fetchTasks = useCallback(async () => {
     try {
       setLoading(true)
-      const data = await api.get<Task[]>("/tasks")
+      const data = await api.list<Task>("/tasks")
       setTasks(data)
       setError(null)
     } catch (err) {
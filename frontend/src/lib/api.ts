@@ -4,6 +4,13 @@ interface RequestOptions extends RequestInit {
   params?: Record<string, string>
 }
 
+export interface Page<T> {
+  items: T[]
+  nextCursor: string | null
+}
+
+const LIST_PAGE_SIZE = "200"
+
 class ApiClient {
   private baseUrl: string
   private token: string | null = null
@@ -55,6 +62,20 @@ class ApiClient {
     return this.request<T>(endpoint, { ...options, method: "GET" })
   }
 
+  // Follow nextCursor until the collection is exhausted
+  async list<T>(endpoint: string, options?: RequestOptions): Promise<T[]> {
+    const items: T[] = []
+    let cursor: string | null = null
+    do {
+      const params: Record<string, string> = { ...options?.params, limit: LIST_PAGE_SIZE }
+      if (cursor) params.cursor = cursor
+      const page: Page<T> = await this.get<Page<T>>(endpoint, { ...options, params })
+      items.push(...page.items)
+      cursor = page.nextCursor
+    } while (cursor)
+    return items
+  }
+
   post<T>(endpoint: string, data?: unknown, options?: RequestOptions): Promise<T> {
     return this.request<T>(endpoint, {
       ...options,
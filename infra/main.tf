@@ -69,21 +69,26 @@ module "api" {
   dynamodb_table_arns = module.database.table_arns
 
   environment_variables = {
-    TASKS_TABLE            = module.database.table_names["tasks"]
-    STATUSES_TABLE         = module.database.table_names["statuses"]
-    NOTES_TABLE            = module.database.table_names["notes"]
-    NOTE_FOLDERS_TABLE     = module.database.table_names["note_folders"]
-    KANBAN_BOARDS_TABLE    = module.database.table_names["kanban_boards"]
-    KANBAN_COLUMNS_TABLE   = module.database.table_names["kanban_columns"]
-    KANBAN_CARDS_TABLE     = module.database.table_names["kanban_cards"]
-    CALENDAR_EVENTS_TABLE  = module.database.table_names["calendar_events"]
-    ROUTINES_TABLE         = module.database.table_names["routines"]
-    SCHEDULE_BLOCKS_TABLE  = module.database.table_names["schedule_blocks"]
-    CONTACTS_TABLE         = module.database.table_names["contacts"]
-    USER_PREFERENCES_TABLE = module.database.table_names["user_preferences"]
-    RECIPES_TABLE          = module.database.table_names["recipes"]
-    GROCERY_LISTS_TABLE    = module.database.table_names["grocery_lists"]
-    MEAL_PLANS_TABLE       = module.database.table_names["meal_plans"]
+    TASKS_TABLE              = module.database.table_names["tasks"]
+    STATUSES_TABLE           = module.database.table_names["statuses"]
+    NOTES_TABLE              = module.database.table_names["notes"]
+    NOTE_FOLDERS_TABLE       = module.database.table_names["note_folders"]
+    KANBAN_BOARDS_TABLE      = module.database.table_names["kanban_boards"]
+    KANBAN_COLUMNS_TABLE     = module.database.table_names["kanban_columns"]
+    KANBAN_CARDS_TABLE       = module.database.table_names["kanban_cards"]
+    CALENDAR_EVENTS_TABLE    = module.database.table_names["calendar_events"]
+    ROUTINES_TABLE           = module.database.table_names["routines"]
+    SCHEDULE_BLOCKS_TABLE    = module.database.table_names["schedule_blocks"]
+    SCHEDULE_TEMPLATES_TABLE = module.database.table_names["schedule_templates"]
+    CONTACTS_TABLE           = module.database.table_names["contacts"]
+    USER_PREFERENCES_TABLE   = module.database.table_names["user_preferences"]
+    RECIPES_TABLE            = module.database.table_names["recipes"]
+    GROCERY_LISTS_TABLE      = module.database.table_names["grocery_lists"]
+    MEAL_PLANS_TABLE         = module.database.table_names["meal_plans"]
+    JOBS_TABLE               = module.database.table_names["jobs"]
+    COUNTERS_TABLE           = module.database.table_names["counters"]
+    SEARCH_INDEX_TABLE       = module.database.table_names["search_index"]
+    NOTE_TAGS_TABLE          = module.database.table_names["note_tags"]
   }
 
   # Cognito auth
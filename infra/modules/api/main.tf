@@ -37,6 +37,8 @@ resource "aws_iam_role_policy" "dynamodb" {
           "dynamodb:PutItem",
           "dynamodb:UpdateItem",
           "dynamodb:DeleteItem",
+          "dynamodb:BatchGetItem",
+          "dynamodb:BatchWriteItem",
           "dynamodb:Scan",
           "dynamodb:Query"
         ]
@@ -49,6 +51,23 @@ resource "aws_iam_role_policy" "dynamodb" {
   })
 }
 
+# Background jobs re-invoke the function asynchronously
+resource "aws_iam_role_policy" "self_invoke" {
+  name = "${var.prefix}-self-invoke-policy"
+  role = aws_iam_role.lambda.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect   = "Allow"
+        Action   = "lambda:InvokeFunction"
+        Resource = aws_lambda_function.api.arn
+      }
+    ]
+  })
+}
+
 # Lambda function
 resource "aws_lambda_function" "api" {
   function_name = "${var.prefix}-api"
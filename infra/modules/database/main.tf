@@ -26,6 +26,14 @@ resource "aws_dynamodb_table" "tables" {
     }
   }
 
+  dynamic "attribute" {
+    for_each = each.value.gsi != null ? [for gsi in each.value.gsi : gsi if gsi.range_key != null] : []
+    content {
+      name = attribute.value.range_key
+      type = attribute.value.range_key_type
+    }
+  }
+
   dynamic "global_secondary_index" {
     for_each = each.value.gsi != null ? each.value.gsi : []
     content {
@@ -36,6 +44,14 @@ resource "aws_dynamodb_table" "tables" {
     }
   }
 
+  dynamic "ttl" {
+    for_each = each.value.ttl_attribute != null ? [1] : []
+    content {
+      attribute_name = each.value.ttl_attribute
+      enabled        = true
+    }
+  }
+
   point_in_time_recovery {
     enabled = true
   }
@@ -11,6 +11,7 @@ variable "tables" {
     hash_key_type  = string
     range_key      = optional(string)
     range_key_type = optional(string)
+    ttl_attribute  = optional(string)
     gsi = optional(list(object({
       name            = string
       hash_key        = string
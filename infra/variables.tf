@@ -30,6 +30,7 @@ variable "dynamodb_tables" {
     hash_key_type = string
     range_key    = optional(string)
     range_key_type = optional(string)
+    ttl_attribute = optional(string)
     gsi = optional(list(object({
       name            = string
       hash_key        = string
@@ -39,16 +40,301 @@ variable "dynamodb_tables" {
       projection_type = string
     })))
   }))
+  # Sorted list endpoints query "collection-index" (constant "collection"
+  # partition, per-table sort key); see backend/app/pagination.py.
   default = [
     {
       name          = "tasks"
       hash_key      = "id"
       hash_key_type = "S"
+      gsi = [
+        {
+          name            = "collection-index"
+          hash_key        = "collection"
+          hash_key_type   = "S"
+          range_key       = "order"
+          range_key_type  = "S"
+          projection_type = "ALL"
+        },
+        {
+          name            = "due-index"
+          hash_key        = "dueCollection"
+          hash_key_type   = "S"
+          range_key       = "dueDate"
+          range_key_type  = "S"
+          projection_type = "ALL"
+        }
+      ]
     },
     {
       name          = "statuses"
       hash_key      = "id"
       hash_key_type = "S"
+      gsi = [
+        {
+          name            = "collection-index"
+          hash_key        = "collection"
+          hash_key_type   = "S"
+          range_key       = "order"
+          range_key_type  = "S"
+          projection_type = "ALL"
+        }
+      ]
+    },
+    {
+      name          = "notes"
+      hash_key      = "id"
+      hash_key_type = "S"
+      gsi = [
+        {
+          name            = "collection-index"
+          hash_key        = "collection"
+          hash_key_type   = "S"
+          range_key       = "updatedAt"
+          range_key_type  = "S"
+          projection_type = "ALL"
+        },
+        {
+          name            = "pinned-index"
+          hash_key        = "pinnedCollection"
+          hash_key_type   = "S"
+          range_key       = "updatedAt"
+          range_key_type  = "S"
+          projection_type = "ALL"
+        },
+        {
+          name            = "archived-index"
+          hash_key        = "archivedCollection"
+          hash_key_type   = "S"
+          range_key       = "updatedAt"
+          range_key_type  = "S"
+          projection_type = "ALL"
+        },
+        {
+          name            = "starred-index"
+          hash_key        = "starredCollection"
+          hash_key_type   = "S"
+          range_key       = "updatedAt"
+          range_key_type  = "S"
+          projection_type = "ALL"
+        },
+        {
+          name            = "folder-index"
+          hash_key        = "folderId"
+          hash_key_type   = "S"
+          range_key       = "updatedAt"
+          range_key_type  = "S"
+          projection_type = "ALL"
+        }
+      ]
+    },
+    {
+      name          = "note_folders"
+      hash_key      = "id"
+      hash_key_type = "S"
+      gsi = [
+        {
+          name            = "collection-index"
+          hash_key        = "collection"
+          hash_key_type   = "S"
+          range_key       = "name"
+          range_key_type  = "S"
+          projection_type = "ALL"
+        }
+      ]
+    },
+    {
+      name          = "kanban_boards"
+      hash_key      = "id"
+      hash_key_type = "S"
+    },
+    {
+      name          = "kanban_columns"
+      hash_key      = "id"
+      hash_key_type = "S"
+      gsi = [
+        {
+          name            = "board-index"
+          hash_key        = "boardId"
+          hash_key_type   = "S"
+          range_key       = "order"
+          range_key_type  = "S"
+          projection_type = "ALL"
+        }
+      ]
+    },
+    {
+      name          = "kanban_cards"
+      hash_key      = "id"
+      hash_key_type = "S"
+      gsi = [
+        {
+          name            = "column-index"
+          hash_key        = "columnId"
+          hash_key_type   = "S"
+          range_key       = "order"
+          range_key_type  = "S"
+          projection_type = "ALL"
+        }
+      ]
+    },
+    {
+      name          = "calendar_events"
+      hash_key      = "id"
+      hash_key_type = "S"
+      gsi = [
+        {
+          name            = "collection-index"
+          hash_key        = "collection"
+          hash_key_type   = "S"
+          range_key       = "dateTime"
+          range_key_type  = "S"
+          projection_type = "ALL"
+        },
+        {
+          name            = "month-index"
+          hash_key        = "month"
+          hash_key_type   = "S"
+          range_key       = "dateTime"
+          range_key_type  = "S"
+          projection_type = "ALL"
+        }
+      ]
+    },
+    {
+      name          = "routines"
+      hash_key      = "id"
+      hash_key_type = "S"
+    },
+    {
+      name          = "schedule_blocks"
+      hash_key      = "id"
+      hash_key_type = "S"
+      gsi = [
+        {
+          name            = "collection-index"
+          hash_key        = "collection"
+          hash_key_type   = "S"
+          range_key       = "slot"
+          range_key_type  = "S"
+          projection_type = "ALL"
+        }
+      ]
+    },
+    {
+      name          = "schedule_templates"
+      hash_key      = "id"
+      hash_key_type = "S"
+    },
+    {
+      name          = "contacts"
+      hash_key      = "id"
+      hash_key_type = "S"
+      gsi = [
+        {
+          name            = "collection-index"
+          hash_key        = "collection"
+          hash_key_type   = "S"
+          range_key       = "nameSort"
+          range_key_type  = "S"
+          projection_type = "ALL"
+        }
+      ]
+    },
+    {
+      name          = "user_preferences"
+      hash_key      = "userId"
+      hash_key_type = "S"
+    },
+    {
+      name          = "recipes"
+      hash_key      = "id"
+      hash_key_type = "S"
+      gsi = [
+        {
+          name            = "collection-index"
+          hash_key        = "collection"
+          hash_key_type   = "S"
+          range_key       = "createdAt"
+          range_key_type  = "S"
+          projection_type = "ALL"
+        },
+        {
+          name            = "favorite-index"
+          hash_key        = "favoriteCollection"
+          hash_key_type   = "S"
+          range_key       = "createdAt"
+          range_key_type  = "S"
+          projection_type = "ALL"
+        }
+      ]
+    },
+    {
+      name          = "grocery_lists"
+      hash_key      = "id"
+      hash_key_type = "S"
+      gsi = [
+        {
+          name            = "collection-index"
+          hash_key        = "collection"
+          hash_key_type   = "S"
+          range_key       = "createdAt"
+          range_key_type  = "S"
+          projection_type = "ALL"
+        }
+      ]
+    },
+    {
+      name          = "meal_plans"
+      hash_key      = "id"
+      hash_key_type = "S"
+      gsi = [
+        {
+          name            = "collection-index"
+          hash_key        = "collection"
+          hash_key_type   = "S"
+          range_key       = "startDate"
+          range_key_type  = "S"
+          projection_type = "ALL"
+        }
+      ]
+    },
+    {
+      name          = "jobs"
+      hash_key      = "id"
+      hash_key_type = "S"
+      ttl_attribute = "expiresAt"
+    },
+    {
+      name           = "counters"
+      hash_key       = "scope"
+      hash_key_type  = "S"
+      range_key      = "name"
+      range_key_type = "S"
+    },
+    {
+      name           = "search_index"
+      hash_key       = "term"
+      hash_key_type  = "S"
+      range_key      = "docId"
+      range_key_type = "S"
+    },
+    {
+      name           = "note_tags"
+      hash_key       = "tag"
+      hash_key_type  = "S"
+      range_key      = "noteId"
+      range_key_type = "S"
+      gsi = [
+        {
+          name            = "updated-index"
+          hash_key        = "tag"
+          hash_key_type   = "S"
+          range_key       = "updatedAt"
+          range_key_type  = "S"
+          projection_type = "ALL"
+        }
+      ]
     }
   ]
 }
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Backfill the index attributes that sorted list endpoints query on.
+
+Items written before the collection indexes existed lack "collection" (and
+derived sort keys such as "nameSort" or "slot"), so they would not appear in
+paginated list responses. Routines get the "dueMask" that GET
+/api/routines/due tests against, and tasks with a due date the
+"dueCollection" key of the due-index the agenda reads. Notes also get
+their note_tags rows. Run once per environment after the indexes exist:
+
+    TASKS_TABLE=... python scripts/backfill_index_keys.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app import database  # noqa: E402
+from app.routes import calendar, contacts, notes, recipes, routines, schedule, tasks  # noqa: E402
+
+
+def collection(name):
+    return lambda item: {"collection": name}
+
+
+BACKFILLS = {
+    database.tasks_repo: tasks.index_attributes,
+    database.statuses_repo: collection("statuses"),
+    database.notes_repo: notes.index_attributes,
+    database.note_folders_repo: collection("note_folders"),
+    database.calendar_events_repo: calendar.index_attributes,
+    database.routines_repo: routines.index_attributes,
+    database.schedule_blocks_repo: schedule.index_attributes,
+    database.contacts_repo: contacts.index_attributes,
+    database.recipes_repo: recipes.index_attributes,
+    database.grocery_lists_repo: collection("grocery_lists"),
+    database.meal_plans_repo: collection("meal_plans"),
+}
+
+
+async def backfill(table, derive) -> int:
+    updated = 0
+    kwargs = {}
+    while True:
+        response = await table.scan(**kwargs)
+        for item in response.get("Items", []):
+            # None means the attribute must be absent (e.g. a null index key)
+            derived = derive(item).items()
+            attributes = {k: v for k, v in derived if v is not None and item.get(k) != v}
+            remove = [k for k, v in derived if v is None and k in item]
+            if not attributes and not remove:
+                continue
+            clauses = []
+            if attributes:
+                clauses.append("SET " + ", ".join(f"#{k} = :{k}" for k in attributes))
+            if remove:
+                clauses.append("REMOVE " + ", ".join(f"#{k}" for k in remove))
+            update = {
+                "Key": {"id": item["id"]},
+                "UpdateExpression": " ".join(clauses),
+                "ExpressionAttributeNames": {f"#{k}": k for k in [*attributes, *remove]},
+            }
+            if attributes:
+                update["ExpressionAttributeValues"] = {f":{k}": v for k, v in attributes.items()}
+            await table.update_item(**update)
+            updated += 1
+        if "LastEvaluatedKey" not in response:
+            return updated
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+async def backfill_note_tags() -> int:
+    table = await database.notes_repo.table()
+    written = 0
+    kwargs = {}
+    while True:
+        response = await table.scan(**kwargs)
+        notes_page = [{**note, **notes.index_attributes(note)} for note in response.get("Items", [])]
+        await database.parallel_map(lambda note: notes.write_tags(None, note), notes_page)
+        written += len(notes_page)
+        if "LastEvaluatedKey" not in response:
+            return written
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+async def main():
+    for repo, derive in BACKFILLS.items():
+        print(f"{repo.table_name}: {await backfill(await repo.table(), derive)} item(s) updated")
+    print(f"{database.NOTE_TAGS_TABLE}: {await backfill_note_tags()} note(s) written")
+    await database.close_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
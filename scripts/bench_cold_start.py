@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Measure the Lambda handler's time to first response from a cold process.
+
+Each run starts a fresh interpreter, imports the handler and serves one API
+Gateway request against a local DynamoDB stand-in: moto's server by
+default (pip install "moto[server]"), or DynamoDB Local via
+--endpoint-url. Exits non-zero when the median exceeds the budget, so it can
+guard against cold-start regressions in CI:
+
+    python scripts/bench_cold_start.py [--runs 5] [--budget-ms 1500] [--endpoint-url http://localhost:8000]
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent / "backend"
+
+DEFAULT_BUDGET_MS = 1500
+REGION = "ap-northeast-1"
+
+# Tables read by the benchmarked request (GET /api/tasks): its own table
+# and the counters table the ETag check reads
+TABLES = [
+    {
+        "TableName": "orangewall-dev-tasks",
+        "KeySchema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "AttributeDefinitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "collection", "AttributeType": "S"},
+            {"AttributeName": "order", "AttributeType": "S"},
+        ],
+        "GlobalSecondaryIndexes": [{
+            "IndexName": "collection-index",
+            "KeySchema": [
+                {"AttributeName": "collection", "KeyType": "HASH"},
+                {"AttributeName": "order", "KeyType": "RANGE"},
+            ],
+            "Projection": {"ProjectionType": "ALL"},
+        }],
+    },
+    {
+        "TableName": "orangewall-dev-counters",
+        "KeySchema": [
+            {"AttributeName": "scope", "KeyType": "HASH"},
+            {"AttributeName": "name", "KeyType": "RANGE"},
+        ],
+        "AttributeDefinitions": [
+            {"AttributeName": "scope", "AttributeType": "S"},
+            {"AttributeName": "name", "AttributeType": "S"},
+        ],
+    },
+]
+
+# Runs in the fresh interpreter; timings start before the handler import
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from app.main import handler
+imported = time.perf_counter()
+response = handler(json.loads(sys.argv[1]), None)
+done = time.perf_counter()
+print(json.dumps({
+    "status": response["statusCode"],
+    "importMs": (imported - start) * 1000,
+    "requestMs": (done - imported) * 1000,
+}))
+"""
+
+
+def http_event(path: str) -> dict:
+    """A minimal API Gateway HTTP API (payload 2.0) GET event."""
+    return {
+        "version": "2.0",
+        "routeKey": "$default",
+        "rawPath": path,
+        "rawQueryString": "",
+        "headers": {"host": "localhost", "accept": "application/json"},
+        "requestContext": {
+            "accountId": "000000000000",
+            "apiId": "bench",
+            "domainName": "localhost",
+            "http": {
+                "method": "GET",
+                "path": path,
+                "protocol": "HTTP/1.1",
+                "sourceIp": "127.0.0.1",
+                "userAgent": "bench_cold_start",
+            },
+            "requestId": "bench",
+            "routeKey": "$default",
+            "stage": "$default",
+            "timeEpoch": 0,
+        },
+        "isBase64Encoded": False,
+    }
+
+
+def start_moto():
+    try:
+        from moto.server import ThreadedMotoServer
+    except ImportError:
+        sys.exit('moto[server] is not installed; pip install "moto[server]" or pass --endpoint-url')
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=port)
+    server.start()
+    return server, f"http://127.0.0.1:{port}"
+
+
+def create_tables(endpoint_url: str) -> None:
+    import boto3
+
+    client = boto3.client("dynamodb", region_name=REGION, endpoint_url=endpoint_url)
+    existing = set(client.list_tables()["TableNames"])
+    for table in TABLES:
+        if table["TableName"] not in existing:
+            client.create_table(BillingMode="PAY_PER_REQUEST", **table)
+
+
+def run_once(path: str, env: dict) -> dict:
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD, json.dumps(http_event(path))],
+        cwd=BACKEND, env=env, capture_output=True, text=True,
+    )
+    total = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+    timings = json.loads(result.stdout.splitlines()[-1])
+    if timings["status"] != 200:
+        sys.exit(f"GET {path} returned {timings['status']}")
+    return {**timings, "totalMs": total}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/api/tasks")
+    parser.add_argument("--budget-ms", type=float,
+                        default=float(os.getenv("COLD_START_BUDGET_MS", DEFAULT_BUDGET_MS)))
+    parser.add_argument("--endpoint-url", default=os.getenv("DYNAMODB_ENDPOINT_URL"))
+    args = parser.parse_args()
+
+    server = None
+    endpoint_url = args.endpoint_url
+    if not endpoint_url:
+        server, endpoint_url = start_moto()
+    env = {
+        **os.environ,
+        "DYNAMODB_ENDPOINT_URL": endpoint_url,
+        "AWS_REGION": REGION,
+        "AWS_ACCESS_KEY_ID": os.getenv("AWS_ACCESS_KEY_ID", "bench"),
+        "AWS_SECRET_ACCESS_KEY": os.getenv("AWS_SECRET_ACCESS_KEY", "bench"),
+    }
+    env.pop("AWS_LAMBDA_FUNCTION_NAME", None)
+
+    try:
+        create_tables(endpoint_url)
+        runs = [run_once(args.path, env) for _ in range(args.runs)]
+    finally:
+        if server is not None:
+            server.stop()
+
+    print(f"{'run':>4} {'total ms':>9} {'import ms':>10} {'request ms':>11}")
+    for i, run in enumerate(runs, 1):
+        print(f"{i:>4} {run['totalMs']:>9.0f} {run['importMs']:>10.0f} {run['requestMs']:>11.0f}")
+    median = statistics.median(run["totalMs"] for run in runs)
+    print(f"median time to first response: {median:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    if median > args.budget_ms:
+        sys.exit(f"Cold start over budget by {median - args.budget_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
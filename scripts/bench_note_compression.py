@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Measure what compressing note bodies saves in DynamoDB capacity.
+
+For each note, compares the item as stored plainly with the item as the
+API stores it (see backend/app/compression.py): item size, write units
+per save, read units per single-note read, and the CPU time to compress
+and decompress. Notes are cut from English prose, Japanese text and code
+at several lengths, or sampled from a notes table with --table:
+
+    python scripts/bench_note_compression.py [--table orangewall-dev-notes --limit 200]
+"""
+
+import argparse
+import math
+import random
+import statistics
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app import compression  # noqa: E402
+
+JAPANESE = (
+    "今日は朝から雨だったので、近所のカフェで企画書の続きを書いた。"
+    "来週の打ち合わせまでに見積もりの修正版を用意しておくこと。"
+    "京都旅行の候補は伏見稲荷、嵐山、哲学の道。紅葉の時期は混雑に注意。"
+    "買い物リストは牛乳、卵、味噌、豆腐、ネギ、醤油。"
+    "読書メモ：習慣は小さく始めて、毎日同じ時間に続けるのがコツ。"
+    "新しいプロジェクトの進め方について、チームで意見を出し合った。"
+)
+
+TARGET_CHARS = [500, 2000, 8000, 32000]
+
+
+def corpus(kind: str) -> str:
+    """Real text to cut notes from, so compression ratios are realistic.
+
+    English prose comes from standard-library docstrings and code from its
+    source. Japanese is sampled character by character from JAPANESE, which
+    if anything compresses worse than real prose.
+    """
+    import argparse as argparse_module
+    import asyncio
+    import email
+    import json
+    import logging
+    import pydoc
+
+    modules = [argparse_module, asyncio, email, json, logging, pydoc]
+    if kind == "english":
+        docs = []
+        for module in modules:
+            docs.extend(getattr(obj, "__doc__", None) or "" for obj in vars(module).values())
+        return "\n\n".join(d for d in docs if len(d) > 200)
+    if kind == "code":
+        return "\n".join(Path(m.__file__).read_text() for m in modules)
+    rng = random.Random(7)
+    return "".join(rng.choice(JAPANESE) for _ in range(200_000))
+
+
+def generated_notes() -> list[tuple[str, dict]]:
+    rng = random.Random(7)
+    notes = []
+    for kind in ("english", "japanese", "code"):
+        text = corpus(kind)
+        for chars in TARGET_CHARS:
+            start = rng.randrange(len(text) - chars)
+            content = text[start:start + chars]
+            if kind == "code":
+                content = f"## Snippet\n\n```python\n{content}\n```"
+            notes.append((f"{kind} {chars}", {
+                "id": "00000000-0000-0000-0000-000000000000",
+                "title": f"{kind.capitalize()} note",
+                "content": content,
+                "color": "default",
+                "pinned": False,
+                "starred": False,
+                "archived": False,
+                "tags": ["work", "ideas"],
+                "collection": "notes",
+                "createdAt": "2024-06-01T09:00:00",
+                "updatedAt": "2024-06-01T09:00:00",
+            }))
+    return notes
+
+
+def table_notes(table_name: str, limit: int) -> list[tuple[str, dict]]:
+    import boto3
+
+    table = boto3.resource("dynamodb").Table(table_name)
+    notes = []
+    kwargs = {}
+    while len(notes) < limit:
+        response = table.scan(**kwargs)
+        for item in response.get("Items", []):
+            note = compression.unpack(item, "content")
+            notes.append((note["id"][:8], note))
+        if "LastEvaluatedKey" not in response:
+            break
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    return notes[:limit]
+
+
+def value_size(value) -> int:
+    """Bytes DynamoDB bills for an attribute value."""
+    if isinstance(value, str):
+        return len(value.encode())
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if hasattr(value, "value"):  # boto3 Binary
+        return len(value.value)
+    if isinstance(value, bool) or value is None:
+        return 1
+    if isinstance(value, (int, float, Decimal)):
+        return math.ceil(len(str(abs(value)).replace(".", "").lstrip("0") or "0") / 2) + 1
+    if isinstance(value, (list, tuple, set)):
+        return 3 + sum(1 + value_size(v) for v in value)
+    if isinstance(value, dict):
+        return 3 + sum(1 + len(k.encode()) + value_size(v) for k, v in value.items())
+    raise TypeError(type(value).__name__)
+
+
+def item_size(item: dict) -> int:
+    return sum(len(name.encode()) + value_size(value) for name, value in item.items())
+
+
+def timed(fn, repeat: int = 20) -> float:
+    """Median wall time of `fn()` in microseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--table", help="Sample notes from this table instead of generating them")
+    parser.add_argument("--limit", type=int, default=200)
+    args = parser.parse_args()
+
+    notes = table_notes(args.table, args.limit) if args.table else generated_notes()
+    print(f"{'note':<16} {'plain B':>8} {'stored B':>9} {'ratio':>6} {'WCU':>7} {'RCU':>7} "
+          f"{'pack µs':>8} {'unpack µs':>10}")
+    totals = {"plain_wcu": 0, "stored_wcu": 0, "plain_rcu": 0, "stored_rcu": 0}
+    for name, note in notes:
+        stored = compression.packed(note, "content")
+        plain, packed = item_size(note), item_size(stored)
+        wcu = (math.ceil(plain / 1024), math.ceil(packed / 1024))
+        # Strongly consistent single-item reads
+        rcu = (math.ceil(plain / 4096), math.ceil(packed / 4096))
+        pack_us = timed(lambda: compression.packed(note, "content"))
+        unpack_us = timed(lambda: compression.unpack(stored, "content"))
+        for key, pair in (("wcu", wcu), ("rcu", rcu)):
+            totals[f"plain_{key}"] += pair[0]
+            totals[f"stored_{key}"] += pair[1]
+        print(f"{name:<16} {plain:>8} {packed:>9} {plain / packed:>6.2f} {wcu[0]:>3}→{wcu[1]:<3} "
+              f"{rcu[0]:>3}→{rcu[1]:<3} {pack_us:>8.0f} {unpack_us:>10.0f}")
+
+    for key in ("wcu", "rcu"):
+        plain, stored = totals[f"plain_{key}"], totals[f"stored_{key}"]
+        print(f"total {key.upper()}: {plain} → {stored} ({100 * (plain - stored) / plain:.0f}% saved)")
+
+
+if __name__ == "__main__":
+    main()
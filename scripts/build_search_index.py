@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Index every note for GET /api/notes/search.
+
+Run once per environment after creating the search index table, and again
+any time the index is suspected to have drifted. Notes whose postings are
+already current are left untouched:
+
+    NOTES_TABLE=... SEARCH_INDEX_TABLE=... python scripts/build_search_index.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app import database  # noqa: E402
+from app.routes.notes import notes_search  # noqa: E402
+
+
+async def main():
+    table = await database.notes_repo.table()
+    indexed = 0
+    kwargs = {}
+    while True:
+        response = await table.scan(**kwargs)
+        notes = response.get("Items", [])
+        await database.parallel_map(notes_search.index, notes)
+        indexed += len(notes)
+        if "LastEvaluatedKey" not in response:
+            break
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    print(f"notes: {indexed}")
+    await database.close_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Report where the Lambda handler's import time goes.
+
+Imports the handler module in a fresh interpreter under `python -X
+importtime` and lists the modules with the largest cumulative and self
+times, so cold-start regressions can be traced to a dependency:
+
+    python scripts/profile_imports.py [--top 20] [--module app.main]
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent / "backend"
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def profile(module: str) -> list[tuple[str, int, int, int]]:
+    """(module, self µs, cumulative µs, nesting depth) for every import made by `module`.
+
+    Interpreter startup (site, encodings) is left out.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+    rows = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            rows.append((name, int(own), int(cumulative), (len(indent) - 1) // 2))
+    # -X importtime prints a module after everything it imported
+    end = max(i for i, row in enumerate(rows) if row[0] == module and row[3] == 0)
+    start = max((i for i, row in enumerate(rows[:end]) if row[3] == 0), default=-1) + 1
+    return rows[start:end + 1]
+
+
+def print_table(title: str, rows, top: int) -> None:
+    print(f"\n{title}")
+    print(f"{'cumulative ms':>14} {'self ms':>8}  module")
+    for name, own, cumulative, _ in rows[:top]:
+        print(f"{cumulative / 1000:>14.1f} {own / 1000:>8.1f}  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = profile(args.module)
+    print(f"import {args.module}: {rows[-1][2] / 1000:.1f} ms")
+
+    # Direct dependencies show which third-party packages dominate;
+    # self time points at modules doing real work at import
+    print_table("Direct imports by cumulative time", sorted(
+        (r for r in rows if r[3] == 1), key=lambda r: r[2], reverse=True), args.top)
+    print_table("Modules by self time", sorted(rows, key=lambda r: r[1], reverse=True), args.top)
+
+
+if __name__ == "__main__":
+    main()
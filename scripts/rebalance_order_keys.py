@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Respace the fractional `order` keys of every manually ordered list.
+
+Also converts items still carrying the old numeric `order`, so run it once
+per environment when deploying string order keys. The API respaces a list
+on its own when its keys grow long; running this again is always safe:
+
+    TASKS_TABLE=... python scripts/rebalance_order_keys.py
+"""
+
+import asyncio
+import sys
+from collections import defaultdict
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app.database import SEQUENCES, close_connection, raise_counter  # noqa: E402
+from app.order_keys import integer_key  # noqa: E402
+from app.ordering import ORDERINGS  # noqa: E402
+
+
+def sort_key(item):
+    # Numeric orders predate string keys, so they sort first
+    order = item.get("order")
+    if isinstance(order, Decimal):
+        return (0, order, "")
+    return (1, 0, order or "")
+
+
+async def rebalance(ordering) -> int:
+    table = await ordering.repo.table()
+    scopes = defaultdict(list)
+    kwargs = {
+        "ProjectionExpression": "id, #order, #scope",
+        "ExpressionAttributeNames": {"#order": "order", "#scope": ordering.scope_key},
+    }
+    while True:
+        response = await table.scan(**kwargs)
+        for item in response.get("Items", []):
+            scopes[item.get(ordering.scope_key)].append(item)
+        if "LastEvaluatedKey" not in response:
+            break
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    updated = 0
+    for scope, items in scopes.items():
+        items.sort(key=sort_key)
+        await raise_counter(SEQUENCES, ordering.sequence(scope), len(items))
+        for n, item in enumerate(items):
+            key = integer_key(n)
+            if item.get("order") == key:
+                continue
+            await table.update_item(
+                Key={"id": item["id"]},
+                UpdateExpression="SET #order = :key",
+                ExpressionAttributeNames={"#order": "order"},
+                ExpressionAttributeValues={":key": key},
+            )
+            updated += 1
+    return updated
+
+
+async def main():
+    for ordering in ORDERINGS.values():
+        print(f"{ordering.repo.table_name}: {await rebalance(ordering)} item(s) updated")
+    await close_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
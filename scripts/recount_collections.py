@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Set the per-collection item counters and note facet counts from a full count.
+
+Run once per environment after creating the counters table, and again any
+time a count is suspected to have drifted:
+
+    TASKS_TABLE=... python scripts/recount_collections.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app import database  # noqa: E402
+from app.routes.notes import facet_names  # noqa: E402
+
+
+async def count(table) -> int:
+    total = 0
+    kwargs = {"Select": "COUNT"}
+    while True:
+        response = await table.scan(**kwargs)
+        total += response.get("Count", 0)
+        if "LastEvaluatedKey" not in response:
+            return total
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+async def count_facets(table) -> dict[str, int]:
+    counts = {}
+    kwargs = {"ProjectionExpression": "tags, folderId"}
+    while True:
+        response = await table.scan(**kwargs)
+        for note in response.get("Items", []):
+            for name in facet_names(note):
+                counts[name] = counts.get(name, 0) + 1
+        if "LastEvaluatedKey" not in response:
+            return counts
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+async def main():
+    counters = await database.get_table(database.COUNTERS_TABLE)
+    repos = [v for v in vars(database).values() if isinstance(v, database.Repository) and v.counter]
+    for repo in repos:
+        total = await count(await repo.table())
+        # SET only the count: the version stamp must never go backwards
+        await counters.update_item(
+            Key={"scope": database.COUNTS, "name": repo.counter},
+            UpdateExpression="SET #value = :total",
+            ExpressionAttributeNames={"#value": "value"},
+            ExpressionAttributeValues={":total": total},
+        )
+        print(f"{repo.counter}: {total}")
+
+    facets = await count_facets(await database.notes_repo.table())
+    # Facets no note has any more are reset rather than left at a stale count
+    for name in (await database.get_counters(database.NOTE_FACETS)).keys() - facets.keys():
+        facets[name] = 0
+    for name, total in facets.items():
+        await counters.update_item(
+            Key={"scope": database.NOTE_FACETS, "name": name},
+            UpdateExpression="SET #value = :total",
+            ExpressionAttributeNames={"#value": "value"},
+            ExpressionAttributeValues={":total": total},
+        )
+    print(f"note facets: {len(facets)}")
+    await database.close_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())